@@ -0,0 +1,137 @@
+# analytics_charts.py
+"""
+Matplotlib charts for the Reports & Analytics tabs, shared by the on-screen
+canvases and the PDF exports.
+
+    charts = ChartCache()
+    fig = charts.figure("revenue", months, totals)          # on screen
+    png = charts.png("revenue", months, totals, start, end)  # PDF export
+
+A chart is a kind (see CHARTS) plus (labels, values). Each kind keeps one
+Figure per size: when only the values changed the bars are resized in place
+(set_height / set_width) instead of clearing the axes, and identical data is a
+no-op. Rendered PNGs are kept per (kind, date range, data hash), so exporting
+the same report again does not rasterize anything.
+
+Uses the object-oriented Figure API only (no pyplot state); call from the GUI
+thread.
+"""
+import io
+
+from matplotlib.figure import Figure
+
+SCREEN_SIZE = (6, 4)
+EXPORT_SIZE = (6, 3.5)
+EXPORT_DPI = 100
+PNG_CACHE_MAX = 32
+
+# kind -> how the chart is drawn
+CHARTS = {
+    "revenue": {
+        "style": "bar",
+        "title": "Revenue by Month",
+        "xlabel": "Month",
+        "ylabel": "€",
+    },
+    "species": {"style": "pie", "title": "Appointments by Species"},
+    "top_items": {
+        "style": "barh",
+        "title": "Top-Selling Medications/Items",
+        "xlabel": "Units Sold",
+    },
+    "busiest": {
+        "style": "bar",
+        "title": "Appointments by Day of Week",
+        "ylabel": "Number of Appointments",
+        "show_empty": True,  # always the 7 weekdays, zeros included
+    },
+    "vet": {
+        "style": "bar",
+        "title": "Appointments by Veterinarian",
+        "ylabel": "Appointments",
+    },
+}
+
+
+def _draw(ax, spec: dict, labels: tuple, values: tuple) -> None:
+    style = spec["style"]
+    if not labels and not spec.get("show_empty"):
+        ax.text(0.5, 0.5, "No data", ha="center")
+        return
+    if style == "pie":
+        ax.pie(values, labels=labels, autopct="%1.1f%%", startangle=140)
+    elif style == "barh":
+        ax.barh(range(len(values)), values)
+        ax.set_yticks(range(len(labels)))
+        ax.set_yticklabels(labels)
+        ax.invert_yaxis()
+    else:
+        ax.bar(range(len(values)), values)
+        ax.set_xticks(range(len(labels)))
+        ax.set_xticklabels(labels, rotation=45)
+    ax.set_title(spec["title"])
+    if spec.get("xlabel"):
+        ax.set_xlabel(spec["xlabel"])
+    if spec.get("ylabel"):
+        ax.set_ylabel(spec["ylabel"])
+
+
+class ChartCache:
+    def __init__(self):
+        self._figures = {}  # (kind, size) -> Figure
+        self._drawn = {}  # (kind, size) -> (labels, values) on that Figure
+        self._png = {}  # (kind, start, end, data hash) -> PNG bytes, oldest first
+        self.stats = {"unchanged": 0, "updated": 0, "redrawn": 0, "png_hits": 0}
+
+    def figure(self, kind: str, labels, values, size=SCREEN_SIZE) -> Figure:
+        """The kind's Figure at `size`, showing (labels, values)."""
+        spec = CHARTS[kind]
+        labels, values = tuple(labels), tuple(values)
+        fig_key = (kind, size)
+        fig = self._figures.get(fig_key)
+        if fig is None:
+            fig = self._figures[fig_key] = Figure(figsize=size)
+            fig.add_subplot(111)
+        ax = fig.axes[0]
+        drawn = self._drawn.get(fig_key)
+
+        if drawn == (labels, values):
+            self.stats["unchanged"] += 1
+        elif drawn and labels and drawn[0] == labels and spec["style"] != "pie":
+            # Same bars, new values: resize them and rescale the value axis
+            for bar, value in zip(ax.patches, values):
+                if spec["style"] == "barh":
+                    bar.set_width(value)
+                else:
+                    bar.set_height(value)
+            ax.relim()
+            ax.autoscale_view()
+            self.stats["updated"] += 1
+        else:
+            ax.clear()
+            _draw(ax, spec, labels, values)
+            self.stats["redrawn"] += 1
+        self._drawn[fig_key] = (labels, values)
+        return fig
+
+    def png(self, kind: str, labels, values, start=None, end=None) -> bytes:
+        """PNG of the chart at EXPORT_SIZE for the report over [start, end]."""
+        labels, values = tuple(labels), tuple(values)
+        key = (kind, start, end, hash((labels, values)))
+        data = self._png.get(key)
+        if data is not None:
+            self.stats["png_hits"] += 1
+            return data
+        fig = self.figure(kind, labels, values, EXPORT_SIZE)
+        fig.tight_layout()
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", dpi=EXPORT_DPI)
+        data = self._png[key] = buf.getvalue()
+        while len(self._png) > PNG_CACHE_MAX:
+            del self._png[next(iter(self._png))]
+        return data
+
+    def clear(self) -> None:
+        self._figures.clear()
+        self._drawn.clear()
+        self._png.clear()
@@ -0,0 +1,154 @@
+# analytics_columns.py
+"""
+Columnar (NumPy) engine behind analytics_data.fetch().
+
+The columns the analytics charts group by are loaded once into NumPy arrays
+("frames"); every date range after that is a boolean mask plus np.bincount /
+np.unique over memory instead of another SQL scan of the whole table.
+analytics_data keeps each frame until one of the tables in FRAMES[frame] is written
+(data_versions), so changing a tab's date filter never goes back to SQLite.
+
+Results match the SQL reports: same rows, groups in GROUP BY order. Reports
+that list rows rather than aggregate them (unpaid invoices) stay in SQL.
+NumPy is optional; without it analytics_data runs the SQL. It is imported by
+the first load(), not with this module (init_db imports analytics_data).
+"""
+import importlib.util
+from datetime import date
+
+np = None  # numpy, once load() has imported it
+
+_EPOCH = date(1970, 1, 1)
+_NO_DAY = -(2**31)  # NULL / unparseable dates never fall inside a range
+# julianday() -> days since 1970-01-01, NULL -> _NO_DAY
+_DAY = f"COALESCE(CAST(julianday(DATE({{}})) - 2440587.5 AS INTEGER), {_NO_DAY})"
+
+# frame -> (tables it reads, SQL loading its columns)
+FRAMES = {
+    "invoices": (
+        ("invoices",),
+        f"SELECT {_DAY.format('created_at')}, final_amount FROM invoices",
+    ),
+    "appointments": (
+        ("appointments", "patients"),
+        f"""
+        SELECT {_DAY.format('a.date_time')}, a.veterinarian,
+               p.patient_id IS NOT NULL, p.species
+          FROM appointments a
+          LEFT JOIN patients p ON a.patient_id = p.patient_id
+        """,
+    ),
+    "items": (
+        ("invoices", "invoice_items"),
+        f"""
+        SELECT {_DAY.format('i.created_at')}, ii.description, ii.quantity
+          FROM invoice_items ii
+          JOIN invoices i ON i.invoice_id = ii.invoice_id
+        """,
+    ),
+}
+
+
+def available() -> bool:
+    return importlib.util.find_spec("numpy") is not None
+
+
+def _encode(values) -> tuple:
+    """(codes, labels): one int per row; labels sorted as SQLite groups them."""
+    labels = sorted(set(values), key=lambda v: (v is not None, v))  # NULL first
+    index = {v: i for i, v in enumerate(labels)}
+    codes = np.fromiter((index[v] for v in values), dtype=np.int32, count=len(values))
+    return codes, labels
+
+
+def _floats(values):
+    return np.fromiter(
+        (0.0 if v is None else v for v in values), dtype=np.float64, count=len(values)
+    )
+
+
+def load(conn, frame: str) -> dict:
+    """Read `frame`'s columns into arrays (caller holds the read snapshot)."""
+    global np
+    if np is None:
+        import numpy as np
+    cur = conn.execute(FRAMES[frame][1])
+    rows = cur.fetchall()
+    cols = list(zip(*rows)) if rows else [()] * len(cur.description)
+    out = {"day": np.fromiter(cols[0], dtype=np.int64, count=len(rows))}
+    if frame == "invoices":
+        out["amount"] = _floats(cols[1])
+    elif frame == "appointments":
+        out["vet"], out["vets"] = _encode(cols[1])
+        out["has_patient"] = np.fromiter(cols[2], dtype=bool, count=len(rows))
+        out["species"], out["species_labels"] = _encode(cols[3])
+    else:
+        out["item"], out["items"] = _encode(cols[1])
+        out["qty"] = _floats(cols[2])
+    return out
+
+
+def _in_range(day, start, end):
+    if start is None or end is None:  # BETWEEN NULL matches nothing
+        return np.zeros(len(day), dtype=bool)
+    lo = (date.fromisoformat(start[:10]) - _EPOCH).days
+    hi = (date.fromisoformat(end[:10]) - _EPOCH).days
+    return (day >= lo) & (day <= hi)
+
+
+def _number(x):
+    """SUM() semantics for display: whole numbers back as int."""
+    x = float(x)
+    return int(x) if x.is_integer() else x
+
+
+def _group_counts(codes, labels, mask) -> list:
+    counts = np.bincount(codes[mask], minlength=len(labels))
+    return [(labels[i], int(counts[i])) for i in np.flatnonzero(counts)]
+
+
+# --- Reports: frame arrays + [start, end] -> rows as the SQL returns them ---
+def revenue_by_month(f, start, end):
+    mask = _in_range(f["day"], start, end)
+    months = f["day"][mask].astype("datetime64[D]").astype("datetime64[M]")
+    uniq, inverse = np.unique(months, return_inverse=True)
+    sums = np.bincount(inverse, weights=f["amount"][mask], minlength=len(uniq))
+    labels = np.datetime_as_string(uniq, unit="M")
+    return [(str(m), _number(s)) for m, s in zip(labels, sums)]
+
+
+def appointments_by_species(f, start, end):
+    mask = _in_range(f["day"], start, end) & f["has_patient"]
+    return _group_counts(f["species"], f["species_labels"], mask)
+
+
+def top_items(f, start, end, limit=10):
+    mask = _in_range(f["day"], start, end)
+    codes = f["item"][mask]
+    n = len(f["items"])
+    present = np.flatnonzero(np.bincount(codes, minlength=n))
+    totals = np.bincount(codes, weights=f["qty"][mask], minlength=n)[present]
+    order = np.lexsort((present, -totals))[:limit]  # ties by description
+    return [(f["items"][present[i]], _number(totals[i])) for i in order]
+
+
+def busiest_days(f, start, end):
+    weekday = (f["day"][_in_range(f["day"], start, end)] + 4) % 7  # 1970-01-01: Thu
+    counts = np.bincount(weekday, minlength=7)
+    return [(str(w), int(counts[w])) for w in np.flatnonzero(counts)]
+
+
+def appointments_by_vet(f, start, end):
+    named = np.array([v is not None and v != "" for v in f["vets"]], dtype=bool)
+    mask = _in_range(f["day"], start, end) & named[f["vet"]]
+    return _group_counts(f["vet"], f["vets"], mask)
+
+
+# report -> (frame, function)
+REPORTS = {
+    "revenue_by_month": ("invoices", revenue_by_month),
+    "appointments_by_species": ("appointments", appointments_by_species),
+    "top_items": ("items", top_items),
+    "busiest_days": ("appointments", busiest_days),
+    "appointments_by_vet": ("appointments", appointments_by_vet),
+}
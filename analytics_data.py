@@ -0,0 +1,214 @@
+# analytics_data.py
+"""
+Data behind the Reports & Analytics tabs (schema v9), cached per date range.
+
+    rows = fetch("revenue_by_month", "2025-01-01", "2025-03-31")
+
+Every report is a registered query over (:start, :end) inclusive yyyy-MM-dd
+bounds and lists the tables it reads. Triggers bump data_versions.version for
+each insert / update / delete on those tables, so a cached result is reused
+only while none of its tables has been written since it was computed (from any
+screen, connection or process); one small lookup decides. fetch() is safe to
+call from worker threads.
+
+Aggregating reports are answered by analytics_columns (NumPy) when it is
+installed: each frame of columns is loaded once and reused for every date
+range until one of its tables is written. Without NumPy, or with
+PETWELLNESS_ANALYTICS_SQL=1, every report runs its registered SQL.
+"""
+import json
+import os
+import threading
+
+import analytics_columns
+from db import connect as _connect
+from db import register_query, run_query
+
+# Tables whose writes invalidate cached analytics
+TRACKED_TABLES = ("invoices", "invoice_items", "appointments", "patients")
+
+DATA_VERSION_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS data_versions (
+        table_name TEXT PRIMARY KEY,
+        version    INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """,
+    "INSERT OR IGNORE INTO data_versions (table_name) VALUES "
+    + ", ".join(f"('{t}')" for t in TRACKED_TABLES),
+]
+DATA_VERSION_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{suffix}
+    AFTER {event} ON {table}
+    BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE table_name = '{table}';
+    END
+    """
+    for table in TRACKED_TABLES
+    for suffix, event in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+]
+
+# name -> tables read; the SQL is registered as "analytics.<name>"
+REPORT_TABLES = {
+    "revenue_by_month": ("invoices",),
+    "unpaid_invoices": ("invoices", "appointments", "patients"),
+    "appointments_by_species": ("appointments", "patients"),
+    "top_items": ("invoices", "invoice_items"),
+    "busiest_days": ("appointments",),
+    "appointments_by_vet": ("appointments",),
+}
+
+register_query(
+    "analytics.revenue_by_month",
+    """
+    SELECT strftime('%Y-%m', created_at) AS month, SUM(final_amount)
+      FROM invoices
+     WHERE DATE(created_at) BETWEEN DATE(:start) AND DATE(:end)
+     GROUP BY month
+     ORDER BY month
+    """,
+)
+# Not date-filtered: every open balance
+register_query(
+    "analytics.unpaid_invoices",
+    """
+    SELECT i.invoice_id, i.appointment_id, p.name,
+           (i.final_amount - i.paid_total) AS due,
+           i.created_at
+      FROM invoices i
+      JOIN appointments a ON i.appointment_id = a.appointment_id
+      JOIN patients p ON a.patient_id = p.patient_id
+     WHERE i.payment_status != 'Paid'
+    """,
+)
+register_query(
+    "analytics.appointments_by_species",
+    """
+    SELECT p.species, COUNT(*)
+      FROM appointments a
+      JOIN patients p ON a.patient_id = p.patient_id
+     WHERE DATE(a.date_time) BETWEEN DATE(:start) AND DATE(:end)
+     GROUP BY p.species
+    """,
+)
+register_query(
+    "analytics.top_items",
+    """
+    SELECT ii.description, SUM(ii.quantity) AS total_sold
+      FROM invoice_items ii
+      JOIN invoices i ON i.invoice_id = ii.invoice_id
+     WHERE DATE(i.created_at) BETWEEN DATE(:start) AND DATE(:end)
+     GROUP BY ii.description
+     ORDER BY total_sold DESC
+     LIMIT 10
+    """,
+)
+register_query(
+    "analytics.busiest_days",
+    """
+    SELECT strftime('%w', date_time) AS weekday, COUNT(*)
+      FROM appointments
+     WHERE DATE(date_time) BETWEEN DATE(:start) AND DATE(:end)
+     GROUP BY weekday
+    """,
+)
+register_query(
+    "analytics.appointments_by_vet",
+    """
+    SELECT a.veterinarian, COUNT(*)
+      FROM appointments a
+     WHERE a.veterinarian IS NOT NULL AND a.veterinarian != ''
+       AND DATE(a.date_time) BETWEEN DATE(:start) AND DATE(:end)
+     GROUP BY a.veterinarian
+    """,
+)
+register_query(
+    "analytics.data_versions",
+    """
+    SELECT d.table_name, d.version
+      FROM json_each(:tables) j
+      JOIN data_versions d ON d.table_name = j.value
+    """,
+)
+
+USE_COLUMNS = analytics_columns.available() and not os.getenv(
+    "PETWELLNESS_ANALYTICS_SQL"
+)
+
+_lock = threading.Lock()
+_cache: dict = {}  # (name, start, end) -> (versions, rows), oldest first
+CACHE_MAX_ENTRIES = 64
+_frames: dict = {}  # analytics_columns frame -> (versions, arrays)
+_stats = {"hits": 0, "misses": 0, "frame_loads": 0}
+
+
+def data_versions(conn, tables) -> tuple:
+    """((table, version), ...) for `tables`, sorted by table name."""
+    rows = run_query(conn, "analytics.data_versions", {"tables": json.dumps(tables)})
+    return tuple(sorted(rows))
+
+
+def fetch(name: str, start: str | None = None, end: str | None = None) -> list:
+    """Rows of report `name` for [start, end], recomputed only after writes."""
+    try:
+        tables = REPORT_TABLES[name]
+    except KeyError:
+        raise KeyError(f"Unknown analytics report {name!r}") from None
+    key = (name, start, end)
+    conn = _connect()
+    try:
+        versions = data_versions(conn, tables)
+        with _lock:
+            cached = _cache.get(key)
+            if cached is not None and cached[0] == versions:
+                _stats["hits"] += 1
+                return cached[1]
+        # Read the versions and the rows in one snapshot so a write landing in
+        # between can't be cached under the older versions.
+        conn.execute("BEGIN")
+        try:
+            versions = data_versions(conn, tables)
+            if USE_COLUMNS and name in analytics_columns.REPORTS:
+                frame_name, report = analytics_columns.REPORTS[name]
+                rows = report(_frame(conn, frame_name), start, end)
+            else:
+                rows = run_query(
+                    conn, f"analytics.{name}", {"start": start, "end": end}
+                ).fetchall()
+        finally:
+            conn.execute("COMMIT")
+    finally:
+        conn.close()
+    with _lock:
+        _stats["misses"] += 1
+        _cache.pop(key, None)
+        _cache[key] = (versions, rows)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            del _cache[next(iter(_cache))]
+    return rows
+
+
+def _frame(conn, name: str) -> dict:
+    """analytics_columns frame `name`, reloaded if its tables were written."""
+    versions = data_versions(conn, analytics_columns.FRAMES[name][0])
+    with _lock:
+        cached = _frames.get(name)
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+    frame = analytics_columns.load(conn, name)
+    with _lock:
+        _stats["frame_loads"] += 1
+        _frames[name] = (versions, frame)
+    return frame
+
+
+def cache_stats() -> dict[str, int]:
+    with _lock:
+        return dict(_stats, entries=len(_cache))
+
+
+def clear() -> None:
+    with _lock:
+        _cache.clear()
+        _frames.clear()
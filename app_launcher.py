@@ -1,24 +1,31 @@
 # app_launcher.py
 
+import time
+
+_T_START = time.perf_counter()  # before the imports below: startup "imports" phase
+
+import multiprocessing
 import os
 import sys
 import traceback
 
+from PySide6.QtCore import Qt
 from PySide6.QtGui import QIcon, QPixmap
 from PySide6.QtWidgets import QApplication, QMessageBox, QSplashScreen
 
 from backup import (
     DB_PATH,
     STYLE_QSS,  # central paths
-    auto_daily_backup_if_needed,
     ensure_seed_db,
 )
-from db import open_conn
-from logger import log_error
+from db import open_conn, table_names
+from init_db import STOCK_SOURCE_INDEX, schema_current
+from logger import log_error, setup_error_logging
 
 from login_screen import LoginWindow
 from main_window import MainWindow
-from updater import check_for_update, start_update_flow
+from startup_tasks import StartupTasks
+from updater import start_update_flow
 
 
 # ---------- resource helper (works in dev and frozen) ----------
@@ -33,6 +40,24 @@ def resource_path(relative_path: str) -> str:
     return os.path.join(os.path.dirname(os.path.abspath(__file__)), relative_path)
 
 
+# ---------- startup phase timings ----------
+class _StartupTimer:
+    """Milliseconds spent per launch phase, printed once the login window shows."""
+
+    def __init__(self, start: float):
+        self.phases: dict[str, float] = {}
+        self._last = start
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases[phase] = (now - self._last) * 1000
+        self._last = now
+
+    def summary(self) -> str:
+        parts = ", ".join(f"{name} {ms:.0f}" for name, ms in self.phases.items())
+        return f"Startup {sum(self.phases.values()):.0f} ms ({parts})"
+
+
 def required_tables() -> list[str]:
     # core tables needed before UI touches DB
     return [
@@ -45,6 +70,7 @@ def required_tables() -> list[str]:
         "payment_history",
         "items",
         "stock_movements",
+        "item_stock",
         "reminders",
         "prescriptions",
     ]
@@ -52,39 +78,45 @@ def required_tables() -> list[str]:
 
 def tables_present() -> set[str]:
     try:
-        with open_conn() as con:
-            cur = con.cursor()
-            cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            return {row[0] for row in cur.fetchall()}
+        return set(table_names())
     except Exception:
         return set()
 
 
+def schema_outdated() -> bool:
+    """True if the DB's schema fingerprint isn't this build's (see init_db)."""
+    try:
+        return not schema_current()
+    except Exception:
+        return True
+
+
 def ensure_core_schema() -> None:
     """
     Make sure essential tables exist BEFORE any UI touches the DB.
-    1) Run init_db.main() (idempotent, preferred).
+    0) Fast path: the schema fingerprint matches this build, so every table,
+       index and migration is in place; one read, no DDL.
+    1) Run init_db.main() (idempotent, preferred) if tables are missing or the
+       schema fingerprint is stale.
     2) Re-check, then do a tiny emergency bootstrap for inventory tables if still missing.
     3) Final smoke test: assert all required tables exist; fail early if not.
     """
-    must_have = required_tables()
+    if not schema_outdated():
+        return
 
-    # First pass
-    have = tables_present()
-    need = [t for t in must_have if t not in have]
+    must_have = required_tables()
 
-    if need:
-        # 1) Preferred: run your initializer
-        try:
-            from init_db import main as init_db_main
+    # 1) Preferred: run your initializer (one transaction, records the fingerprint)
+    try:
+        from init_db import main as init_db_main
 
-            init_db_main()  # should use CREATE TABLE IF NOT EXISTS everywhere
-        except Exception as e:
-            log_error(f"init_db.main() failed: {e}")  # non-fatal for now
+        init_db_main()  # should use CREATE TABLE IF NOT EXISTS everywhere
+    except Exception as e:
+        log_error(f"init_db.main() failed: {e}")  # non-fatal for now
 
-        # 2) Re-check what's still missing after init_db
-        have = tables_present()
-        need = [t for t in must_have if t not in have]
+    # 2) Re-check what's still missing after init_db
+    have = tables_present()
+    need = [t for t in must_have if t not in have]
 
     # 3) Emergency fallback (keep minimal)
     try:
@@ -112,10 +144,25 @@ def ensure_core_schema() -> None:
                       change_qty   INTEGER NOT NULL,
                       reason       TEXT,
                       timestamp    TEXT    NOT NULL,
+                      source_doc_type TEXT,
+                      source_doc_id   INTEGER,
+                      line_no         INTEGER,
                       FOREIGN KEY (item_id) REFERENCES items(item_id)
                     );
                 """
                 )
+                con.execute(STOCK_SOURCE_INDEX)
+        if "item_stock" in need:
+            with open_conn() as con:
+                con.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS item_stock (
+                      item_id     INTEGER PRIMARY KEY REFERENCES items(item_id) ON DELETE CASCADE,
+                      on_hand     INTEGER NOT NULL DEFAULT 0,
+                      updated_at  TEXT
+                    );
+                """
+                )
     except Exception as e:
         log_error(f"Emergency inventory bootstrap failed: {e}")
 
@@ -135,7 +182,30 @@ def ensure_core_schema() -> None:
         pass
 
 
+def on_daily_backup(path) -> None:
+    if path:
+        print(f"Daily backup written to: {path}")
+
+
+def show_update_banner(appcast: dict) -> None:
+    """Update banner, shown when the background check finds a newer release."""
+    try:
+        m = QMessageBox()
+        m.setWindowTitle("Update available")
+        m.setText(
+            f"PetWellnessApp {appcast['latest']} is available.\n\n{appcast.get('notes', '')}"
+        )
+        m.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+        if m.exec() == QMessageBox.Yes:
+            start_update_flow(appcast)
+    except Exception as e:
+        # Non-fatal; log and continue
+        log_error(f"Update banner failed: {e}")
+
+
 def launch_app():
+    timer = _StartupTimer(_T_START)
+    timer.mark("imports")
     app = QApplication(sys.argv)
 
     # App/window icon (works in dev & PyInstaller)
@@ -146,16 +216,31 @@ def launch_app():
     splash = QSplashScreen(QPixmap(splash_img))
     splash.show()
     app.processEvents()
-
+    timer.mark("splash")
 
     # 1) Ensure DB file exists
     ensure_seed_db()  # creates empty DB if missing (or copies a seed)
+    setup_error_logging()
+    timer.mark("db_file")
 
     # 2) Ensure schema BEFORE creating any UI
     ensure_core_schema()
-
-    # 3) Daily backup after schema is in place
-    auto_daily_backup_if_needed()
+    timer.mark("schema")
+
+    # 3) Daily backup + update check on worker threads; the banner and the
+    #    backup result arrive later as signals (see show_update_banner)
+    tasks = StartupTasks(app)
+    tasks.backup_progress.connect(
+        lambda done, total: splash.showMessage(
+            f"Backing up database… {done * 100 // max(total, 1)}%",
+            Qt.AlignBottom | Qt.AlignHCenter,
+        )
+    )
+    tasks.backup_finished.connect(on_daily_backup)
+    tasks.update_available.connect(show_update_banner)
+    app.aboutToQuit.connect(tasks.wait)  # let a running backup complete
+    tasks.start()
+    timer.mark("start_tasks")
 
     # 4) Styles –†prefer centralized STYLE_QSS; fallback to /style/style.qss
     applied_style = False
@@ -172,26 +257,12 @@ def launch_app():
             print(f"Style not applied from {candidate}: {e}")
     if not applied_style:
         print("Running without styles.")
+    timer.mark("styles")
 
     # 5) Instantiate screens
     login_window = LoginWindow()
     main_window = MainWindow()
-
-    # 6) Update check banner
-    try:
-        appcast = check_for_update()
-        if appcast:
-            m = QMessageBox()
-            m.setWindowTitle("Update available")
-            m.setText(
-                f"PetWellnessApp {appcast['latest']} is available.\n\n{appcast.get('notes', '')}"
-            )
-            m.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
-            if m.exec() == QMessageBox.Yes:
-                start_update_flow(appcast)
-    except Exception as e:
-        # Non-fatal; log and continue
-        log_error(f"Update check failed: {e}")
+    timer.mark("windows")
 
     def on_logged_in(username, role):
         main_window.set_user_context(username, role)
@@ -205,6 +276,8 @@ def launch_app():
 
         # Hide splash once first window is ready
         splash.finish(login_window)
+        timer.mark("login_shown")
+        print(timer.summary())
         sys.exit(app.exec())
     except Exception:
         err_trace = traceback.format_exc()
@@ -220,4 +293,5 @@ def launch_app():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # invoice_export workers in the frozen build
     launch_app()
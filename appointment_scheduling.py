@@ -28,6 +28,7 @@ from PySide6.QtWidgets import (
 )
 
 from db import connect as get_conn
+from db import query_scalar, run_query
 from logger import log_error
 from notifications import send_email
 
@@ -457,17 +458,11 @@ class AppointmentSchedulingScreen(QWidget):
                 )
 
                 # Conflict check (same vet overlapping)
-                cur.execute(
-                    """
-                    SELECT COUNT(*)
-                      FROM appointments
-                     WHERE veterinarian = ?
-                       AND datetime(date_time, '+' || duration_minutes || ' minutes') > ?
-                       AND date_time < ?
-                    """,
-                    (vet, dt_start_str, dt_end_str),
+                conflict_count = query_scalar(
+                    "appointments.vet_conflicts",
+                    (vet, None, dt_start_str, dt_end_str),
+                    conn=conn,
                 )
-                (conflict_count,) = cur.fetchone()
                 if conflict_count:
                     QMessageBox.warning(
                         self,
@@ -548,16 +543,11 @@ class AppointmentSchedulingScreen(QWidget):
         conn = get_conn()
         cur = conn.cursor()
         # Conflict check excluding current appt
-        cur.execute(
-            """
-            SELECT COUNT(*) FROM appointments
-             WHERE veterinarian = ? AND appointment_id != ?
-               AND datetime(date_time, '+' || duration_minutes || ' minutes') > ?
-               AND date_time < ?
-            """,
+        conflicts = query_scalar(
+            "appointments.vet_conflicts",
             (vet, self.selected_appointment_id, date_time, dt_end_str),
+            conn=conn,
         )
-        (conflicts,) = cur.fetchone()
         if conflicts:
             QMessageBox.warning(
                 self,
@@ -905,19 +895,9 @@ class AppointmentSchedulingScreen(QWidget):
 
             conn = get_conn()
             cur = conn.cursor()
-            cur.execute(
-                """
-                SELECT a.appointment_id, a.date_time, a.reason, a.status,
-                       p.owner_email, p.owner_name
-                  FROM appointments a
-                  JOIN patients p ON a.patient_id = p.patient_id
-                 WHERE a.date_time BETWEEN ? AND ?
-                   AND a.notification_status = 'Not Sent'
-                   AND a.status IN ('Scheduled','To be Confirmed')
-                """,
-                (start, end),
-            )
-            rows = cur.fetchall()
+            rows = run_query(
+                conn, "appointments.reminder_candidates", (start, end)
+            ).fetchall()
 
             sent_ids = []
             for appt_id, dt_str, reason, status, email, owner_name in rows:
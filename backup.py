@@ -2,12 +2,18 @@ import os
 import shutil
 import sqlite3
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 
+import backup_engine
+
 APP_DIR_NAME = "PetCareSuite-Desktop"
 DB_FILE_NAME = "vet_management.db"
 RETENTION_DAYS = 14  # keep last 14 daily backups
+BACKUP_PAGES = 1024  # pages copied per backup step
+BACKUP_SLEEP = 0.002  # pause between steps so app queries get the disk
+# Daily snapshots store only the pages changed since the previous one
+BACKUP_INCREMENTAL = bool(os.getenv("PETWELLNESS_BACKUP_INCREMENTAL"))
 ASSETS_DIR = "assets"  # bundled, read-only
 
 
@@ -54,43 +60,41 @@ def ensure_seed_db(seed_path: str | os.PathLike | None = None) -> None:
             conn.close()
 
 
-def _sqlite_backup(src: Path, dst: Path) -> None:
-    with sqlite3.connect(src) as s, sqlite3.connect(dst) as d:
-        s.backup(d)
-
-
-def backup_now() -> Path:
-    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    dst = BACKUP_DIR / f"vet_management-{ts}.db"
-    _sqlite_backup(DB_PATH, dst)
-    return dst
+def backup_now(progress=None, incremental: bool | None = None) -> Path:
+    """
+    Compressed, integrity-checked snapshot of DB_PATH (see backup_engine).
+    incremental=None follows BACKUP_INCREMENTAL.
+    """
+    if incremental is None:
+        incremental = BACKUP_INCREMENTAL
+    return backup_engine.snapshot(
+        DB_PATH,
+        BACKUP_DIR,
+        incremental=incremental,
+        pages=BACKUP_PAGES,
+        sleep=BACKUP_SLEEP,
+        progress=progress,
+    )
 
 
 def _cleanup_old_backups() -> None:
-    cutoff = datetime.now() - timedelta(days=RETENTION_DAYS)
-    for f in BACKUP_DIR.glob("vet_management-*.db"):
-        try:
-            dt = datetime.strptime(
-                f.stem.replace("vet_management-", ""), "%Y%m%d_%H%M%S"
-            )
-            if dt < cutoff:
-                f.unlink(missing_ok=True)
-        except Exception:
-            pass
+    try:
+        backup_engine.cleanup(BACKUP_DIR, RETENTION_DAYS)
+    except Exception:
+        pass
 
 
 def _marker_file() -> Path:
     return BACKUP_DIR / "last_daily_backup.txt"
 
 
-def auto_daily_backup_if_needed() -> Path | None:
+def auto_daily_backup_if_needed(progress=None) -> Path | None:
     BACKUP_DIR.mkdir(parents=True, exist_ok=True)
     marker = _marker_file()
     today = datetime.now().strftime("%Y-%m-%d")
     last = marker.read_text().strip() if marker.exists() else ""
     if last != today:
-        path = backup_now()
+        path = backup_now(progress)
         marker.write_text(today, encoding="utf-8")
         _cleanup_old_backups()
         return path
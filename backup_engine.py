@@ -0,0 +1,446 @@
+# backup_engine.py
+"""
+Online snapshots of the clinic database: paged, compressed, verified and
+optionally incremental.
+
+    path = snapshot(DB_PATH, BACKUP_DIR)                     # full
+    path = snapshot(DB_PATH, BACKUP_DIR, incremental=True)   # changed pages only
+    cleanup(BACKUP_DIR, retention_days=14)
+
+A snapshot is first copied with the SQLite backup API, `pages` pages per step
+with a `sleep` pause between steps, from one read snapshot of the source (in
+WAL mode writers carry on; the copy never restarts). The copy must pass
+PRAGMA integrity_check, then it is streamed to disk compressed (zstd when the
+optional `zstandard` package is installed, gzip otherwise) and the plain copy
+is deleted.
+
+Files in the backup folder:
+    vet_management-<ts>.db.gz|.zst    full copy; gunzip / zstd -d gives the .db
+    vet_management-<ts>.inc.gz|.zst   pages changed since `parent` (see below)
+    vet_management-<ts>.db            pre-compression backups, still listed
+    vet_management.pages              page digests of the newest snapshot
+
+An increment is a 4-byte length + JSON header {format, parent, depth,
+page_size, page_count, pages} followed by `pages` records of a 4-byte page
+number and the page. Pages are compared by BLAKE2b digests kept in the
+manifest, so an increment never reads its parent. A full snapshot is taken
+instead when there is no usable parent, the page size changed, or the chain
+already has CHAIN_MAX increments. rebuild() turns any snapshot back into a
+database file.
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import struct
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # optional: gzip is used without it
+    zstandard = None
+
+PREFIX = "vet_management-"
+MANIFEST = "vet_management.pages"
+FORMAT = 1
+PAGES = 1024  # pages copied per backup step
+SLEEP = 0.002  # seconds between steps
+CHAIN_MAX = 6  # increments before the next full snapshot
+GZIP_LEVEL = 1  # level 6 is ~3x slower for ~2% smaller files
+ZSTD_LEVEL = 3
+DIGEST_SIZE = 16
+COMPRESSION = "zstd" if zstandard is not None else "gzip"
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+_TS_FORMAT = "%Y%m%d_%H%M%S"
+_PAGE_NO = struct.Struct(">I")
+
+
+class BackupError(RuntimeError):
+    pass
+
+
+# --- Copy + verify ---
+def copy_database(src, dst, *, pages: int = PAGES, sleep: float = SLEEP, progress=None):
+    """
+    Online copy of `src` into `dst`, `pages` pages per step. progress(done,
+    total) is called with page counts after each step.
+    """
+    s = sqlite3.connect(src, isolation_level=None, timeout=8)
+    d = sqlite3.connect(dst, isolation_level=None)
+    try:
+        if s.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+            # Hold one read snapshot: writers are not blocked in WAL mode, and
+            # steps never see (and restart on) their commits.
+            s.execute("BEGIN")
+            s.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        else:
+            pages = -1  # a rollback journal would restart on every write
+
+        def on_step(_status, remaining, total):
+            if progress is not None:
+                progress(total - remaining, total)
+            if sleep and remaining:
+                time.sleep(sleep)
+
+        s.backup(d, pages=pages, progress=on_step)
+        if s.in_transaction:
+            s.execute("COMMIT")
+        d.execute("PRAGMA journal_mode=DELETE")  # self-contained file, no -wal
+    finally:
+        d.close()
+        s.close()
+
+
+def check_integrity(path) -> tuple[int, int]:
+    """
+    (page size, page count) of the database at `path`; raises BackupError
+    unless PRAGMA integrity_check passes.
+    """
+    conn = sqlite3.connect(f"file:{Path(path).as_posix()}?mode=ro", uri=True)
+    try:
+        problems = [r[0] for r in conn.execute("PRAGMA integrity_check")]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    except sqlite3.DatabaseError as e:  # too damaged to check at all
+        problems = [str(e)]
+    finally:
+        conn.close()
+    if problems != ["ok"]:
+        raise BackupError(f"integrity_check failed on {path}: {problems[:5]}")
+    return page_size, page_count
+
+
+# --- Compressed streams ---
+def _compression(path) -> str | None:
+    for name, suffix in SUFFIXES.items():
+        if str(path).endswith(suffix):
+            return name
+    return None
+
+
+def _open_write(path):
+    if _compression(path) == "zstd":
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        return compressor.stream_writer(open(path, "wb"))
+    return gzip.open(path, "wb", compresslevel=GZIP_LEVEL)
+
+
+def _open_read(path):
+    kind = _compression(path)
+    if kind == "zstd":
+        if zstandard is None:
+            raise BackupError(f"{path} needs the zstandard package")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+    if kind == "gzip":
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _read_exact(fh, n: int) -> bytes:
+    """n bytes from `fh` (decompressing readers may return fewer per call)."""
+    buf = fh.read(n)
+    while len(buf) < n:
+        more = fh.read(n - len(buf))
+        if not more:
+            raise BackupError("backup file is truncated")
+        buf += more
+    return buf
+
+
+def _read_header(fh) -> dict:
+    (size,) = _PAGE_NO.unpack(_read_exact(fh, _PAGE_NO.size))
+    header = json.loads(_read_exact(fh, size))
+    if header.get("format") != FORMAT:
+        raise BackupError(f"unknown increment format {header.get('format')!r}")
+    return header
+
+
+def read_header(path) -> dict:
+    """JSON header of the increment at `path`."""
+    with _open_read(path) as fh:
+        return _read_header(fh)
+
+
+# --- Snapshots ---
+def is_increment(path) -> bool:
+    return ".inc" in Path(path).name
+
+
+def snapshot_time(path) -> datetime | None:
+    name = Path(path).name
+    if not name.startswith(PREFIX):
+        return None
+    try:
+        return datetime.strptime(name[len(PREFIX):][:15], _TS_FORMAT)
+    except ValueError:
+        return None
+
+
+def list_snapshots(backup_dir) -> list[Path]:
+    """Snapshot files in `backup_dir`, oldest first."""
+    found = [
+        p
+        for p in Path(backup_dir).glob(f"{PREFIX}*")
+        if snapshot_time(p) is not None and not p.name.endswith(".part")
+    ]
+    return sorted(found, key=lambda p: (snapshot_time(p), p.name))
+
+
+def _load_manifest(backup_dir) -> tuple[dict, bytes] | None:
+    try:
+        with open(Path(backup_dir) / MANIFEST, "rb") as fh:
+            header = json.loads(fh.readline())
+            return header, fh.read()
+    except (OSError, ValueError):
+        return None
+
+
+def _save_manifest(backup_dir, header: dict, digests: bytes) -> None:
+    path = Path(backup_dir) / MANIFEST
+    part = Path(f"{path}.part")
+    with open(part, "wb") as fh:
+        fh.write(json.dumps(header).encode() + b"\n")
+        fh.write(digests)
+    os.replace(part, path)
+
+
+def _incremental_parent(backup_dir, page_size: int):
+    """(manifest header, digests) to diff against, or None for a full snapshot."""
+    manifest = _load_manifest(backup_dir)
+    if manifest is None:
+        return None
+    header, digests = manifest
+    if (
+        header.get("format") != FORMAT
+        or header.get("page_size") != page_size
+        or header.get("depth", 0) >= CHAIN_MAX
+        or len(digests) != header.get("page_count", -1) * DIGEST_SIZE
+        or not (Path(backup_dir) / header.get("snapshot", "")).is_file()
+    ):
+        return None
+    return header, digests
+
+
+def _claim_name(backup_dir: Path) -> tuple[str, Path]:
+    """
+    (stem, scratch copy path) for a new snapshot. Names have one-second
+    resolution, so a second backup within the same second waits for the next.
+    """
+    while True:
+        now = datetime.now()
+        stem = PREFIX + now.strftime(_TS_FORMAT)
+        copy = backup_dir / f"{stem}.db.part"
+        if not any(backup_dir.glob(f"{stem}.*")):
+            try:
+                copy.touch(exist_ok=False)  # claims it against a concurrent backup
+                return stem, copy
+            except FileExistsError:
+                pass
+        time.sleep(1 - now.microsecond / 1e6)
+
+
+def snapshot(
+    src,
+    backup_dir,
+    *,
+    incremental: bool = False,
+    compression: str = COMPRESSION,
+    pages: int = PAGES,
+    sleep: float = SLEEP,
+    progress=None,
+) -> Path:
+    """
+    Back up `src` into `backup_dir` and return the snapshot path. progress(done,
+    total) covers the copy and then the compressed write (total = 2 x pages).
+    """
+    if compression == "zstd" and zstandard is None:
+        raise BackupError("zstd compression needs the zstandard package")
+    backup_dir = Path(backup_dir)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    stem, copy = _claim_name(backup_dir)
+    out = None
+    try:
+        def on_copy(done, total):
+            if progress is not None:
+                progress(done, 2 * total)
+
+        copy_database(src, copy, pages=pages, sleep=sleep, progress=on_copy)
+        page_size, page_count = check_integrity(copy)
+        parent = _incremental_parent(backup_dir, page_size) if incremental else None
+        kind = "inc" if parent else "db"
+        out = backup_dir / f"{stem}.{kind}{SUFFIXES[compression]}"
+        part = Path(f"{out}.part")
+
+        def on_write(done):
+            if progress is not None:
+                progress(page_count + done, 2 * page_count)
+
+        digests = _write_snapshot(
+            copy, part, page_size, page_count, parent, on_write, pages, sleep
+        )
+        os.replace(part, out)
+        depth = parent[0]["depth"] + 1 if parent else 0
+        _save_manifest(
+            backup_dir,
+            {
+                "format": FORMAT,
+                "snapshot": out.name,
+                "depth": depth,
+                "page_size": page_size,
+                "page_count": page_count,
+            },
+            digests,
+        )
+        return out
+    finally:
+        copy.unlink(missing_ok=True)
+        if out is not None:
+            Path(f"{out}.part").unlink(missing_ok=True)
+
+
+def _write_snapshot(
+    copy, part, page_size, page_count, parent, on_write, pages, sleep
+) -> bytes:
+    """Stream `copy` (whole, or its changed pages) into `part`; its digests."""
+    old = parent[1] if parent else b""
+    changed = []  # page numbers (1-based) that differ from the parent
+    digests = bytearray()
+    chunk = page_size * max(pages, 1)
+    with open(copy, "rb") as src, _open_write(part) as dst:
+        if parent:
+            # Header first: `pages` is only known after the diff, so the
+            # changed pages are found in a first pass over the copy.
+            for offset in range(0, page_count * page_size, chunk):
+                block = src.read(chunk)
+                for i in range(0, len(block), page_size):
+                    digest = hashlib.blake2b(
+                        block[i:i + page_size], digest_size=DIGEST_SIZE
+                    ).digest()
+                    at = len(digests)
+                    if old[at:at + DIGEST_SIZE] != digest:
+                        changed.append(at // DIGEST_SIZE + 1)
+                    digests += digest
+            header = json.dumps(
+                {
+                    "format": FORMAT,
+                    "parent": parent[0]["snapshot"],
+                    "depth": parent[0]["depth"] + 1,
+                    "page_size": page_size,
+                    "page_count": page_count,
+                    "pages": len(changed),
+                }
+            ).encode()
+            dst.write(_PAGE_NO.pack(len(header)) + header)
+            for n, page_no in enumerate(changed, 1):
+                src.seek((page_no - 1) * page_size)
+                dst.write(_PAGE_NO.pack(page_no) + src.read(page_size))
+                if n % max(pages, 1) == 0:
+                    on_write(page_no)
+                    if sleep:
+                        time.sleep(sleep)
+        else:
+            for offset in range(0, page_count * page_size, chunk):
+                block = src.read(chunk)
+                for i in range(0, len(block), page_size):
+                    digests += hashlib.blake2b(
+                        block[i:i + page_size], digest_size=DIGEST_SIZE
+                    ).digest()
+                dst.write(block)
+                on_write(offset // page_size + len(block) // page_size)
+                if sleep:
+                    time.sleep(sleep)
+    on_write(page_count)
+    return bytes(digests)
+
+
+def parent_of(path) -> Path | None:
+    """Snapshot the increment at `path` was taken against (None for a full)."""
+    if not is_increment(path):
+        return None
+    return Path(path).with_name(read_header(path)["parent"])
+
+
+def chain(path) -> list[Path]:
+    """`path` and the snapshots it depends on, full snapshot first."""
+    out = [Path(path)]
+    while is_increment(out[-1]):
+        parent = parent_of(out[-1])
+        if not parent.is_file():
+            raise BackupError(f"{out[-1].name} needs missing {parent.name}")
+        out.append(parent)
+    return out[::-1]
+
+
+def rebuild(path, dst, *, progress=None) -> tuple[int, int]:
+    """
+    Write the database as of snapshot `path` to `dst`: its full snapshot is
+    decompressed once, then each increment's pages are written over it in
+    order. progress(done, total) counts chain links. Returns (page size, page
+    count) of the result, which must pass PRAGMA integrity_check.
+    """
+    links = chain(path)
+    with _open_read(links[0]) as src, open(dst, "wb") as out:
+        shutil.copyfileobj(src, out, 1 << 20)
+    if progress is not None:
+        progress(1, len(links))
+    with open(dst, "r+b") as out:
+        for n, link in enumerate(links[1:], 2):
+            with _open_read(link) as fh:
+                header = _read_header(fh)
+                size = header["page_size"]
+                for _ in range(header["pages"]):
+                    record = _read_exact(fh, _PAGE_NO.size + size)
+                    (page_no,) = _PAGE_NO.unpack_from(record)
+                    out.seek((page_no - 1) * size)
+                    out.write(memoryview(record)[_PAGE_NO.size:])
+            # Pages past the end were all in this increment; drop freed ones
+            out.truncate(header["page_count"] * size)
+            if progress is not None:
+                progress(n, len(links))
+    return check_integrity(dst)
+
+
+# --- Retention ---
+def cleanup(backup_dir, retention_days: int) -> list[Path]:
+    """
+    Delete snapshots older than `retention_days`, except the full snapshot and
+    increments that a kept increment (or the manifest) still builds on.
+    """
+    snapshots = list_snapshots(backup_dir)
+    cutoff = datetime.now() - timedelta(days=retention_days)
+    keep = {p for p in snapshots if snapshot_time(p) >= cutoff}
+    manifest = _load_manifest(backup_dir)
+    if manifest is not None:
+        keep.add(Path(backup_dir) / manifest[0].get("snapshot", ""))
+    for p in list(keep):
+        try:
+            keep.update(chain(p) if p.is_file() else ())
+        except (BackupError, OSError, ValueError):
+            pass  # broken chain: keep what is there, drop nothing it names
+    removed = []
+    for p in snapshots:
+        if p not in keep:
+            p.unlink(missing_ok=True)
+            removed.append(p)
+    return removed
+
+
+if __name__ == "__main__":
+    # python backup_engine.py [--incremental]
+    from backup import BACKUP_DIR, DB_PATH
+
+    t0 = time.perf_counter()
+    try:
+        path = snapshot(DB_PATH, BACKUP_DIR, incremental="--incremental" in sys.argv)
+    except (BackupError, OSError, sqlite3.Error) as e:
+        print(f"Backup failed: {e}")
+        sys.exit(1)
+    print(
+        f"{path} ({os.path.getsize(path) / 1e6:.1f} MB, "
+        f"{time.perf_counter() - t0:.1f}s)"
+    )
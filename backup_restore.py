@@ -0,0 +1,196 @@
+# backup_restore.py
+"""
+List, verify and restore the snapshots written by backup_engine.
+
+    for snap in snapshots():          # oldest first
+        print(snap["name"], snap["time"], snap["size"], snap["kind"])
+    verify(path)                      # rebuild into a scratch file, integrity_check
+    restore(path)                     # or restore(snapshot_at(datetime(...)))
+
+restore() rebuilds the snapshot (full copy, then its increments' pages) into
+"<db>.restore" next to DB_PATH, checks it, keeps a snapshot of the database
+being replaced (an increment on the newest snapshot, so it is cheap), and only
+then swaps the file in with os.replace. The swap needs the database closed:
+pooled connections of this process are dropped (db.reset_pool) and it fails
+with BackupError while anything else has it open.
+
+    python backup_restore.py list
+    python backup_restore.py verify [SNAPSHOT ...]     # default: the newest
+    python backup_restore.py restore SNAPSHOT|"YYYY-MM-DD[ HH:MM]" [--no-safety-backup]
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import backup_engine
+import db
+from backup import BACKUP_DIR, DB_PATH
+from backup_engine import BackupError
+
+
+def snapshots(backup_dir=None) -> list[dict]:
+    """
+    Snapshots oldest first: name, path, time, kind ("full", "incremental" or
+    "legacy" for uncompressed .db), size on disk, and restore_size: bytes read
+    to rebuild it (its whole chain), None when the chain is broken.
+    """
+    out = []
+    for path in backup_engine.list_snapshots(backup_dir or BACKUP_DIR):
+        if backup_engine.is_increment(path):
+            kind = "incremental"
+        elif path.suffix == ".db":
+            kind = "legacy"
+        else:
+            kind = "full"
+        try:
+            restore_size = sum(p.stat().st_size for p in backup_engine.chain(path))
+        except (BackupError, OSError, ValueError):
+            restore_size = None
+        out.append(
+            {
+                "name": path.name,
+                "path": path,
+                "time": backup_engine.snapshot_time(path),
+                "kind": kind,
+                "size": path.stat().st_size,
+                "restore_size": restore_size,
+            }
+        )
+    return out
+
+
+def snapshot_at(when: datetime, backup_dir=None) -> Path:
+    """Newest restorable snapshot taken at or before `when`."""
+    for snap in reversed(snapshots(backup_dir)):
+        if snap["time"] <= when and snap["restore_size"] is not None:
+            return snap["path"]
+    raise BackupError(f"No snapshot at or before {when:%Y-%m-%d %H:%M}")
+
+
+def resolve(arg: str, backup_dir=None) -> Path:
+    """A snapshot path, file name in the backup folder, or ISO date/time."""
+    backup_dir = Path(backup_dir or BACKUP_DIR)
+    for path in (Path(arg), backup_dir / arg):
+        if path.is_file():
+            return path
+    try:
+        when = datetime.fromisoformat(arg)
+    except ValueError:
+        raise BackupError(f"No snapshot named {arg!r} in {backup_dir}") from None
+    if len(arg) <= 10:  # a bare date: the state at the end of that day
+        when = when.replace(hour=23, minute=59, second=59)
+    return snapshot_at(when, backup_dir)
+
+
+def verify(path) -> tuple[int, int]:
+    """Rebuild `path` into a scratch file and integrity-check it; (page size, pages)."""
+    scratch = Path(path).with_name(".verify.db.part")
+    try:
+        return backup_engine.rebuild(path, scratch)
+    finally:
+        scratch.unlink(missing_ok=True)
+
+
+def _release(target: Path) -> None:
+    """
+    Fold the WAL into `target` and leave WAL mode, which SQLite only allows
+    with no other connection open; raises BackupError while it is in use.
+    """
+    db.reset_pool()
+    conn = sqlite3.connect(target, isolation_level=None, timeout=2)
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        mode = conn.execute("PRAGMA journal_mode=DELETE").fetchone()[0]
+    except sqlite3.OperationalError as e:
+        raise BackupError(f"Database is in use, close the app first ({e})") from None
+    except sqlite3.DatabaseError:
+        mode = "delete"  # damaged file: its WAL goes with it
+    finally:
+        conn.close()
+    if mode != "delete":
+        raise BackupError("Database is in use, close the app first")
+    for suffix in ("-wal", "-shm"):
+        Path(f"{target}{suffix}").unlink(missing_ok=True)
+
+
+def _keep_current(target: Path, backup_dir: Path) -> Path:
+    """Snapshot of the database about to be replaced (raw copy if damaged)."""
+    try:  # a failed integrity_check is the usual reason to restore
+        return backup_engine.snapshot(target, backup_dir, incremental=True)
+    except (BackupError, sqlite3.DatabaseError):
+        damaged = backup_dir / f"damaged-{datetime.now():%Y%m%d_%H%M%S}.db"
+        shutil.copy2(target, damaged)
+        return damaged
+
+
+def restore(path, target=None, *, safety_backup: bool = True, progress=None) -> dict:
+    """
+    Replace `target` (DB_PATH) with the database as of snapshot `path`.
+    progress(done, total) counts rebuilt chain links.
+    """
+    t0 = time.perf_counter()
+    path, target = Path(path), Path(target or DB_PATH)
+    staging = target.with_name(f"{target.name}.restore")
+    try:
+        page_size, page_count = backup_engine.rebuild(path, staging, progress=progress)
+        kept = None
+        if target.exists():
+            _release(target)
+            if safety_backup:
+                kept = _keep_current(target, path.parent)
+        os.replace(staging, target)
+    finally:
+        staging.unlink(missing_ok=True)
+    db.reset_pool()
+    db.clear_schema_cache()
+    return {
+        "snapshot": path,
+        "links": len(backup_engine.chain(path)),
+        "bytes": page_size * page_count,
+        "safety_backup": kept,
+        "seconds": time.perf_counter() - t0,
+    }
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    command = args[0] if args else None
+    try:
+        if command == "list":
+            for snap in snapshots():
+                needs = (
+                    "broken chain"
+                    if snap["restore_size"] is None
+                    else f"restore reads {snap['restore_size'] / 1e6:.1f} MB"
+                )
+                print(
+                    f"{snap['time']:%Y-%m-%d %H:%M:%S}  {snap['kind']:<11}  "
+                    f"{snap['size'] / 1e6:9.1f} MB  {snap['name']}  ({needs})"
+                )
+        elif command == "verify":
+            targets = [resolve(a) for a in args[1:]] or [
+                backup_engine.list_snapshots(BACKUP_DIR)[-1]
+            ]
+            for path in targets:
+                page_size, pages = verify(path)
+                print(f"OK  {path.name}  ({page_size * pages / 1e6:.1f} MB database)")
+        elif command == "restore" and len(args) == 2:
+            result = restore(
+                resolve(args[1]), safety_backup="--no-safety-backup" not in sys.argv
+            )
+            if result["safety_backup"]:
+                print(f"Previous database kept as {result['safety_backup']}")
+            print(
+                f"Restored {result['snapshot'].name} ({result['links']} file(s), "
+                f"{result['bytes'] / 1e6:.1f} MB) in {result['seconds']:.1f}s"
+            )
+        else:
+            print(__doc__)
+            sys.exit(2)
+    except (BackupError, OSError, sqlite3.Error, IndexError) as e:
+        print(f"FAILED: {e}")
+        sys.exit(1)
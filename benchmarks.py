@@ -0,0 +1,1361 @@
+# benchmarks.py
+"""
+Micro-benchmarks for the data layer. Runs against a throwaway database:
+
+    python benchmarks.py            # run everything
+    python benchmarks.py pool       # run one benchmark by name
+
+PETWELLNESS_DB is pointed at a temp file BEFORE `db` is imported, so the
+clinic database is never touched.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+_TMP_DIR = tempfile.mkdtemp(prefix="petcare-bench-")
+os.environ.setdefault("PETWELLNESS_DB", os.path.join(_TMP_DIR, "bench.db"))
+
+
+def _timeit(fn, repeat: int) -> list[float]:
+    """Return per-call wall times in microseconds."""
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1e6)
+    return out
+
+
+def _report(label: str, samples: list[float]) -> float:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    mean = statistics.fmean(samples)
+    print(f"  {label:<28} mean {mean:9.1f} µs   p95 {p95:9.1f} µs")
+    return mean
+
+
+def _seed_db():
+    import init_db
+    from db import open_conn
+
+    init_db.main()
+    with open_conn() as con:
+        con.execute(
+            "INSERT INTO patients (name, species, owner_name) VALUES ('Rex','Dog','Ann')"
+        )
+        con.execute(
+            """INSERT INTO appointments (patient_id, date_time, reason, veterinarian, status)
+               VALUES (1, '2025-01-01 10:00', 'Checkup', 'Dr A', 'Completed')"""
+        )
+        con.execute(
+            """INSERT INTO invoices (invoice_date, appointment_id, patient_id, final_amount)
+               VALUES ('2025-01-01', 1, 1, 50)"""
+        )
+        con.executemany(
+            """INSERT INTO invoice_items (invoice_id, description, quantity, unit_price, total_price)
+               VALUES (1, ?, 1, 10, 10)""",
+            [(f"Line {i}",) for i in range(5)],
+        )
+
+
+# The pre-v7 "already deducted?" probe: one ledger lookup per line by reason text
+LEGACY_DEDUP_SQL = "SELECT COUNT(*) FROM stock_movements WHERE item_id = ? AND reason = ?"
+
+
+# --- Connection pool: pooled vs fresh connections on a billing "click" ---
+def bench_pool(repeat: int = 300):
+    """Replays the 4 queries behind BillingInvoicingScreen.load_invoice_by_id."""
+    import db
+
+    queries = (
+        ("SELECT appointment_id, final_amount FROM invoices WHERE invoice_id=?", (1,)),
+        (
+            (
+                "SELECT p.name, a.date_time FROM appointments a "
+                "JOIN patients p ON a.patient_id=p.patient_id WHERE a.appointment_id=?"
+            ),
+            (1,),
+        ),
+        ("SELECT description, quantity FROM invoice_items WHERE invoice_id=?", (1,)),
+        (
+            "SELECT COALESCE(SUM(amount_paid),0) FROM payment_history WHERE invoice_id=?",
+            (1,),
+        ),
+    )
+
+    def click(open_fn):
+        for sql, params in queries:
+            conn = open_fn()
+            conn.execute(sql, params).fetchall()
+            conn.close()
+
+    print("pool: per-click latency (4 queries, one connection each)")
+    before = _report("fresh connect + PRAGMAs", _timeit(lambda: click(db._open_raw), repeat))
+    after = _report("pooled db.connect()", _timeit(lambda: click(db.connect), repeat))
+    print(f"  speed-up x{before / after:.1f}   pool stats {db.pool_stats()}")
+
+
+# --- Query registry: prepared named statements vs ad-hoc SQL text ---
+def bench_registry(repeat: int = 2000):
+    """Hot paid-total lookup: ad-hoc SQL text vs the registered statement."""
+    import db
+
+    adhoc = [
+        f"SELECT COALESCE(paid_total, 0) FROM invoices WHERE invoice_id = {i}"
+        for i in range(repeat)
+    ]
+    it = iter(adhoc)
+
+    def literal():
+        with db.open_conn() as con:  # new SQL text each call -> re-parse
+            con.execute(next(it)).fetchone()
+
+    print("registry: paid-total lookup")
+    _report("inlined literal SQL", _timeit(literal, repeat))
+    _report(
+        "db.query_scalar (prepared)",
+        _timeit(lambda: db.query_scalar("invoice.paid_total", (1,)), repeat),
+    )
+    for name, st in db.query_stats().items():
+        print(f"  {name:<28} calls {st['calls']:6d}  hits {st['hits']:6d}  misses {st['misses']:3d}")
+
+
+# --- Materialized paid_total: invoice list without a correlated SUM per row ---
+def bench_paid_total(invoices: int = 50_000, repeat: int = 5):
+    """Full invoice-list balance column: correlated subquery vs invoices.paid_total."""
+    import db
+
+    with db.open_conn() as con:
+        base = con.execute("SELECT COALESCE(MAX(invoice_id), 0) FROM invoices").fetchone()[0]
+        con.execute("BEGIN")
+        con.executemany(
+            "INSERT INTO invoices (invoice_date, final_amount, remaining_balance) VALUES ('2025-01-01', 90, 90)",
+            [()] * invoices,
+        )
+        con.executemany(
+            "INSERT INTO payment_history (invoice_id, amount_paid) VALUES (?, 30)",
+            [(base + 1 + i // 2,) for i in range(invoices * 2)],
+        )
+        con.execute("COMMIT")
+
+    correlated = """
+        SELECT i.invoice_id,
+               i.final_amount - COALESCE((SELECT SUM(amount_paid) FROM payment_history
+                                           WHERE invoice_id = i.invoice_id), 0)
+          FROM invoices i ORDER BY i.invoice_id DESC
+    """
+    materialized = """
+        SELECT i.invoice_id, i.final_amount - i.paid_total
+          FROM invoices i ORDER BY i.invoice_id DESC
+    """
+
+    def run(sql):
+        with db.open_conn() as con:
+            return con.execute(sql).fetchall()
+
+    assert run(correlated) == run(materialized)
+    print(f"paid_total: balance column over {invoices} invoices")
+    before = _report("correlated SUM per row", _timeit(lambda: run(correlated), repeat))
+    after = _report("materialized paid_total", _timeit(lambda: run(materialized), repeat))
+    print(f"  speed-up x{before / after:.1f}")
+
+    with db.open_conn() as con:
+        con.execute("DELETE FROM payment_history WHERE invoice_id > ?", (base,))
+        con.execute("DELETE FROM invoices WHERE invoice_id > ?", (base,))
+
+
+# --- Z-report: re-aggregating raw rows vs the sales_rollup tables ---
+def bench_z_report(invoices: int = 50_000, days: int = 365, repeat: int = 10):
+    """One business day's Z-report over a year of invoices, lines and payments."""
+    import db
+    import reports
+    import sales_rollup
+
+    with db.open_conn() as con:
+        base = con.execute("SELECT COALESCE(MAX(invoice_id), 0) FROM invoices").fetchone()[0]
+        con.execute("BEGIN")
+        con.executemany(
+            """INSERT INTO invoices (invoice_date, discount, final_amount)
+               VALUES (DATE('2025-01-01', ?), ?, 119)""",
+            [(f"+{i % days} days", (i % 3) * 5) for i in range(invoices)],
+        )
+        con.executemany(
+            """INSERT INTO invoice_items (invoice_id, description, quantity, unit_price,
+                                          total_price, vat_pct, vat_amount)
+               VALUES (?, 'Line', 1, 100, ?, ?, ?)""",
+            [
+                (base + 1 + i // 3, *((105, 0.05, 5) if i % 3 else (119, 0.19, 19)))
+                for i in range(invoices * 3)
+            ],
+        )
+        con.executemany(
+            """INSERT INTO payment_history (invoice_id, payment_date, amount_paid,
+                                            payment_method)
+               VALUES (?, DATETIME('2025-01-01 09:00:00', ?), 119, ?)""",
+            [
+                (base + 1 + i, f"+{i % days} days", ("CASH", "CARD")[i % 2])
+                for i in range(invoices)
+            ],
+        )
+        con.execute("COMMIT")
+
+    day = "2025-06-30"
+    raw = {"start": day, "end": day}
+
+    def recompute():
+        # What get_z_report_data used to do: aggregate the day from raw rows
+        with db.open_conn() as con:
+            return [
+                con.execute(sql, raw).fetchall()
+                for sql in (
+                    sales_rollup._RAW_SALES_SQL,
+                    sales_rollup._RAW_TOTALS_SQL,
+                    sales_rollup._RAW_TENDERS_SQL,
+                )
+            ]
+
+    print(f"z_report: one day out of {invoices} invoices over {days} days")
+    before = _report("aggregate raw rows", _timeit(recompute, repeat))
+    after = _report(
+        "daily_sales_rollup", _timeit(lambda: reports.get_z_report_data(day, 0), repeat)
+    )
+    print(f"  speed-up x{before / after:.1f}   drifted days {sales_rollup.verify(fix=False)}")
+
+    print("z_report: June as a range vs one report per day")
+    june = [f"2025-06-{d:02d}" for d in range(1, 31)]
+    before = _report(
+        "30 x get_z_report_data",
+        _timeit(lambda: [reports.get_z_report_data(d, 0) for d in june], repeat),
+    )
+    after = _report(
+        "get_z_report_range",
+        _timeit(lambda: reports.get_z_report_range(june[0], june[-1], 0), repeat),
+    )
+    print(f"  speed-up x{before / after:.1f}")
+
+    with db.open_conn() as con:
+        con.execute("DELETE FROM invoices WHERE invoice_id > ?", (base,))
+
+
+# --- item_stock balances vs aggregating the stock_movements ledger ---
+def bench_stock(items: int = 500, movements: int = 200_000, repeat: int = 20):
+    """inventory.get_all_items(): GROUP BY over the ledger vs item_stock lookup."""
+    import db
+    import inventory
+
+    with db.open_conn() as con:
+        con.execute("BEGIN")
+        base = con.execute("SELECT COALESCE(MAX(item_id), 0) FROM items").fetchone()[0]
+        con.executemany(
+            "INSERT INTO items (name, reorder_threshold) VALUES (?, 5)",
+            [(f"Bench SKU {i}",) for i in range(items)],
+        )
+        for i in range(movements):
+            inventory.record_movement(con, base + 1 + i % items, 1 if i % 3 else -1, "bench")
+        con.execute("COMMIT")
+
+    ledger_sql = """
+        SELECT i.item_id, i.name, i.description, i.unit_cost, i.unit_price,
+               IFNULL(SUM(sm.change_qty),0) AS on_hand, i.reorder_threshold
+          FROM items i
+          LEFT JOIN stock_movements sm ON i.item_id=sm.item_id
+         GROUP BY i.item_id
+    """
+
+    def ledger():
+        with db.open_conn() as con:
+            return con.execute(ledger_sql).fetchall()
+
+    assert sorted(ledger()) == sorted(inventory.get_all_items())
+    print(f"stock: on-hand for {items} items over a {movements}-row ledger")
+    before = _report("SUM over stock_movements", _timeit(ledger, repeat))
+    after = _report("item_stock balances", _timeit(inventory.get_all_items, repeat))
+    print(f"  speed-up x{before / after:.1f}   drift {len(inventory.reconcile_stock(fix=False))}")
+
+    with db.open_conn() as con:
+        con.execute("DELETE FROM stock_movements WHERE item_id > ?", (base,))
+        con.execute("DELETE FROM item_stock WHERE item_id > ?", (base,))
+        con.execute("DELETE FROM items WHERE item_id > ?", (base,))
+
+
+# --- Invoice grid: QTableWidget rebuild vs SQL-filtered, paged model ---
+def _fake_invoice_rows(n: int) -> list[tuple]:
+    statuses = ("Paid", "Partially Paid", "Unpaid", "N/A")
+    return [
+        (
+            i, i, f"Owner {i % 997}", 100.0, 90.0, statuses[i % 4], "Cash",
+            float(i % 90), f"99{i:06d}", f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} 10:00:00",
+        )
+        for i in range(n, 0, -1)
+    ]
+
+
+def bench_invoice_grid(sizes=(10_000, 50_000, 200_000), repeat: int = 3):
+    """Time from a filter keystroke to a painted frame, old widget vs paged model."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtGui import QColor
+    from PySide6.QtWidgets import QApplication, QTableView, QTableWidget, QTableWidgetItem
+
+    import db
+    from invoice_model import InvoiceTableModel
+
+    app = QApplication.instance() or QApplication([])
+
+    def widget_frame(table, rows, needle):
+        # The pre-model apply_filters: rebuild every row/cell on each keystroke
+        table.setRowCount(0)
+        kept = [r for r in rows if needle in r[2].lower()]
+        for r, row in enumerate(kept):
+            table.insertRow(r)
+            for c, val in enumerate(row[:9]):
+                item = QTableWidgetItem(str(val))
+                if c == 5:
+                    item.setBackground(QColor("#d4edda"))
+                table.setItem(r, c, item)
+        table.viewport().repaint()
+
+    def model_frame(view, model, needle):
+        # BillingInvoicingScreen.apply_filters: first page + summary in SQL
+        params = {"start": "2000-01-01", "end": "2100-01-01", "status": "All", "q": needle}
+        model.set_source(
+            lambda before, limit: db.query_all(
+                "invoice.page",
+                {**params, "before": before or db.INVOICE_PAGE_START, "limit": limit},
+            )
+        )
+        db.query_one("invoice.summary", params)
+        view.viewport().repaint()
+
+    print("invoice_grid: filter keystroke -> painted frame (repaint of 800x600 view)")
+    for n in sizes:
+        rows = _fake_invoice_rows(n)
+        with db.open_conn() as con:
+            base = con.execute("SELECT COALESCE(MAX(invoice_id), 0) FROM invoices").fetchone()[0]
+            con.execute("BEGIN")
+            con.executemany(
+                """INSERT INTO invoices (invoice_date, total_amount, final_amount, payment_status,
+                                         owner_name, owner_contact, created_at)
+                   VALUES ('2025-01-01', ?, ?, ?, ?, ?, ?)""",
+                [(r[3], r[4], r[5], r[2], r[8], r[9]) for r in rows],
+            )
+            con.execute("COMMIT")
+
+        table = QTableWidget(0, 9)
+        table.resize(800, 600)
+        table.show()
+        # One legacy sample is enough at these sizes; it scales linearly
+        legacy = _timeit(lambda t=table, r=rows: widget_frame(t, r, "owner"), 1)
+        table.deleteLater()
+
+        model, view = InvoiceTableModel(), QTableView()
+        view.setModel(model)
+        view.resize(800, 600)
+        view.show()
+        needles = iter(["owner 1", "owner", "owner 12", "owner"] * repeat)
+        paged = _timeit(
+            lambda v=view, m=model, it=needles: model_frame(v, m, next(it)), repeat * 4
+        )
+        view.deleteLater()
+        app.processEvents()
+
+        with db.open_conn() as con:
+            con.execute("DELETE FROM invoices WHERE invoice_id > ?", (base,))
+
+        print(f"  {n:>7} invoices")
+        before = _report("QTableWidget rebuild", legacy)
+        after = _report("SQL page + summary", paged)
+        print(f"  {'':<28} speed-up x{before / after:.1f}")
+
+
+# --- Invoice PDF: longest GUI event-loop stall, inline vs render pool ---
+def _sample_print_payload(lines: int = 40) -> dict:
+    item = {"desc": "Vaccine", "qty": 1, "unit": 20.0, "disc_amt": 0.0, "total": 23.8, "vat_amt": 3.8}
+    return {
+        "inv_id": 1, "owner_name": "Ann", "pet_name": "Rex", "items": [item] * lines,
+        "vat_breakdown": [{"vat_pct": 19.0, "net": 20.0 * lines, "vat_amount": 3.8 * lines, "flag": "S"}],
+        "subtotal": 23.8 * lines, "disc_pct": 0.0, "discount_amount": 0.0,
+        "final_total": 23.8 * lines, "doc_type": "INVOICE", "net_excl_vat": 20.0 * lines,
+        "vat_total": 3.8 * lines, "paid_amount": 0.0, "balance_due": 23.8 * lines,
+        "status": "Unpaid", "created_date": "01-Jan-2025", "created_time": "10:00",
+    }
+
+
+def bench_render(jobs: int = 4):
+    """Max gap between 5 ms timer ticks while `jobs` A4 invoices render."""
+    from PySide6.QtCore import QCoreApplication, QTimer
+
+    from invoice_pdf import generate_pdf_a4
+    from render_service import RenderService
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    payload = _sample_print_payload()
+    paths = [os.path.join(_TMP_DIR, f"render_{i}.pdf") for i in range(jobs)]
+
+    def max_stall(work) -> tuple[float, float]:
+        ticks = []
+        timer = QTimer()
+        timer.timeout.connect(lambda: ticks.append(time.perf_counter()))
+        timer.start(5)
+        t0 = time.perf_counter()
+        work()
+        ticks.append(time.perf_counter())
+        timer.stop()
+        gaps = [b - a for a, b in zip([t0] + ticks, ticks)]
+        return max(gaps) * 1e3, (time.perf_counter() - t0) * 1e3
+
+    def inline():
+        for p in paths:
+            generate_pdf_a4(p, **payload)
+            app.processEvents()
+
+    def pooled():
+        service = RenderService()
+        for p in paths:
+            service.submit(generate_pdf_a4, p, payload)
+        while service.pending():
+            app.processEvents()
+            time.sleep(0.001)
+
+    print(f"render: {jobs} A4 invoices, longest GUI-thread stall")
+    for label, work in (("inline on GUI thread", inline), ("RenderService pool", pooled)):
+        stall, wall = max_stall(work)
+        print(f"  {label:<28} stall {stall:8.1f} ms   wall {wall:8.1f} ms")
+
+
+# --- Startup tasks: daily backup + update check inline vs StartupTasks workers ---
+def bench_startup_tasks(rows: int = 200_000, appcast_delay: float = 0.3):
+    """Longest GUI-thread stall while the daily backup and update check run."""
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from pathlib import Path
+
+    from PySide6.QtCore import QCoreApplication, QTimer
+
+    import backup
+    import db
+    import updater
+    from startup_tasks import StartupTasks
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+
+    # Stand-in appcast server announcing a newer release after `appcast_delay`
+    class Appcast(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(appcast_delay)
+            body = json.dumps({"latest": "999.0", "notes": "bench"}).encode()
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Appcast)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["PETWELLNESS_APPCAST_URL"] = (
+        f"http://127.0.0.1:{server.server_port}/appcast.json"
+    )
+    # Back up the bench database into the temp dir, never the clinic's
+    backup.DB_PATH = Path(os.environ["PETWELLNESS_DB"])
+    backup.BACKUP_DIR = Path(_TMP_DIR) / "backups"
+
+    with db.open_conn() as con:
+        con.execute("BEGIN")
+        con.executemany(
+            "INSERT INTO error_logs (error_type, error_message) VALUES ('bench', ?)",
+            ((f"{i:08d}" * 12,) for i in range(rows)),
+        )
+        con.execute("COMMIT")
+
+    def max_stall(work) -> tuple[float, float]:
+        backup._marker_file().unlink(missing_ok=True)  # "first launch of the day"
+        ticks = []
+        timer = QTimer()
+        timer.timeout.connect(lambda: ticks.append(time.perf_counter()))
+        timer.start(5)
+        t0 = time.perf_counter()
+        work()
+        ticks.append(time.perf_counter())
+        timer.stop()
+        gaps = [b - a for a, b in zip([t0] + ticks, ticks)]
+        return max(gaps) * 1e3, (time.perf_counter() - t0) * 1e3
+
+    def inline():
+        backup.auto_daily_backup_if_needed()
+        assert updater.check_for_update()
+        app.processEvents()
+
+    def workers():
+        tasks = StartupTasks()
+        done = []
+        tasks.backup_finished.connect(done.append)
+        tasks.update_available.connect(done.append)
+        tasks.start()
+        while len(done) < 2:
+            app.processEvents()
+            time.sleep(0.001)
+
+    print(f"startup_tasks: backup of {rows} extra rows + update check, GUI stall")
+    for label, work in (
+        ("inline on GUI thread", inline),
+        ("StartupTasks workers", workers),
+    ):
+        stall, wall = max_stall(work)
+        print(f"  {label:<28} stall {stall:8.1f} ms   wall {wall:8.1f} ms")
+
+    server.shutdown()
+    with db.open_conn() as con:
+        con.execute("DELETE FROM error_logs WHERE error_type = 'bench'")
+
+
+# --- Render assets: per-PDF logo lookup + decode vs render_assets cache ---
+def bench_render_assets(repeat: int = 5):
+    """One A4 invoice: full-size logo and fresh style sheet vs cached assets."""
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import Image
+
+    import invoice_pdf
+    import render_assets
+
+    payload = _sample_print_payload()
+    path = os.path.join(_TMP_DIR, "assets.pdf")
+
+    def legacy_logo(width, height):
+        fp = render_assets._find_logo_path()
+        return Image(fp, width=width, height=height) if fp else None
+
+    def legacy_style(name, parent="Normal", **attrs):
+        return ParagraphStyle(name, parent=getSampleStyleSheet()[parent], **attrs)
+
+    def render():
+        invoice_pdf.generate_pdf_a4(path, **payload)
+        return os.path.getsize(path)
+
+    cached = (invoice_pdf.logo_flowable, invoice_pdf.paragraph_style, invoice_pdf.stylesheet)
+    invoice_pdf.logo_flowable = legacy_logo
+    invoice_pdf.paragraph_style = legacy_style
+    invoice_pdf.stylesheet = getSampleStyleSheet
+    try:
+        legacy_size = render()
+        print(f"render_assets: A4 invoice with the clinic logo ({render_assets.logo_path()})")
+        before = _report("lookup + full logo per PDF", _timeit(render, repeat))
+    finally:
+        invoice_pdf.logo_flowable, invoice_pdf.paragraph_style, invoice_pdf.stylesheet = cached
+    size = render()
+    after = _report("render_assets cache", _timeit(render, repeat))
+    print(f"  speed-up x{before / after:.1f}   PDF {legacy_size // 1024} KB -> {size // 1024} KB")
+
+
+# --- Bulk export: pages/sec, one process vs process pool ---
+def bench_bulk_export(invoices: int = 100, lines: int = 40):
+    """Month-end A4 export of `invoices` invoices into one zip."""
+    from db import open_conn
+    from invoice_export import export_invoices
+
+    with open_conn() as con:
+        first = con.execute("SELECT COALESCE(MAX(invoice_id),0)+1 FROM invoices").fetchone()[0]
+        con.executemany(
+            """INSERT INTO invoices (invoice_id, invoice_date, owner_name, final_amount, created_at)
+               VALUES (?, '2025-02-01', 'Walk In', ?, '2025-02-01 10:00:00')""",
+            [(first + i, 23.8 * lines) for i in range(invoices)],
+        )
+        con.executemany(
+            """INSERT INTO invoice_items (invoice_id, description, quantity, unit_price,
+                                          total_price, vat_pct, vat_amount, vat_flag)
+               VALUES (?, 'Vaccine', 1, 20, 23.8, 19, 3.8, 'S')""",
+            [(first + i,) for i in range(invoices) for _ in range(lines)],
+        )
+    ids = range(first, first + invoices)
+
+    print(f"bulk_export: {invoices} A4 invoices x {lines} lines -> zip")
+    for label, workers in (("single process", 1), (f"pool ({os.cpu_count()} cpus)", None)):
+        dest = os.path.join(_TMP_DIR, f"bulk_{workers}.zip")
+        r = export_invoices(ids, dest, merge="zip", workers=workers)
+        print(
+            f"  {label:<28} {r['pages']:4d} pages in {r['seconds']:6.2f} s"
+            f"   {r['pages_per_sec']:7.1f} pages/s"
+        )
+
+
+# --- Print payload: 4 connections + Python VAT grouping vs batched SQL rollup ---
+def bench_print_payload(invoices: int = 500, lines: int = 12, repeat: int = 5):
+    """Payloads for a bulk export batch, per-invoice reads vs one batched read."""
+    import db
+    from invoice_pdf import load_print_payload, load_print_payloads
+
+    with db.open_conn() as con:
+        con.execute("BEGIN")
+        first = con.execute("SELECT COALESCE(MAX(invoice_id),0)+1 FROM invoices").fetchone()[0]
+        con.executemany(
+            """INSERT INTO invoices (invoice_id, invoice_date, owner_name, final_amount)
+               VALUES (?, '2025-03-01', 'Walk In', 100)""",
+            [(first + i,) for i in range(invoices)],
+        )
+        con.executemany(
+            """INSERT INTO invoice_items (invoice_id, description, quantity, unit_price,
+                                          total_price, vat_pct, vat_amount, vat_flag)
+               VALUES (?, 'Line', 1, 10, 11.9, ?, 1.9, 'S')""",
+            [(first + i, (0, 5, 19)[j % 3]) for i in range(invoices) for j in range(lines)],
+        )
+        con.execute("COMMIT")
+    ids = list(range(first, first + invoices))
+
+    def legacy_one(inv_id):
+        # The pre-registry builder: a connection per read, VAT grouped in Python
+        conn = db.connect()
+        conn.execute(
+            "SELECT owner_name, owner_contact FROM invoices WHERE invoice_id=?", (inv_id,)
+        ).fetchone()
+        conn.close()
+        conn = db.connect()
+        rows = conn.execute(
+            """SELECT description, quantity, unit_price, discount_pct, discount_amount,
+                      total_price, vat_pct, vat_amount, vat_flag
+                 FROM invoice_items WHERE invoice_id = ?""",
+            (inv_id,),
+        ).fetchall()
+        conn.close()
+        [
+            {"desc": r[0], "qty": r[1], "unit": r[2], "disc_amt": r[4], "total": r[5], "vat_amt": r[7]}
+            for r in rows
+        ]
+        grouping = {}
+        for *_, total, v_pct, v_amt, v_flag in rows:
+            grp = grouping.setdefault(v_pct, {"net": 0.0, "vat_amount": 0.0, "flag": v_flag})
+            grp["net"] += float(total or 0) - float(v_amt or 0)
+            grp["vat_amount"] += float(v_amt or 0)
+        conn = db.connect()
+        conn.execute(
+            """SELECT COALESCE(discount,0), COALESCE(final_amount,0),
+                      COALESCE(invoice_type,'INVOICE'), COALESCE(payment_status,'Unpaid')
+                 FROM invoices WHERE invoice_id = ?""",
+            (inv_id,),
+        ).fetchone()
+        db.query_scalar("invoice.paid_total", (inv_id,), conn=conn)
+        conn.close()
+
+    print(f"print_payload: {invoices} invoices x {lines} lines")
+    before = _report("legacy, per invoice", _timeit(lambda: [legacy_one(i) for i in ids], repeat))
+    _report("load_print_payload each", _timeit(lambda: [load_print_payload(i) for i in ids], repeat))
+    after = _report("load_print_payloads batch", _timeit(lambda: load_print_payloads(ids), repeat))
+    print(f"  speed-up x{before / after:.1f}")
+
+
+# --- Invoice save: delete-all/re-insert vs diff-based item persistence ---
+def bench_invoice_save(lines: int = 60, repeat: int = 200):
+    """Saving a 60-line invoice with one edited line, stock deduction included."""
+    import db
+    import inventory
+    from invoice_items import ItemChangeTracker, derive_columns
+
+    with db.open_conn() as con:
+        con.execute("BEGIN")
+        inv_id = con.execute(
+            "INSERT INTO invoices (invoice_date, owner_name) VALUES ('2025-04-01', 'Ann')"
+        ).lastrowid
+        con.executemany(
+            "INSERT INTO items (name, reorder_threshold) VALUES (?, 1)",
+            [(f"Save SKU {i}",) for i in range(0, lines, 2)],  # half the lines are SKUs
+        )
+        con.executemany(
+            """INSERT INTO invoice_items (invoice_id, description, quantity, unit_price,
+                                          vat_pct, vat_amount, discount_pct, discount_amount,
+                                          total_price, vat_flag)
+               VALUES (?, ?, 1, 10, 0.19, 1.9, 0, 0, 11.9, 'C')""",
+            [(inv_id, f"Save SKU {i}") for i in range(lines)],
+        )
+        con.execute("COMMIT")
+    rows = db.query_all("invoice.items", (inv_id,))
+    reason_prefix = f"Dispensed via Invoice #{inv_id}"
+
+    def legacy(con):
+        # The old edit_invoice: every line re-inserted, SKU + ledger check per line
+        grid = [tuple(str(v) for v in r[1:]) for r in rows]
+        con.execute("DELETE FROM invoice_items WHERE invoice_id = ?", (inv_id,))
+        for desc, qty, unit, vat, disc, total in grid:
+            con.execute(
+                """INSERT INTO invoice_items
+                     (invoice_id, description, quantity, unit_price, vat_pct, vat_amount,
+                      discount_pct, discount_amount, total_price, vat_flag)
+                   VALUES (?,?,?,?,?,?,?,?,?,?)""",
+                (
+                    inv_id,
+                    *derive_columns(
+                        (desc, int(float(qty)), float(unit), float(vat), float(disc), float(total))
+                    ),
+                ),
+            )
+        for desc, qty, *_ in grid:
+            rec = con.execute("SELECT item_id FROM items WHERE name = ?", (desc,)).fetchone()
+            if not rec:
+                continue
+            reason = f"{reason_prefix} — {qty}×{desc}"
+            if con.execute(LEGACY_DEDUP_SQL, (rec[0], reason)).fetchone()[0]:
+                continue
+            inventory.record_movement(con, rec[0], -int(qty), reason)
+
+    def tracked(con):
+        tracker = ItemChangeTracker()
+        tracker.load(inv_id, rows)
+        tracker.set_value(3, 5, 20.0)  # one edited total
+        tracker.save(con)
+        inventory.deduct_for_document(
+            con,
+            "invoice",
+            inv_id,
+            [(item_id, d, q, f"{reason_prefix} — {q}×{d}") for item_id, d, q, *_ in rows],
+        )
+
+    def run(save):
+        with db.open_conn() as con:
+            con.execute("BEGIN IMMEDIATE")
+            save(con)
+            con.execute("ROLLBACK")  # every run saves the same starting invoice
+
+    print(f"invoice_save: {lines}-line invoice, 1 line edited, first save (stock deducted)")
+    before = _report("delete-all + re-insert", _timeit(lambda: run(legacy), repeat))
+    after = _report("ItemChangeTracker diff", _timeit(lambda: run(tracked), repeat))
+    print(f"  speed-up x{before / after:.1f}")
+
+
+# --- Stock deduction: per-line reason probe vs keyed INSERT OR IGNORE ---
+def bench_stock_dedupe(movements: int = 200_000, lines: int = 30, repeat: int = 50):
+    """Re-saving an already deducted invoice against a large ledger."""
+    import db
+    import inventory
+
+    with db.open_conn() as con:
+        con.execute("BEGIN")
+        base = con.execute("SELECT COALESCE(MAX(item_id), 0) FROM items").fetchone()[0]
+        con.executemany(
+            "INSERT INTO items (name, reorder_threshold) VALUES (?, 1)",
+            [(f"Dedupe SKU {i}",) for i in range(lines)],
+        )
+        con.executemany(
+            """INSERT INTO stock_movements (item_id, change_qty, reason, timestamp)
+               VALUES (?, -1, ?, '2025-01-01 10:00:00')""",
+            [
+                (base + 1 + i % lines, f"Dispensed via Invoice #{i} — 1×Dedupe SKU {i % lines}")
+                for i in range(movements)
+            ],
+        )
+        con.execute("COMMIT")
+    inv_id = movements - 1
+    doc = [
+        (n, f"Dedupe SKU {n}", 1, f"Dispensed via Invoice #{inv_id} — 1×Dedupe SKU {n}")
+        for n in range(lines)
+    ]
+
+    def legacy(con):
+        for _, name, qty, reason in doc:
+            rec = con.execute("SELECT item_id FROM items WHERE name = ?", (name,)).fetchone()
+            if rec and not con.execute(LEGACY_DEDUP_SQL, (rec[0], reason)).fetchone()[0]:
+                inventory.record_movement(con, rec[0], -qty, reason)
+
+    def keyed(con):
+        inventory.deduct_for_document(con, "invoice", inv_id, doc)
+
+    def run(deduct):
+        with db.open_conn() as con:
+            con.execute("BEGIN IMMEDIATE")
+            deduct(con)
+            con.execute("COMMIT")
+
+    run(keyed)  # first save: keyed rows now exist alongside the legacy ones
+    print(f"stock_dedupe: {lines}-line invoice re-saved, {movements}-row ledger")
+    before = _report("COUNT(*) by reason per line", _timeit(lambda: run(legacy), repeat))
+    after = _report("deduct_for_document", _timeit(lambda: run(keyed), repeat))
+    print(f"  speed-up x{before / after:.1f}")
+
+    with db.open_conn() as con:
+        con.execute("DELETE FROM stock_movements WHERE item_id > ?", (base,))
+        con.execute("DELETE FROM item_stock WHERE item_id > ?", (base,))
+        con.execute("DELETE FROM items WHERE item_id > ?", (base,))
+
+
+# --- Startup schema checks: try-ALTER / PRAGMA table_info vs cached introspection ---
+def bench_schema(z_reports: int = 20, repeat: int = 50):
+    """Module schema checks at import plus a day of Z-reports checking a column."""
+    import sqlite3
+
+    import consent_forms
+    import db
+    import prescription_management
+
+    def legacy(con):
+        # Old _ensure_consent_schema / _ensure_dispensed_columns / _invoice_date_expr
+        con.execute("CREATE TABLE IF NOT EXISTS consent_forms (consent_id INTEGER)")
+        alters = [("consent_forms", c, d) for c, d in consent_forms._CONSENT_COLUMNS]
+        alters += [
+            ("prescriptions", "dispensed", "INTEGER NOT NULL DEFAULT 0"),
+            ("prescriptions", "date_dispensed", "TEXT"),
+        ]
+        for table, col, decl in alters:
+            try:
+                con.execute(f"ALTER TABLE {table} ADD COLUMN {col} {decl}")
+            except sqlite3.OperationalError:
+                pass
+        con.execute("CREATE TABLE IF NOT EXISTS consent_templates (template_id INT)")
+        for _ in range(z_reports):
+            cols = [r[1] for r in con.execute("PRAGMA table_info(invoices)")]
+            assert "invoice_date" in cols
+
+    def cached(con):
+        consent_forms._ensure_consent_schema()
+        prescription_management._ensure_dispensed_columns()
+        for _ in range(z_reports):
+            assert db.has_column("invoices", "invoice_date", conn=con)
+
+    def run(fn):
+        with db.open_conn() as con:
+            fn(con)
+
+    print(f"schema: startup ensure checks + {z_reports} invoice column checks")
+    before = _report("try-ALTER / table_info", _timeit(lambda: run(legacy), repeat))
+    stats = db.schema_cache_stats()
+    after = _report("db.table_columns cache", _timeit(lambda: run(cached), repeat))
+    stats = {k: (v - stats[k]) // repeat for k, v in db.schema_cache_stats().items()}
+    # (failed ALTERs never reach a trace callback, so count the legacy ones directly)
+    legacy_ddl = 2 + len(consent_forms._CONSENT_COLUMNS) + 2 + z_reports
+    print(
+        f"  speed-up x{before / after:.1f}   per run: {legacy_ddl} DDL/table_info "
+        f"-> {stats['introspections']} + {stats['probes']} schema_version probes"
+    )
+
+# --- Analytics tabs: six eager queries on the GUI thread vs cached fetch ---
+def bench_analytics(appointments: int = 20_000, invoices: int = 50_000, repeat=10):
+    """What opening Reports & Analytics used to cost vs revisiting cached tabs."""
+    import analytics_data
+    import db
+
+    with db.open_conn() as con:
+        base = con.execute("SELECT COALESCE(MAX(invoice_id), 0) FROM invoices").fetchone()[0]
+        appt = con.execute("SELECT COALESCE(MAX(appointment_id), 0) FROM appointments")
+        appt = appt.fetchone()[0]
+        con.execute("BEGIN")
+        con.executemany(
+            """INSERT INTO appointments (patient_id, date_time, reason, veterinarian, status)
+               VALUES (1, DATETIME('2025-01-01 09:00', ?), 'Checkup', ?, 'Completed')""",
+            [(f"+{i % 365} days", f"Dr {i % 4}") for i in range(appointments)],
+        )
+        con.executemany(
+            """INSERT INTO invoices (invoice_date, created_at, final_amount)
+               VALUES (DATE('2025-01-01', ?), DATETIME('2025-01-01 10:00', ?), 90)""",
+            [(f"+{i % 365} days",) * 2 for i in range(invoices)],
+        )
+        con.execute("COMMIT")
+
+    start, end = "2025-01-01", "2025-12-31"
+
+    def eager():
+        # ReportsAnalyticsScreen.__init__ ran every tab's query up front
+        with db.open_conn() as con:
+            for name in analytics_data.REPORT_TABLES:
+                params = {"start": start, "end": end}
+                db.run_query(con, f"analytics.{name}", params).fetchall()
+
+    def cached():
+        for name in analytics_data.REPORT_TABLES:
+            analytics_data.fetch(name, start, end)
+
+    print(f"analytics: six tabs over {appointments} appointments, {invoices} invoices")
+    before = _report("six queries, every open", _timeit(eager, repeat))
+    after = _report("analytics_data.fetch cached", _timeit(cached, repeat))
+    print(f"  speed-up x{before / after:.1f}   {analytics_data.cache_stats()}")
+
+    with db.open_conn() as con:
+        con.execute("DELETE FROM invoices WHERE invoice_id > ?", (base,))
+        con.execute("DELETE FROM appointments WHERE appointment_id > ?", (appt,))
+
+
+# --- Analytics charts: new Figure per filter / export vs analytics_charts cache ---
+def bench_charts(bars: int = 12, repeat: int = 20):
+    """Revenue chart redrawn on a filter change, and re-exported for a PDF."""
+    import io
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from PIL import Image
+
+    from analytics_charts import EXPORT_DPI, EXPORT_SIZE, SCREEN_SIZE, ChartCache
+
+    months = [f"2025-{m:02d}" for m in range(1, bars + 1)]
+    filters = iter(range(10**6))
+
+    def totals():
+        n = next(filters)
+        return [1000 + (n * 37 + i * 101) % 500 for i in range(bars)]
+
+    def legacy_figure(size):
+        fig = Figure(figsize=size)
+        ax = fig.add_subplot(111)
+        ax.bar(months, totals())
+        ax.set_title("Revenue by Month")
+        ax.set_ylabel("€")
+        ax.set_xlabel("Month")
+        ax.tick_params(axis="x", rotation=45)
+        return fig
+
+    def legacy_screen():
+        FigureCanvasAgg(legacy_figure(SCREEN_SIZE)).draw()
+
+    def legacy_export():
+        fig = legacy_figure(EXPORT_SIZE)
+        fig.tight_layout()
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", dpi=EXPORT_DPI)
+        buf.seek(0)
+        Image.open(buf).load()
+
+    charts = ChartCache()
+    screen = charts.figure("revenue", months, totals())
+    canvas = FigureCanvasAgg(screen)
+    export_values = totals()
+
+    def cached_screen():
+        charts.figure("revenue", months, totals())
+        canvas.draw()
+
+    print(f"charts: {bars}-bar revenue chart")
+    before = _report("new Figure per filter", _timeit(legacy_screen, repeat))
+    after = _report("bars updated in place", _timeit(cached_screen, repeat))
+    print(f"  speed-up x{before / after:.1f}")
+    before = _report("export: Figure -> PNG -> PIL", _timeit(legacy_export, repeat))
+    after = _report(
+        "export: cached PNG",
+        _timeit(lambda: charts.png("revenue", months, export_values), repeat),
+    )
+    print(f"  speed-up x{before / after:.1f}   {charts.stats}")
+
+
+# --- Analytics engine: SQL GROUP BY per date range vs NumPy column frames ---
+def bench_analytics_engine(payments: int = 1_000_000, ranges: int = 20):
+    """
+    Analytics charts, the invoice list summary (apply_filters) and the top-items
+    inventory report over `payments` payment rows: 4 payments and 2 item lines
+    per invoice, one appointment per invoice.
+    """
+    import random
+
+    import analytics_columns
+    import analytics_data
+    import db
+
+    rnd = random.Random(19)
+    invoices = payments // 4
+    statuses = ("Paid", "Unpaid", "Partially Paid")
+    with db.open_conn() as con:
+        base = con.execute("SELECT COALESCE(MAX(invoice_id), 0) FROM invoices").fetchone()[0]
+        appt = con.execute("SELECT COALESCE(MAX(appointment_id), 0) FROM appointments")
+        appt = appt.fetchone()[0]
+        con.execute("BEGIN")
+        con.executemany(
+            """INSERT INTO appointments (patient_id, date_time, reason, veterinarian, status)
+               VALUES (1, DATETIME('2023-01-01 09:00', ?), 'Checkup', ?, 'Completed')""",
+            ((f"+{i % 1095} days", f"Dr {i % 6}") for i in range(invoices)),
+        )
+        con.executemany(
+            """INSERT INTO invoices (invoice_id, invoice_date, created_at, owner_name,
+                                     final_amount, payment_status)
+               VALUES (?, '2023-01-01', DATETIME('2023-01-01 10:00', ?), 'Owner',
+                       ?, ?)""",
+            (
+                (base + 1 + i, f"+{i % 1095} days", 20 + i % 80, statuses[i % 3])
+                for i in range(invoices)
+            ),
+        )
+        con.executemany(
+            """INSERT INTO invoice_items (invoice_id, description, quantity, unit_price,
+                                          total_price)
+               VALUES (?, ?, ?, 10, 10)""",
+            (
+                (base + 1 + i // 2, f"Item {rnd.randrange(40)}", 1 + i % 3)
+                for i in range(2 * invoices)
+            ),
+        )
+        con.executemany(
+            """INSERT INTO payment_history (invoice_id, payment_date, amount_paid)
+               VALUES (?, '2023-01-01', 5)""",
+            ((base + 1 + i // 4,) for i in range(payments)),
+        )
+        con.execute("COMMIT")
+
+    days = [f"{y}-{m:02d}-01" for y in (2023, 2024) for m in range(1, 13)]
+    windows = [tuple(sorted(rnd.sample(days, 2))) for _ in range(ranges)]
+    print(
+        f"analytics_engine: {payments} payments, {invoices} invoices, "
+        f"{2 * invoices} item lines, {ranges} date ranges"
+    )
+
+    # Charts and the top-items inventory report: registered SQL vs NumPy frames
+    def sql(name):
+        with db.open_conn() as con:
+            for start, end in windows:
+                params = {"start": start, "end": end}
+                db.run_query(con, f"analytics.{name}", params).fetchall()
+
+    def columns(name):
+        frame, report = analytics_columns.REPORTS[name]
+        with db.open_conn() as con:
+            for start, end in windows:
+                report(analytics_data._frame(con, frame), start, end)
+
+    def load_frames():
+        analytics_data.clear()
+        with db.open_conn() as con:
+            for frame in analytics_columns.FRAMES:
+                analytics_data._frame(con, frame)
+
+    load = _report("NumPy frame loads (once)", _timeit(load_frames, 1))
+    before = after = 0.0
+    for name in analytics_columns.REPORTS:
+        print(f"  {name}")
+        before += _report("SQL GROUP BY", _timeit(lambda n=name: sql(n), 1))
+        after += _report("NumPy mask + bincount", _timeit(lambda n=name: columns(n), 3))
+    print(
+        f"  all charts: speed-up x{before / after:.1f} once loaded, "
+        f"x{before / (after + load):.1f} including the load"
+    )
+
+    # Invoice list summary strip: the pre-registry load_invoices + Python loop
+    # in apply_filters (SUM(amount_paid) per invoice) vs invoice.summary
+    def legacy_load():
+        with db.open_conn() as con:
+            return con.execute(
+                """SELECT i.invoice_id, i.final_amount, i.payment_status,
+                          (i.final_amount - COALESCE((SELECT SUM(amount_paid)
+                                FROM payment_history
+                               WHERE invoice_id = i.invoice_id), 0)),
+                          i.created_at
+                     FROM invoices i
+                     LEFT JOIN appointments a ON i.appointment_id = a.appointment_id
+                    ORDER BY i.invoice_id DESC"""
+            ).fetchall()
+
+    def legacy_summary(rows):
+        for start, end in windows:
+            total = remaining_sum = 0.0
+            count = 0
+            for _inv, final_amt, status, remaining, created_at in rows:
+                day = (created_at or "").split(" ")[0]
+                if day and (day < start or day > end):
+                    continue
+                if str(status).upper() not in ("ESTIMATE", "CHARITY", "N/A"):
+                    total += float(final_amt or 0)
+                    remaining_sum += float(remaining or 0)
+                    if status != "Unpaid":
+                        count += 1
+
+    def sql_summary():
+        with db.open_conn() as con:
+            for start, end in windows:
+                params = {"start": start, "end": end, "status": "All", "q": ""}
+                db.run_query(con, "invoice.summary", params).fetchone()
+
+    print("  invoice list summary (apply_filters)")
+    rows = []
+    load_rows = _report(
+        "legacy load_invoices (once)", _timeit(lambda: rows.extend(legacy_load()), 1)
+    )
+    loop = _report(
+        "legacy Python summary loop", _timeit(lambda: legacy_summary(rows), 1)
+    )
+    summary = _report("invoice.summary SQL", _timeit(sql_summary, 3))
+    print(
+        f"  summary: speed-up x{loop / summary:.1f} per filter change, "
+        f"x{(load_rows + loop) / summary:.1f} including the legacy load"
+    )
+
+    with db.open_conn() as con:
+        con.execute("BEGIN")
+        con.execute("DELETE FROM payment_history WHERE invoice_id > ?", (base,))
+        con.execute("DELETE FROM invoice_items WHERE invoice_id > ?", (base,))
+        con.execute("DELETE FROM invoices WHERE invoice_id > ?", (base,))
+        con.execute("DELETE FROM appointments WHERE appointment_id > ?", (appt,))
+        con.execute("COMMIT")
+    analytics_data.clear()
+
+
+# --- Launch schema check: sqlite_master + version / init_db.main() vs fingerprint ---
+def bench_launch_schema(repeat: int = 200):
+    """ensure_core_schema() on an up-to-date database, old checks vs one read."""
+    import contextlib
+    import io
+
+    import db
+    import init_db
+
+    def legacy():
+        # Old ensure_core_schema: table list, then the version row
+        db.clear_schema_cache()
+        set(db.table_names())
+        with db.open_conn() as con:
+            con.execute("SELECT version FROM schema_version WHERE id=1").fetchone()
+
+    def rerun_main():
+        with contextlib.redirect_stdout(io.StringIO()):
+            init_db.main()
+
+    print("launch_schema: startup schema check on a current database")
+    before = _report("sqlite_master + version", _timeit(legacy, repeat))
+    full = _report("init_db.main() (stale DB)", _timeit(rerun_main, repeat // 10))
+    after = _report(
+        "schema_current() fingerprint", _timeit(init_db.schema_current, repeat)
+    )
+    print(
+        f"  speed-up x{before / after:.1f} vs the old checks, "
+        f"x{full / after:.0f} vs main()"
+    )
+
+
+# --- Startup imports: `python -X importtime -c "import app_launcher"` vs a budget ---
+# Heavy libraries that must load on first use, never with the login window
+STARTUP_DEFERRED = ("matplotlib", "numpy", "reportlab", "PIL", "pypdf", "win32print")
+STARTUP_IMPORT_BUDGET_MS = 500
+
+
+def bench_startup(repeat: int = 5, budget_ms: float = STARTUP_IMPORT_BUDGET_MS):
+    """Import time of app_launcher in a fresh interpreter; fails over budget."""
+    import subprocess
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    samples, imported = [], {}
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app_launcher"],
+            cwd=here,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if proc.returncode != 0:
+            print(f"startup: import app_launcher failed\n{proc.stderr[-2000:]}")
+            return False
+        # "import time: <self us> | <cumulative us> | <indent><module>"
+        imported = {}
+        for line in proc.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _self, cumulative, name = line[len("import time:"):].split("|")
+                if cumulative.strip().isdigit():
+                    imported[name.strip()] = int(cumulative)
+        samples.append(imported["app_launcher"])
+
+    print(f"startup: import app_launcher, {repeat} fresh interpreters")
+    mean = _report("import app_launcher", samples) / 1000
+    deferred = sorted(
+        name for name in imported if name.split(".")[0] in STARTUP_DEFERRED
+    )
+    ok = mean <= budget_ms and not deferred
+    print(f"  budget {budget_ms:.0f} ms: {'OK' if mean <= budget_ms else 'EXCEEDED'}")
+    if deferred:
+        print(f"  loaded at startup, should load on first use: {', '.join(deferred)}")
+    return ok
+
+
+# --- Backups: one-step .db copy vs backup_engine full / incremental snapshots ---
+def bench_backup(rows: int = 300_000, changed: int = 500):
+    """Backup of the bench DB while a writer keeps inserting; size + writer stall."""
+    import sqlite3
+    import threading
+    from pathlib import Path
+
+    import backup_engine
+    import db
+
+    src = os.environ["PETWELLNESS_DB"]
+    out = Path(_TMP_DIR) / "backup-bench"
+    with db.open_conn() as con:
+        con.execute("BEGIN")
+        con.executemany(
+            "INSERT INTO error_logs (error_type, error_message) VALUES ('bench', ?)",
+            ((os.urandom(48).hex(),) for _ in range(rows)),
+        )
+        con.execute("COMMIT")
+
+    def legacy():
+        dst = out / "legacy.db"
+        s, d = sqlite3.connect(src), sqlite3.connect(dst)
+        try:
+            s.backup(d)
+        finally:
+            d.close()
+            s.close()
+        return dst
+
+    def touch():
+        time.sleep(1)  # snapshot names are per second
+        with db.open_conn() as con:
+            con.execute(
+                """UPDATE error_logs SET error_message = 'edited'
+                    WHERE log_id IN (SELECT log_id FROM error_logs
+                                     WHERE error_type = 'bench'
+                                     ORDER BY random() LIMIT ?)""",
+                (changed,),
+            )
+
+    def measure(work) -> tuple[float, float, int]:
+        stop, stalls = threading.Event(), [0.0]
+
+        def writer():
+            conn = db._open_raw()
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                conn.execute(
+                    "INSERT INTO error_logs (error_type, error_message) "
+                    "VALUES ('bench', 'w')"
+                )
+                stalls[0] = max(stalls[0], time.perf_counter() - t0)
+                time.sleep(0.002)
+            conn.close()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        t0 = time.perf_counter()
+        path = work()
+        wall = time.perf_counter() - t0
+        stop.set()
+        thread.join()
+        return wall * 1e3, stalls[0] * 1e3, os.path.getsize(path)
+
+    out.mkdir(exist_ok=True)
+    print(
+        f"backup: {os.path.getsize(src) / 1e6:.1f} MB database "
+        f"({backup_engine.COMPRESSION}), writer inserting throughout"
+    )
+    for label, work in (
+        ("one-step copy to .db", legacy),
+        ("full snapshot", lambda: backup_engine.snapshot(src, out)),
+        (
+            f"incremental, {changed} rows edited",
+            lambda: backup_engine.snapshot(src, out, incremental=True),
+        ),
+    ):
+        if work is not legacy:
+            touch()
+        wall, stall, size = measure(work)
+        print(
+            f"  {label:<28} wall {wall:8.1f} ms   writer max {stall:6.1f} ms"
+            f"   {size / 1e6:8.2f} MB"
+        )
+
+    with db.open_conn() as con:
+        con.execute("DELETE FROM error_logs WHERE error_type = 'bench'")
+
+
+# --- Restore: copying a .db back vs rebuilding a week-old snapshot chain ---
+def bench_restore(rows: int = 300_000, days: int = 6):
+    """Restore of a full snapshot and of the head of `days` daily increments."""
+    import shutil
+    from pathlib import Path
+
+    import backup_engine
+    import backup_restore
+    import db
+
+    src = os.environ["PETWELLNESS_DB"]
+    out = Path(_TMP_DIR) / "restore-bench"
+    out.mkdir(exist_ok=True)
+    target = out / "restored.db"
+    with db.open_conn() as con:
+        con.execute("BEGIN")
+        con.executemany(
+            "INSERT INTO error_logs (error_type, error_message) VALUES ('bench', ?)",
+            ((os.urandom(48).hex(),) for _ in range(rows)),
+        )
+        con.execute("COMMIT")
+    legacy = out / "legacy.db"
+    shutil.copyfile(src, legacy)
+    full = backup_engine.snapshot(src, out)
+    head = full
+    for day in range(days):
+        time.sleep(1)  # snapshot names are per second
+        with db.open_conn() as con:  # a day: new rows plus scattered edits
+            con.execute("BEGIN")
+            con.executemany(
+                "INSERT INTO error_logs (error_type, error_message) "
+                "VALUES ('bench', ?)",
+                ((os.urandom(48).hex(),) for _ in range(rows // 100)),
+            )
+            con.execute(
+                """UPDATE error_logs SET error_message = ?
+                    WHERE log_id IN (SELECT log_id FROM error_logs
+                                     ORDER BY random() LIMIT 200)""",
+                (f"day {day}",),
+            )
+            con.execute("COMMIT")
+        head = backup_engine.snapshot(src, out, incremental=True)
+
+    def timed(fn) -> float:
+        t0 = time.perf_counter()
+        fn()
+        return (time.perf_counter() - t0) * 1e3
+
+    print(f"restore: {os.path.getsize(src) / 1e6:.1f} MB database, {days} increments")
+    for label, work, read in (
+        (
+            "copy a .db back",
+            lambda: shutil.copyfile(legacy, target),
+            legacy.stat().st_size,
+        ),
+        (
+            "full snapshot",
+            lambda: backup_restore.restore(full, target, safety_backup=False),
+            full.stat().st_size,
+        ),
+        (
+            f"full + {days} increments",
+            lambda: backup_restore.restore(head, target, safety_backup=False),
+            sum(p.stat().st_size for p in backup_engine.chain(head)),
+        ),
+    ):
+        print(f"  {label:<28} wall {timed(work):8.1f} ms   reads {read / 1e6:8.2f} MB")
+
+    with db.open_conn() as con:
+        con.execute("DELETE FROM error_logs WHERE error_type = 'bench'")
+
+
+BENCHMARKS = {
+    "pool": bench_pool,
+    "registry": bench_registry,
+    "paid_total": bench_paid_total,
+    "z_report": bench_z_report,
+    "stock": bench_stock,
+    "invoice_grid": bench_invoice_grid,
+    "render": bench_render,
+    "startup_tasks": bench_startup_tasks,
+    "render_assets": bench_render_assets,
+    "bulk_export": bench_bulk_export,
+    "print_payload": bench_print_payload,
+    "invoice_save": bench_invoice_save,
+    "stock_dedupe": bench_stock_dedupe,
+    "schema": bench_schema,
+    "analytics": bench_analytics,
+    "charts": bench_charts,
+    "analytics_engine": bench_analytics_engine,
+    "launch_schema": bench_launch_schema,
+    "startup": bench_startup,
+    "backup": bench_backup,
+    "restore": bench_restore,
+}
+
+
+def main(argv: list[str]) -> int:
+    names = argv or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)}; choose from {sorted(BENCHMARKS)}")
+        return 2
+    _seed_db()
+    # A benchmark returning False has failed its budget
+    failed = [name for name in names if BENCHMARKS[name]() is False]
+    if failed:
+        print(f"Over budget: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -2,20 +2,18 @@
 # -----------------------------------------------------------------------------
 # PetWellnessApp â€â€ Billing & Invoicing (DB unified)
 # All SQLite access goes through _connect() using backup.DB_PATH
-# Uses backup.LOGO_PNG for logo in PDFs (works in dev & PyInstaller builds)
+# PDF layouts live in invoice_pdf.py; the logo and styles in render_assets.py
 # -----------------------------------------------------------------------------
 import csv
 import os
-import sys
 import tempfile
 from datetime import datetime
 
-import win32print
-from PySide6 import QtGui
-from PySide6.QtCore import QDate, QDateTime, Qt, Signal
+from PySide6.QtCore import QDate, QDateTime, Qt, QTimer, Signal
 from PySide6.QtPrintSupport import QPrinterInfo
 from PySide6.QtWidgets import (
 
+    QApplication,
     QComboBox,
     QDateEdit,
     QDateTimeEdit,
@@ -23,36 +21,31 @@ from PySide6.QtWidgets import (
     QDoubleSpinBox,
     QFileDialog,
     QFormLayout,
+    QFrame,
     QGridLayout,
     QHBoxLayout,
     QHeaderView,
     QLabel,
     QLineEdit,
     QMessageBox,
+    QProgressDialog,
     QPushButton,
     QSizePolicy,
     QSpinBox,
+    QTableView,
     QTableWidget,
     QTableWidgetItem,
     QVBoxLayout,
     QWidget,
 )
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.lib.units import mm
-from reportlab.platypus import (
-    Image,
-    Paragraph,
-    SimpleDocTemplate,
-    Spacer,
-    Table,
-    TableStyle,
-)
 
-from backup import DB_PATH, LOGO_PNG
 from db import connect as _connect
+from db import INVOICE_PAGE_START, query_all, query_one, query_scalar
+from inventory import deduct_for_document
+from invoice_items import COL_TOTAL, ItemChangeTracker, format_cell, parse_cell
+from invoice_model import InvoiceTableModel
 from logger import log_error
+from render_service import RenderService
 
 # Small helpers / styling
 BTN_STYLE = """
@@ -64,58 +57,31 @@ QPushButton {
 """
 
 
-def _find_logo_path():
-    """
-    Resolve the clinic logo path.
-    1) If backup.LOGO_PNG exists, use it.
-    2) Else try common locations (handles dev & PyInstaller).
-    """
-    try:
-        if LOGO_PNG and os.path.exists(str(LOGO_PNG)):
-            return str(LOGO_PNG)
-    except Exception:
-        pass
-
-    # Fallback scan (should rarely be needed if LOGO_PNG is bundled)
-    env = os.getenv("PETWELLNESS_LOGO")
-    if env and os.path.exists(env):
-        return env
-
-    names = [
-        "pet_wellness_logo.png",
-        "pet_wellness_logo.jpg",
-        "clinic_logo.png",
-        "clinic_logo.jpg",
-        "logo.png",
-        "logo.jpg",
-    ]
-    bases = []
-    if hasattr(sys, "_MEIPASS"):
-        bases.append(sys._MEIPASS)
-    bases.append(os.path.dirname(os.path.abspath(sys.argv[0])))
-    bases.append(os.path.dirname(__file__))
-    bases.append(os.getcwd())
-    bases.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
-    candidates = []
-    for base in bases:
-        for n in names:
-            candidates.append(os.path.join(base, n))
-            candidates.append(os.path.join(base, "assets", n))
-            candidates.append(os.path.join(base, "resources", n))
-
-    try:
-        db_dir = os.path.dirname(str(DB_PATH))
-        for n in names:
-            candidates.append(os.path.join(db_dir, n))
-            candidates.append(os.path.join(db_dir, "assets", n))
-    except Exception:
-        pass
-
-    for p in candidates:
-        if p and os.path.exists(p):
-            return p
-    return None
+class _RenderToast(QFrame):
+    """Inline 'Rendering…' strip with a Cancel button for background PDF jobs."""
+
+    def __init__(self, on_cancel, parent=None):
+        super().__init__(parent)
+        self.setStyleSheet(
+            "QFrame { background:#333; border-radius:6px; }"
+            "QLabel { color:white; padding:4px 8px; }"
+        )
+        lay = QHBoxLayout(self)
+        lay.setContentsMargins(4, 2, 4, 2)
+        self.label = QLabel()
+        cancel = QPushButton("Cancel")
+        cancel.clicked.connect(on_cancel)
+        lay.addWidget(self.label, 1)
+        lay.addWidget(cancel)
+        self.hide()
+
+    def show_pending(self, count: int):
+        if count <= 0:
+            self.hide()
+            return
+        noun = "document" if count == 1 else "documents"
+        self.label.setText(f"Rendering {count} {noun}…")
+        self.show()
 
 
 # Dialogs
@@ -239,14 +205,13 @@ class AddPaymentDialog(QDialog):
                 """
                 UPDATE invoices
                    SET payment_status = CASE
-                         WHEN (SELECT COALESCE(SUM(amount_paid),0)
-                                 FROM payment_history WHERE invoice_id = ?) >= final_amount THEN 'Paid'
+                         WHEN paid_total >= final_amount THEN 'Paid'
                          ELSE 'Partially Paid'
                        END,
                        payment_method = ?
                  WHERE invoice_id = ?
                 """,
-                (self.invoice_id, payment_method, self.invoice_id),
+                (payment_method, self.invoice_id),
             )
 
             conn.commit()
@@ -733,7 +698,6 @@ class BillingInvoicingScreen(QWidget):
     def __init__(self):
         super().__init__()
         self.selected_invoice_id = None
-        self.invoices = []
         self._opened_from_appointments = False
 
         root = QHBoxLayout(self)
@@ -744,7 +708,12 @@ class BillingInvoicingScreen(QWidget):
         self.search_input = QLineEdit()
         # CHANGED: mention Owner in placeholder
         self.search_input.setPlaceholderText("Search by Patient/Owner or Appt ID…")
-        self.search_input.textChanged.connect(self.apply_filters)
+        # Debounced: re-query once typing pauses, not on every keystroke
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(250)
+        self._search_timer.timeout.connect(self.apply_filters)
+        self.search_input.textChanged.connect(self._search_timer.start)
         filters.addWidget(self.search_input)
 
         self.status_filter = QComboBox()
@@ -768,33 +737,27 @@ class BillingInvoicingScreen(QWidget):
         dates.addWidget(self.end_date)
         left.addLayout(dates)
 
-        self.invoice_table = QTableWidget()
-        self.invoice_table.setColumnCount(9)
-        # CHANGED: column 3 name reflects patient OR owner
-        self.invoice_table.setHorizontalHeaderLabels(
-            [
-                "Invoice\nID",
-                "Appointment\nID",
-                "Patient/Owner\nName",
-                "Total\nAmount",
-                "Final\nAmount",
-                "Payment\nStatus",
-                "Payment\nMethod",
-                "Remaining\nBalance",
-                "Created\nAt",
-            ]
-        )
+        # Model/View list: filtered in SQL, paged in as the view scrolls
+        self.invoice_model = InvoiceTableModel(self)
+        self.invoice_table = QTableView()
+        self.invoice_table.setModel(self.invoice_model)
+        self.invoice_table.setSelectionBehavior(QTableView.SelectRows)
+        # Multi-select picks the invoices for "Export PDFs (Range)…"
+        self.invoice_table.setSelectionMode(QTableView.ExtendedSelection)
         self.invoice_table.horizontalHeader().setSectionResizeMode(
             QHeaderView.ResizeMode.Stretch
         )
+        # Fixed row height: ResizeToContents would measure every row
         self.invoice_table.verticalHeader().setSectionResizeMode(
-            QHeaderView.ResizeMode.ResizeToContents
+            QHeaderView.ResizeMode.Fixed
         )
         self.invoice_table.horizontalHeader().setStyleSheet(
             "QHeaderView::section { padding:6px; height:44px; }"
         )
-        self.invoice_table.setWordWrap(True)
-        self.invoice_table.itemSelectionChanged.connect(self.load_selected_invoice)
+        self.invoice_table.setWordWrap(False)
+        self.invoice_table.selectionModel().selectionChanged.connect(
+            self.load_selected_invoice
+        )
         self.invoice_table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         left.addWidget(self.invoice_table)
 
@@ -837,6 +800,9 @@ class BillingInvoicingScreen(QWidget):
         )
         self.item_table.setWordWrap(True)
         self.item_table.itemSelectionChanged.connect(self._on_item_selection)
+        # Lines as loaded/edited; Save writes only what changed
+        self.item_tracker = ItemChangeTracker()
+        self.item_table.itemChanged.connect(self._on_item_cell_changed)
         self.item_table.setMinimumHeight(160)
         self.item_table.setMaximumHeight(260)
         center.addWidget(self.item_table)
@@ -1013,8 +979,21 @@ class BillingInvoicingScreen(QWidget):
         self.convert_btn.setEnabled(False)
         self.convert_btn.clicked.connect(self.convert_estimate_to_invoice)
 
+        self.bulk_export_btn = QPushButton("Export PDFs (Range)…")
+        _stack(self.bulk_export_btn)
+        self.bulk_export_btn.clicked.connect(self.export_invoice_pdfs)
+
         buttons_col.addStretch(1)
 
+        # Background PDF rendering (print_invoice); job_id -> (mode, is_a4)
+        self.render_service = RenderService(self)
+        self.render_service.finished.connect(self._on_render_finished)
+        self.render_service.failed.connect(self._on_render_failed)
+        self.render_service.cancelled.connect(self._on_render_cancelled)
+        self._render_jobs = {}
+        self.render_toast = _RenderToast(self.render_service.cancel_all, self)
+        left.addWidget(self.render_toast)
+
         root.addLayout(left, stretch=7)
         root.addWidget(center_widget, stretch=3)
         root.addLayout(buttons_col, stretch=1)
@@ -1187,31 +1166,7 @@ class BillingInvoicingScreen(QWidget):
     # Loading & filtering
     def load_invoices(self):
         try:
-            conn = _connect()
-            cur = conn.cursor()
-            # CHANGED: LEFT JOIN appointments to include NULL appointment_id
-            #          Patient/Owner fallback via COALESCE
-            cur.execute(
-                """
-                SELECT i.invoice_id,
-                       i.appointment_id,
-                       COALESCE((SELECT name FROM patients WHERE patient_id = a.patient_id), i.owner_name) AS patient_or_owner,
-                       i.total_amount,
-                       i.final_amount,
-                       i.payment_status,
-                       i.payment_method,
-                       (i.final_amount - COALESCE((SELECT SUM(amount_paid)
-                             FROM payment_history
-                            WHERE invoice_id = i.invoice_id), 0)) AS remaining,
-                       i.owner_contact,
-                       i.created_at
-                  FROM invoices i
-                  LEFT JOIN appointments a ON i.appointment_id = a.appointment_id
-                 ORDER BY i.invoice_id DESC
-                """
-            )
-            self.invoices = cur.fetchall()
-            conn.close()
+            # Paged list (invoice.page) + totals strip (invoice.summary)
             self.apply_filters()
         except Exception as e:
             log_error(f"Database Error in load_invoices: {e}")
@@ -1219,92 +1174,41 @@ class BillingInvoicingScreen(QWidget):
                 self, "Database Error", f"An unexpected error occurred: {e}"
             )
 
+    def _invoice_filter_params(self) -> dict:
+        return {
+            "start": self.start_date.date().toString("yyyy-MM-dd"),
+            "end": self.end_date.date().toString("yyyy-MM-dd"),
+            "status": self.status_filter.currentText(),
+            "q": (self.search_input.text() or "").strip(),
+        }
+
     def apply_filters(self):
-        search = (self.search_input.text() or "").lower()
-        status_filter = self.status_filter.currentText()
-        start = self.start_date.date()
-        end = self.end_date.date()
-
-        filtered = []
-        total_amount = 0.0
-        remaining_sum = 0.0
-        payment_count = 0
-
-        for row in self.invoices:
-            (
-                invoice_id,
-                appt_id,
-                patient_or_owner,
-                total_amt,
-                final_amt,
-                status,
-                method,
-                remaining,
-                owner_contact,
-                created_at,
-            ) = row
-
-            created_day = QDate.fromString(
-                (created_at or "").split(" ")[0], "yyyy-MM-dd"
+        self._search_timer.stop()
+        params = self._invoice_filter_params()
+
+        def fetch_page(before_id, limit):
+            return query_all(
+                "invoice.page",
+                {
+                    **params,
+                    "before": INVOICE_PAGE_START if before_id is None else before_id,
+                    "limit": limit,
+                },
             )
-            if created_day.isValid():
-                if created_day < start or created_day > end:
-                    continue
-
-            if search:
-
-                if (
-                    (search not in str(appt_id).lower())
-                    and (search not in (patient_or_owner or "").lower())
-                    and (search not in (str(owner_contact) or "").lower())
-                ):
-                    continue
-
-            if status_filter == "Open" and str(status) == "Paid":
-                continue
-            if status_filter == "Paid" and str(status) != "Paid":
-                continue
-
-            filtered.append(row)
-
-            if str(status).upper() not in ("ESTIMATE", "CHARITY", "N/A"):
-                total_amount += float(final_amt or 0)
-                remaining_sum += float(remaining or 0)
-                if status != "Unpaid":
-                    payment_count += 1
-
-        self.invoice_table.setRowCount(0)
-        for r, row in enumerate(filtered):
-            self.invoice_table.insertRow(r)
-            for c, val in enumerate(row):
-                display = str(val)
-                if c in (3, 4, 7):
-                    try:
-                        display = f"{float(val):.2f}"
-                    except Exception:
-                        pass
-                item = QTableWidgetItem(display)
-                if c == 5:
-                    s = str(val).strip().lower()
-                    if s == "paid":
-                        item.setBackground(QtGui.QColor("#d4edda"))
-                    elif s == "partially paid":
-                        item.setBackground(QtGui.QColor("#fff3cd"))
-                    elif s == "unpaid":
-                        item.setBackground(QtGui.QColor("#f8d7da"))
-                    elif s in ("estimate", "charity", "n/a"):
-                        item.setBackground(QtGui.QColor("#e0e0f8"))
-                self.invoice_table.setItem(r, c, item)
 
+        self.invoice_model.set_source(fetch_page)
+        total_amount, remaining_sum, payment_count = query_one(
+            "invoice.summary", params
+        )
         self.total_amount_label.setText(f"Total: {total_amount:.2f}")
         self.remaining_balance_summary.setText(f"Remaining: {remaining_sum:.2f}")
         self.payment_count_label.setText(f"Payments: {payment_count}")
 
     def load_selected_invoice(self):
-        sel = self.invoice_table.currentRow()
-        if sel < 0:
+        idx = self.invoice_table.currentIndex()
+        if not idx.isValid():
             return
-        inv_id = int(self.invoice_table.item(sel, 0).text())
+        inv_id = self.invoice_model.invoice_id(idx.row())
         if not self._opened_from_appointments:
             self.new_invoice_btn.setEnabled(True)
         self.load_invoice_by_id(inv_id)
@@ -1397,37 +1301,33 @@ class BillingInvoicingScreen(QWidget):
         self.delete_item_button.setEnabled(has)
 
     def load_invoice_items(self):
-        conn = _connect()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT description, quantity, unit_price, vat_amount, discount_amount, total_price
-              FROM invoice_items
-             WHERE invoice_id = ?
-            """,
-            (self.selected_invoice_id,),
-        )
-        items = cur.fetchall()
-        conn.close()
+        items = query_all("invoice.items", (self.selected_invoice_id,))
+        self.item_tracker.load(self.selected_invoice_id, items)
 
+        self.item_table.blockSignals(True)  # not user edits
         self.item_table.setRowCount(0)
-        for row in items:
-            r = self.item_table.rowCount()
+        for r, line in enumerate(self.item_tracker.lines()):
             self.item_table.insertRow(r)
-            for c, val in enumerate(row):
-                if c == 2:
-                    try:
-                        display = f"{float(val):.4f}"
-                    except Exception:
-                        display = str(val)
-                else:
-                    display = str(val)
-                self.item_table.setItem(r, c, QTableWidgetItem(display))
+            for c, val in enumerate(line):
+                self.item_table.setItem(r, c, QTableWidgetItem(format_cell(c, val)))
+        self.item_table.blockSignals(False)
 
         self.item_count_label.setText(f"Items: {len(items)}")
         self.calculate_totals_from_items()
         self.calculate_final_amount()
 
+    def _on_item_cell_changed(self, cell):
+        r, c = cell.row(), cell.column()
+        try:
+            self.item_tracker.set_value(r, c, parse_cell(c, cell.text()))
+        except ValueError:
+            # Not a valid value: put back the last good one
+            self.item_table.blockSignals(True)
+            cell.setText(format_cell(c, self.item_tracker.line(r)[c]))
+            self.item_table.blockSignals(False)
+            return
+        self.calculate_totals_from_items()
+
     def add_item(self):
         dlg = ItemizedBillingDialog(self.selected_invoice_id, parent=self)
         if dlg.exec():
@@ -1440,24 +1340,15 @@ class BillingInvoicingScreen(QWidget):
                 self, "No Item Selected", "Please select an item to edit."
             )
             return
-        desc = self.item_table.item(r, 0).text()
-
-        conn = _connect()
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT item_id FROM invoice_items WHERE description = ? AND invoice_id = ?",
-            (desc, self.selected_invoice_id),
-        )
-        row = cur.fetchone()
-        conn.close()
-        if not row:
+        item_id = self.item_tracker.item_id(r)
+        if item_id is None:
             QMessageBox.warning(
                 self, "Error", "Could not find the selected item in the database."
             )
             return
 
         dlg = ItemizedBillingDialog(
-            self.selected_invoice_id, item_id=row[0], parent=self
+            self.selected_invoice_id, item_id=item_id, parent=self
         )
         if dlg.exec():
             self.load_invoice_items()
@@ -1475,15 +1366,16 @@ class BillingInvoicingScreen(QWidget):
         ):
             return
 
-        desc = self.item_table.item(r, 0).text()
-        conn = _connect()
-        cur = conn.cursor()
-        cur.execute(
-            "DELETE FROM invoice_items WHERE description = ? AND invoice_id = ?",
-            (desc, self.selected_invoice_id),
-        )
-        conn.commit()
-        conn.close()
+        item_id = self.item_tracker.item_id(r)
+        if item_id is not None:
+            conn = _connect()
+            cur = conn.cursor()
+            cur.execute(
+                "DELETE FROM invoice_items WHERE item_id = ? AND invoice_id = ?",
+                (item_id, self.selected_invoice_id),
+            )
+            conn.commit()
+            conn.close()
         self.load_invoice_items()
 
     # Patient / appointment
@@ -1778,15 +1670,15 @@ class BillingInvoicingScreen(QWidget):
 
             conn = _connect()
             cur = conn.cursor()
+            cur.execute("BEGIN IMMEDIATE")  # header, items and stock commit together
             cur.execute(
                 "SELECT invoice_type, payable, inventory_deducted FROM invoices WHERE invoice_id = ?",
                 (self.selected_invoice_id,),
             )
             row = cur.fetchone()
             if not row:
-                conn.close()
                 QMessageBox.warning(self, "Not Found", "Document not found.")
-                return
+                return  # finally closes conn, rolling back the BEGIN
             doc_type, payable_flag, already_deducted = (
                 row[0],
                 int(row[1] or 0),
@@ -1817,87 +1709,16 @@ class BillingInvoicingScreen(QWidget):
                 ),
             )
 
-            # items rewrite (unchanged)
-
-            cur.execute(
-                "DELETE FROM invoice_items WHERE invoice_id = ?",
-                (self.selected_invoice_id,),
-            )
+            # items: only the lines that were added, edited or removed
+            self.item_tracker.save(conn)
 
-            for r in range(self.item_table.rowCount()):
-                desc = self.item_table.item(r, 0).text().strip()
-                qty = int(float(self.item_table.item(r, 1).text()))
-                unit_net = float(self.item_table.item(r, 2).text())
-                vat_amt = float(self.item_table.item(r, 3).text())
-                disc_amt = float(self.item_table.item(r, 4).text())
-                total = float(self.item_table.item(r, 5).text())
-
-                base_before_disc = unit_net * qty
-                disc_frac = (
-                    0.0 if base_before_disc <= 0 else (disc_amt / base_before_disc)
-                )
-                net_after_disc = base_before_disc - disc_amt
-                vat_frac = 0.0 if net_after_disc <= 0 else (vat_amt / net_after_disc)
-                rate = int(round(vat_frac * 100))
-                flag = "B" if rate == 5 else "C" if rate == 19 else ""
-
-                cur.execute(
-                    """
-                    INSERT INTO invoice_items
-                      (invoice_id, description, quantity, unit_price,
-                       vat_pct, vat_amount, discount_pct, discount_amount,
-                       total_price, vat_flag)
-                    VALUES (?,?,?,?,?,?,?,?,?,?)
-                    """,
-                    (
-                        self.selected_invoice_id,
-                        desc,
-                        qty,
-                        unit_net,
-                        vat_frac,
-                        vat_amt,
-                        disc_frac,
-                        disc_amt,
-                        total,
-                        flag,
-                    ),
-                )
-
-            # inventory (unchanged)
+            # inventory: once per line, keyed on the invoice_items row
 
             if (
                 str(doc_type).upper() in ("INVOICE", "CHARITY")
                 and already_deducted == 0
             ):
-                reason_prefix = (
-                    f"Dispensed via {str(doc_type).title()} #{self.selected_invoice_id}"
-                )
-
-                for r in range(self.item_table.rowCount()):
-                    desc = self.item_table.item(r, 0).text().strip()
-                    qty = int(float(self.item_table.item(r, 1).text()))
-                    if qty <= 0:
-                        continue
-                    cur.execute("SELECT item_id FROM items WHERE name = ?", (desc,))
-                    rec = cur.fetchone()
-                    if not rec:
-                        continue
-                    item_id = rec[0]
-                    reason = f"{reason_prefix} — {qty}×{desc}"
-                    cur.execute(
-                        "SELECT COUNT(*) FROM stock_movements WHERE item_id=? AND reason=?",
-                        (item_id, reason),
-                    )
-                    if (cur.fetchone() or [0])[0]:
-                        continue
-                    ts = datetime.now().isoformat(" ", "seconds")
-                    cur.execute(
-                        """
-                        INSERT INTO stock_movements (item_id, change_qty, reason, timestamp)
-                        VALUES (?,?,?,?)
-                        """,
-                        (item_id, -qty, reason, ts),
-                    )
+                self._deduct_invoice_stock(conn, doc_type)
                 cur.execute(
                     "UPDATE invoices SET inventory_deducted = 1 WHERE invoice_id = ?",
                     (self.selected_invoice_id,),
@@ -1915,6 +1736,7 @@ class BillingInvoicingScreen(QWidget):
                 )
 
             conn.commit()
+            self.load_invoice_items()  # new lines get their item_ids
             self.update_payment_status_and_balance(
                 self.selected_invoice_id, final_amount
             )
@@ -1934,6 +1756,22 @@ class BillingInvoicingScreen(QWidget):
             if conn:
                 conn.close()
 
+    def _deduct_invoice_stock(self, conn, doc_type):
+        """Deduct the saved lines of the selected invoice (caller's transaction)."""
+        inv_id = self.selected_invoice_id
+        reason_prefix = f"Dispensed via {str(doc_type).title()} #{inv_id}"
+        deduct_for_document(
+            conn,
+            "invoice",
+            inv_id,
+            [
+                (item_id, desc, qty, f"{reason_prefix} — {qty}×{str(desc).strip()}")
+                for item_id, desc, qty, *_ in query_all(
+                    "invoice.items", (inv_id,), conn=conn
+                )
+            ],
+        )
+
     def convert_estimate_to_invoice(self):
         if not self.selected_invoice_id:
             QMessageBox.warning(self, "No Document", "Please select a document first.")
@@ -1975,6 +1813,7 @@ class BillingInvoicingScreen(QWidget):
             return
 
         try:
+            cur.execute("BEGIN IMMEDIATE")  # conversion + stock in one transaction
             cur.execute(
                 """
                 UPDATE invoices
@@ -1988,50 +1827,7 @@ class BillingInvoicingScreen(QWidget):
             )
 
             if already_deducted == 0:
-                reason_prefix = f"Dispensed via Invoice #{self.selected_invoice_id}"
-                cur.execute(
-                    """
-                    SELECT description, quantity
-                      FROM invoice_items
-                     WHERE invoice_id=?
-                    """,
-                    (self.selected_invoice_id,),
-                )
-                rows = cur.fetchall()
-
-                for desc, qty in rows:
-                    try:
-                        q = int(qty)
-                    except Exception:
-                        continue
-                    if q <= 0:
-                        continue
-
-                    cur.execute(
-                        "SELECT item_id FROM items WHERE name=?", (str(desc).strip(),)
-                    )
-                    rec = cur.fetchone()
-                    if not rec:
-                        continue
-                    item_id = rec[0]
-
-                    reason = f"{reason_prefix} - {q}×{str(desc).strip()}"
-                    cur.execute(
-                        "SELECT COUNT(*) FROM stock_movements WHERE item_id=? AND reason=?",
-                        (item_id, reason),
-                    )
-                    if (cur.fetchone() or [0])[0]:
-                        continue
-
-                    ts = datetime.now().isoformat(" ", "seconds")
-                    cur.execute(
-                        """
-                        INSERT INTO stock_movements (item_id, change_qty, reason, timestamp)
-                        VALUES (?,?,?,?)
-                        """,
-                        (item_id, -q, reason, ts),
-                    )
-
+                self._deduct_invoice_stock(conn, "INVOICE")
                 cur.execute(
                     "UPDATE invoices SET inventory_deducted=1 WHERE invoice_id=?",
                     (self.selected_invoice_id,),
@@ -2095,11 +1891,11 @@ class BillingInvoicingScreen(QWidget):
 
         cur.execute(
             """
-            SELECT final_amount - COALESCE((SELECT SUM(amount_paid) FROM payment_history WHERE invoice_id = ?), 0)
+            SELECT final_amount - paid_total
               FROM invoices
              WHERE invoice_id = ?
             """,
-            (self.selected_invoice_id, self.selected_invoice_id),
+            (self.selected_invoice_id,),
         )
         remaining = float(cur.fetchone()[0] or 0)
         conn.close()
@@ -2214,161 +2010,24 @@ class BillingInvoicingScreen(QWidget):
         self.clear_invoice_form()
 
     # Printing / PDFs
-    def _collect_invoice_print_payload(self):
-        """
-        Returns a dict with all data needed for PDF building/printing.
-        Falls back to owner snapshot if there's no appointment/patient.
-        """
-        inv_id = self.selected_invoice_id
-
-        # Owner & pet
-
-        appt_id = (
-            int(self.appointment_id_input.text() or 0)
-            if (self.appointment_id_input.text() or "").isdigit()
-            else None
-        )
-        owner_name = ""
-        owner_contact = ""
-        pet_name = ""
-        if appt_id:
-            conn = _connect()
-
-            cur = conn.cursor()
-            cur.execute(
-                """
-                SELECT p.owner_name, p.owner_contact, p.name
-                  FROM appointments a
-                  JOIN patients   p ON a.patient_id = p.patient_id
-                 WHERE a.appointment_id = ?
-                """,
-                (appt_id,),
-            )
-            owner_name, owner_contact, pet_name = cur.fetchone() or ("", "", "")
-            conn.close()
-        else:
-            # walk-in: pull snapshot from invoices
-
-            conn = _connect()
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT owner_name, owner_contact FROM invoices WHERE invoice_id=?",
-                (inv_id,),
-            )
-            row = cur.fetchone()
-            conn.close()
-            owner_name = (row and row[0]) or ""
-            owner_contact = (row and row[1]) or ""
-            pet_name = ""
-
-        # Items (incl VAT per line)
-        conn = _connect()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT description, quantity, unit_price,
-                   discount_pct, discount_amount,
-                   total_price,
-                   vat_pct, vat_amount, vat_flag
-              FROM invoice_items
-             WHERE invoice_id = ?
-            """,
-            (inv_id,),
-        )
-        raw_items = cur.fetchall()
-        conn.close()
-
-        items = [
-            {
-                "desc": desc,
-                "qty": qty,
-                "unit": unit,
-                "disc_amt": d_amt,
-                "total": total,
-                "vat_amt": v_amt,
-            }
-            for desc, qty, unit, d_pct, d_amt, total, v_pct, v_amt, v_flag in raw_items
-        ]
-
-        # VAT breakdown & totals
-        grouping = {}
-        net_excl_vat = 0.0
-        vat_total = 0.0
-        for desc, qty, unit, d_pct, d_amt, total, v_pct, v_amt, v_flag in raw_items:
-            net = float(total or 0) - float(v_amt or 0)
-            net_excl_vat += net
-            vat_total += float(v_amt or 0)
-            grp = grouping.setdefault(
-                v_pct, {"net": 0.0, "vat_amount": 0.0, "flag": v_flag}
-            )
-            grp["net"] += net
-            grp["vat_amount"] += float(v_amt or 0)
-
-        vat_breakdown = [
-            {
-                "vat_pct": rate,
-                "net": data["net"],
-                "vat_amount": data["vat_amount"],
-                "flag": data["flag"],
-            }
-            for rate, data in grouping.items()
-        ]
-
-        # Header values & cumulative payments
-        conn = _connect()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT COALESCE(discount,0), COALESCE(final_amount,0),
-                   COALESCE(invoice_type,'INVOICE'), COALESCE(payment_status,'Unpaid')
-              FROM invoices
-             WHERE invoice_id = ?
-            """,
-            (inv_id,),
-        )
-        disc_pct, final_total, doc_type, status = cur.fetchone() or (
-            0.0,
-            0.0,
-            "INVOICE",
-            "Unpaid",
-        )
-
-        cur.execute(
-            "SELECT COALESCE(SUM(amount_paid),0) FROM payment_history WHERE invoice_id = ?",
-            (inv_id,),
-        )
-        paid_amount = float((cur.fetchone() or [0])[0] or 0.0)
-        conn.close()
-
-        subtotal = sum(float(it["total"] or 0) for it in items)  # gross (incl VAT)
-        discount_amount = float(subtotal) * (float(disc_pct or 0) / 100.0)
-        computed_total = float(final_total or (subtotal - discount_amount))
-        balance_due = max(computed_total - paid_amount, 0.0)
-
-        return {
-            "inv_id": inv_id,
-            "owner_name": owner_name,
-            "pet_name": pet_name,
-            "items": items,
-            "vat_breakdown": vat_breakdown,
-            "subtotal": float(subtotal or 0),
-            "disc_pct": float(disc_pct or 0),
-            "discount_amount": float(discount_amount or 0),
-            "final_total": float(computed_total),
-            "doc_type": doc_type,
-            "net_excl_vat": float(net_excl_vat or 0),
-            "vat_total": float(vat_total or 0),
-            "paid_amount": float(paid_amount or 0),
-            "balance_due": float(balance_due or 0),
-            "status": status,
-        }
-
     def print_invoice(self):
         if not self.selected_invoice_id:
             QMessageBox.warning(self, "No Invoice", "Please select an invoice first.")
             return
 
-        payload = self._collect_invoice_print_payload()
+        # ReportLab loads with the first print, not with the screen
+        from invoice_pdf import (
+            generate_pdf_a4,
+            generate_pdf_thermal,
+            load_print_payload,
+        )
+
+        try:
+            payload = load_print_payload(self.selected_invoice_id)
+        except LookupError:
+            QMessageBox.warning(self, "Not Found", "This invoice no longer exists.")
+            self.load_invoices()
+            return
         inv_id = payload["inv_id"]
         owner_name = payload["owner_name"]
         created_date = datetime.now().strftime("%d-%b-%Y")
@@ -2403,504 +2062,72 @@ class BillingInvoicingScreen(QWidget):
             )
             if not path:
                 return
-            try:
-                if is_a4:
-                    self._generate_pdf_a4(
-                        path=path,
-                        created_date=created_date,
-                        created_time=created_time,
-                        **payload,
-                    )
-                else:
-                    self._generate_pdf_thermal(
-                        path=path,
-                        created_date=created_date,
-                        created_time=created_time,
-                        **payload,
-                    )
-                QMessageBox.information(self, "Saved", f"Invoice saved to:\n{path}")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Could not create PDF:\n{e}")
-            return
-
-        tmp_path = os.path.join(
-            tempfile.gettempdir(), f"Invoice_{inv_id}_{owner_name.replace(' ', '')}.pdf"
-        )
-        if is_a4:
-            self._generate_pdf_a4(
-                path=tmp_path,
-                created_date=created_date,
-                created_time=created_time,
-                **payload,
-            )
-            try:
-                os.startfile(tmp_path, "print")
-            except Exception as e:
-                QMessageBox.critical(
-                    self, "Print Error", f"Couldn't send to the default printer:\n{e}"
-                )
+            mode = "save"
         else:
-            self._generate_pdf_thermal(
-                path=tmp_path,
-                created_date=created_date,
-                created_time=created_time,
-                **payload,
+            path = os.path.join(
+                tempfile.gettempdir(),
+                f"Invoice_{inv_id}_{owner_name.replace(' ', '')}.pdf",
             )
-            thermal_name = None
-            for pi in QPrinterInfo.availablePrinters():
-                n = pi.printerName().lower()
-                if "thermal" in n or "epson" in n:
-                    thermal_name = pi.printerName()
-                    break
-            if not thermal_name:
-                QMessageBox.warning(
-                    self,
-                    "Printer Not Found",
-                    "Could not find your thermal printer. Ensure its driver is installed and the name contains Thermal Epson",
-                )
-                return
-            original = win32print.GetDefaultPrinter()
-            try:
-                win32print.SetDefaultPrinter(thermal_name)
-                os.startfile(tmp_path, "print")
-            finally:
-                win32print.SetDefaultPrinter(original)
-
-    # PDF builders (include Excel-like block)
-    def _generate_pdf_thermal(
-        self,
-        path,
-        inv_id,
-        created_date,
-        created_time,
-        owner_name,
-        pet_name,
-        items,
-        subtotal,
-        disc_pct,
-        final_total,
-        vat_breakdown,
-        doc_type,
-        net_excl_vat,
-        vat_total,
-        paid_amount,
-        balance_due,
-        status,
-        **_,
-    ):
-        width, margin = 80 * mm, 5 * mm
-        cw = width - 2 * margin
-        styles = getSampleStyleSheet()
-        styles["Normal"].fontName = "Courier"
-        styles["Normal"].fontSize = 6
-        styles["Title"].fontName = "Courier-Bold"
-        styles["Title"].fontSize = 9
-
-        elems = []
-
-        # Logo
-        logo_fp = _find_logo_path()
-        if logo_fp:
-            try:
-                img = Image(logo_fp, width=cw * 0.6, height=cw * 0.3)
-                img.hAlign = "CENTER"
-                elems += [img, Spacer(1, 6 * mm)]
-            except Exception as e:
-                log_error(f"Logo load failed: {e}")
-
-        # Clinic header
-        elems.append(Paragraph("PET WELLNESS VETS", styles["Title"]))
-        elems.append(
-            Paragraph("Kyriakou Adamou no.2, Shop 2&3, 8220", styles["Normal"])
-        )
-        elems.append(
-            Paragraph(
-                "Tel: 99941186   Email: contact@petwellnessvets.com", styles["Normal"]
-            )
-        )
-        elems.append(Spacer(1, 3 * mm))
+            mode = "print"
 
-        # Title
-        title_map = {
-            "INVOICE": "INVOICE",
-            "ESTIMATE": "ESTIMATE",
-            "CHARITY": "CHARITY / PRO BONO",
-        }
-        elems.append(
-            Paragraph(title_map.get(str(doc_type).upper(), "INVOICE"), styles["Title"])
-        )
-        elems.append(Spacer(1, 2 * mm))
-
-        # Meta
-        meta = [
-            ["Inv#:", str(inv_id), "Date:", created_date],
-            ["Time:", created_time, "Customer:", owner_name],
-            ["Pet:", pet_name, "", ""],
-        ]
-        meta_tbl = Table(meta, colWidths=[cw * 0.20, cw * 0.30, cw * 0.20, cw * 0.30])
-        meta_tbl.setStyle(
-            TableStyle(
-                [
-                    ["FONTSIZE", (0, 0), (-1, -1), 7],
-                    ["BOTTOMPADDING", (0, 0), (-1, -1), 2],
-                ]
-            )
-        )
-        elems += [meta_tbl, Spacer(1, 3 * mm)]
-
-        # Items
-        data = [["Desc", "Qty", "Unit", "Disc", "Total", "VAT"]]
-        for it in items:
-            data.append(
-                [
-                    it["desc"],
-                    str(it["qty"]),
-                    f"{float(it['unit']):.2f}",
-                    f"{float(it['disc_amt']):.2f}",
-                    f"{float(it['total']):.2f}",
-                    f"{float(it['vat_amt']):.2f}",
-                ]
-            )
-        itbl = Table(
-            data,
-            colWidths=[
-                cw * 0.40,
-                cw * 0.10,
-                cw * 0.15,
-                cw * 0.10,
-                cw * 0.15,
-                cw * 0.10,
-            ],
-        )
-        itbl.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                    ("GRID", (0, 0), (-1, -1), 0.3, colors.black),
-                    ("FONTSIZE", (0, 0), (-1, -1), 7),
-                    ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
-                ]
-            )
-        )
-        elems += [itbl, Spacer(1, 3 * mm)]
-
-        # VAT breakdown
-        vat_data = [["Net", "VAT%", "VAT", "Flag"]]
-        for row in vat_breakdown:
-            vat_data.append(
-                [
-                    f"{float(row['net'] or 0):.2f}",
-                    f"{row['vat_pct']:.2f}%",
-                    f"{float(row['vat_amount'] or 0):.2f}",
-                    row["flag"],
-                ]
-            )
-        vat_data.append(["", "", "Total VAT", f"€{float(vat_total or 0):.2f}"])
-        vtbl = Table(vat_data, colWidths=[cw * 0.40, cw * 0.20, cw * 0.20, cw * 0.20])
-        vtbl.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                    ("GRID", (0, 0), (-1, -1), 0.3, colors.black),
-                    ("FONTSIZE", (0, 0), (-1, -1), 7),
-                    ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
-                ]
-            )
-        )
-        elems += [vtbl, Spacer(1, 3 * mm)]
-
-        # Accounting block
-        gross_subtotal = sum(float(it["total"] or 0) for it in items)
-        disc_pct_val = float(disc_pct or 0)
-        discount_amount = gross_subtotal * (disc_pct_val / 100.0)
-
-        accounting = [
-            ["Subtotal (Excl. VAT):", f"€{float(net_excl_vat or 0):.2f}"],
-            ["VAT Total:", f"€{float(vat_total or 0):.2f}"],
-            ["Gross Subtotal (Incl. VAT):", f"€{gross_subtotal:.2f}"],
-        ]
-        if disc_pct_val > 0:
-            accounting.append(
-                [f"Invoice Discount ({disc_pct_val:.0f}%):", f"–€{discount_amount:.2f}"]
-            )
-        accounting += [
-            ["Total (Incl. VAT):", f"€{float(final_total or gross_subtotal):.2f}"],
-            ["Amount Paid:", f"€{float(paid_amount or 0):.2f}"],
-            ["Balance Due:", f"€{float(balance_due or 0):.2f}"],
-            ["Status:", status],
-        ]
-        atbl = Table(accounting, colWidths=[cw * 0.60, cw * 0.40], hAlign="RIGHT")
-        atbl.setStyle(
-            TableStyle(
-                [
-                    ("FONTSIZE", (0, 0), (-1, -1), 7),
-                    ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
-                ]
-            )
-        )
-        elems += [atbl, Spacer(1, 3 * mm)]
-
-        # Non-payable note
-        if str(doc_type).upper() == "ESTIMATE":
-            elems.append(
-                Paragraph(
-                    "This is a non-binding estimate. No payment due. Stock is not reserved and may change.",
-                    styles["Normal"],
-                )
-            )
-            elems.append(Spacer(1, 2 * mm))
-        elif str(doc_type).upper() == "CHARITY":
-            elems.append(
-                Paragraph(
-                    "Charity / pro bono document. No payment due (clinic-sponsored).",
-                    styles["Normal"],
-                )
-            )
-            elems.append(Spacer(1, 2 * mm))
-
-        # Signatures
-        sig = [["Doctor:", "Issued By:", "Received By:"], ["____", "____", "____"]]
-        s_tbl = Table(sig, colWidths=[cw / 3] * 3)
-        s_tbl.setStyle(
-            TableStyle(
-                [
-                    ["FONTSIZE", (0, 0), (-1, -1), 7],
-                    ["BOTTOMPADDING", (0, 0), (2, 0), 4],
-                ]
-            )
-        )
-        elems.append(s_tbl)
+        # Layout runs on the render pool; the GUI stays responsive meanwhile
+        job_id = self.render_service.submit(
+            generate_pdf_a4 if is_a4 else generate_pdf_thermal,
+            path,
+            {**payload, "created_date": created_date, "created_time": created_time},
+        )
+        self._render_jobs[job_id] = (mode, is_a4)
+        self.render_toast.show_pending(self.render_service.pending())
+
+    def _on_render_finished(self, job_id, path):
+        mode, is_a4 = self._render_jobs.pop(job_id, ("save", True))
+        self.render_toast.show_pending(self.render_service.pending())
+        if mode == "save":
+            QMessageBox.information(self, "Saved", f"Invoice saved to:\n{path}")
+        elif is_a4:
+            self._send_to_default_printer(path)
+        else:
+            self._send_to_thermal_printer(path)
 
-        # Auto height
-        total_h = margin * 2
-        for f in elems:
-            _, h = f.wrap(cw, A4[1])
-            total_h += h
+    def _on_render_failed(self, job_id, message):
+        self._render_jobs.pop(job_id, None)
+        self.render_toast.show_pending(self.render_service.pending())
+        QMessageBox.critical(self, "Error", f"Could not create PDF:\n{message}")
 
-        doc = SimpleDocTemplate(
-            path,
-            pagesize=(width, total_h),
-            leftMargin=margin,
-            rightMargin=margin,
-            topMargin=margin,
-            bottomMargin=margin,
-        )
-        doc.build(elems)
-
-    def _generate_pdf_a4(
-        self,
-        path,
-        inv_id,
-        created_date,
-        created_time,
-        owner_name,
-        pet_name,
-        items,
-        subtotal,
-        disc_pct,
-        final_total,
-        vat_breakdown,
-        doc_type,
-        net_excl_vat,
-        vat_total,
-        paid_amount,
-        balance_due,
-        status,
-        **_,
-    ):
-        doc = SimpleDocTemplate(
-            path,
-            pagesize=A4,
-            leftMargin=18 * mm,
-            rightMargin=18 * mm,
-            topMargin=18 * mm,
-            bottomMargin=15 * mm,
-        )
-        styles = getSampleStyleSheet()
-        h1 = ParagraphStyle(
-            "H1", parent=styles["Heading1"], fontSize=14, leading=16, spaceAfter=6
-        )
-        small = ParagraphStyle("small", parent=styles["Normal"], fontSize=9, leading=11)
-
-        elems = []
-
-        # Header with logo on the right
-        clinic_left = [
-            Paragraph("<b>PET WELLNESS VETS</b>", h1),
-            Paragraph("Kyriakou Adamou no.2, Shop 2&3, 8220", small),
-            Paragraph("Tel: 99941186", small),
-            Paragraph("Email: contact@petwellnessvets.com", small),
-        ]
-        logo_fp = _find_logo_path()
-        logo_cell = [Image(logo_fp, width=35 * mm, height=18 * mm)] if logo_fp else []
-        header_tbl = Table([[clinic_left, logo_cell]], colWidths=[120 * mm, 49 * mm])
-        header_tbl.setStyle(
-            TableStyle(
-                [
-                    ["VALIGN", (0, 0), (-1, -1), "TOP"],
-                    ["ALIGN", (1, 0), (1, 0), "RIGHT"],
-                ]
-            )
-        )
-        elems += [header_tbl, Spacer(1, 6 * mm)]
+    def _on_render_cancelled(self, job_id):
+        self._render_jobs.pop(job_id, None)
+        self.render_toast.show_pending(self.render_service.pending())
 
-        # Title & meta
-        title_map = {
-            "INVOICE": "INVOICE",
-            "ESTIMATE": "ESTIMATE",
-            "CHARITY": "CHARITY / PRO BONO",
-        }
-        title = title_map.get(str(doc_type).upper(), "INVOICE")
-        meta_tbl = Table(
-            [
-                [Paragraph(f"<b>{title}</b>", styles["Title"]), ""],
-                ["Invoice #:", str(inv_id)],
-                ["Date:", created_date],
-                ["Time:", created_time],
-                ["Customer:", owner_name],
-                ["Pet:", pet_name],
-            ],
-            colWidths=[35 * mm, 134 * mm],
-        )
-        meta_tbl.setStyle(
-            TableStyle(
-                [
-                    ["BOTTOMPADDING", (0, 0), (-1, -1), 3],
-                    ["FONTSIZE", (0, 1), (-1, -1), 10],
-                ]
+    def _send_to_default_printer(self, path):
+        try:
+            os.startfile(path, "print")
+        except Exception as e:
+            QMessageBox.critical(
+                self, "Print Error", f"Couldn't send to the default printer:\n{e}"
             )
-        )
-        elems += [meta_tbl, Spacer(1, 8 * mm)]
 
-        # Items table
-        data = [
-            [
-                "Description",
-                "Qty",
-                "Unit (net €)",
-                "Discount (€)",
-                "VAT (€)",
-                "Line Total (€)",
-            ]
-        ]
-        for it in items:
-            data.append(
-                [
-                    it["desc"],
-                    str(it["qty"]),
-                    f"{float(it['unit']):.2f}",
-                    f"{float(it['disc_amt']):.2f}",
-                    f"{float(it['vat_amt']):.2f}",
-                    f"{float(it['total']):.2f}",
-                ]
-            )
-        itbl = Table(
-            data, colWidths=[90 * mm, 15 * mm, 22 * mm, 24 * mm, 20 * mm, 28 * mm]
-        )
-        itbl.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f0f0f0")),
-                    ("LINEABOVE", (0, 0), (-1, 0), 0.6, colors.black),
-                    ("LINEBELOW", (0, 0), (-1, 0), 0.6, colors.black),
-                    ("GRID", (0, 1), (-1, -1), 0.25, colors.HexColor("#c8c8c8")),
-                    ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
-                    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 10),
-                ]
-            )
-        )
-        elems += [itbl, Spacer(1, 8 * mm)]
-
-        # VAT breakdown
-        vat_data = [["Net (€)", "VAT %", "VAT (€)", "Flag"]]
-        for v in vat_breakdown:
-            vat_data.append(
-                [
-                    f"{float(v['net'] or 0):.2f}",
-                    f"{v['vat_pct']:.2f}%",
-                    f"{float(v['vat_amount'] or 0):.2f}",
-                    v["flag"],
-                ]
-            )
-        vat_data.append(["", "", "Total VAT", f"€{float(vat_total or 0):.2f}"])
-        vtbl = Table(vat_data, colWidths=[40 * mm, 20 * mm, 30 * mm, 20 * mm])
-        vtbl.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f0f0f0")),
-                    ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#c8c8c8")),
-                    ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 10),
-                ]
-            )
-        )
-        elems += [vtbl, Spacer(1, 8 * mm)]
-
-        # Accounting block
-        gross_subtotal = sum(float(it["total"] or 0) for it in items)
-        disc_pct_val = float(disc_pct or 0)
-        discount_amount = gross_subtotal * (disc_pct_val / 100.0)
-
-        accounting = [
-            ["Subtotal (Excl. VAT):", f"€{float(net_excl_vat or 0):.2f}"],
-            ["VAT Total:", f"€{float(vat_total or 0):.2f}"],
-            ["Gross Subtotal (Incl. VAT):", f"€{gross_subtotal:.2f}"],
-        ]
-        if disc_pct_val > 0:
-            accounting.append(
-                [f"Invoice Discount ({disc_pct_val:.0f}%):", f"-€{discount_amount:.2f}"]
-            )
-        accounting += [
-            ["Total (Incl. VAT):", f"€{float(final_total or gross_subtotal):.2f}"],
-            ["Amount Paid:", f"€{float(paid_amount or 0):.2f}"],
-            ["Balance Due:", f"€{float(balance_due or 0):.2f}"],
-            ["Status:", status],
-        ]
-        audit_tbl = Table(accounting, colWidths=[60 * mm, 40 * mm], hAlign="RIGHT")
-        audit_tbl.setStyle(
-            TableStyle(
-                [
-                    ["ALIGN", (1, 0), (1, -1), "RIGHT"],
-                    ["FONTSIZE", (0, 0), (-1, -1), 11],
-                    ["BOTTOMPADDING", (0, 0), (-1, -1), 2],
-                ]
+    def _send_to_thermal_printer(self, path):
+        thermal_name = None
+        for pi in QPrinterInfo.availablePrinters():
+            n = pi.printerName().lower()
+            if "thermal" in n or "epson" in n:
+                thermal_name = pi.printerName()
+                break
+        if not thermal_name:
+            QMessageBox.warning(
+                self,
+                "Printer Not Found",
+                "Could not find your thermal printer. Ensure its driver is installed and the name contains Thermal Epson",
             )
-        )
-        elems += [audit_tbl, Spacer(1, 6 * mm)]
-
-        # Non-payable note
-        if str(doc_type).upper() == "ESTIMATE":
-            elems += [
-                Paragraph(
-                    "This is a non-binding estimate. No payment due. Stock is not reserved and may change.",
-                    small,
-                ),
-                Spacer(1, 4 * mm),
-            ]
-        elif str(doc_type).upper() == "CHARITY":
-            elems += [
-                Paragraph(
-                    "Charity / pro bono document. No payment due (clinic-sponsored).",
-                    small,
-                ),
-                Spacer(1, 4 * mm),
-            ]
-
-        # Signatures
-        sig_tbl = Table(
-            [
-                ["Doctor:", "Issued By:", "Received By:"],
-                ["__________________", "__________________", "__________________"],
-            ],
-            colWidths=[60 * mm, 60 * mm, 49 * mm],
-        )
-        sig_tbl.setStyle(TableStyle([["FONTSIZE", (0, 0), (-1, -1), 10]]))
-        elems.append(sig_tbl)
-
-        doc.build(elems)
+            return
+        import win32print
 
+        original = win32print.GetDefaultPrinter()
+        try:
+            win32print.SetDefaultPrinter(thermal_name)
+            os.startfile(path, "print")
+        finally:
+            win32print.SetDefaultPrinter(original)
 
     # Totals / status helpers / export / clear
     def calculate_final_amount(self):
@@ -2910,18 +2137,9 @@ class BillingInvoicingScreen(QWidget):
             final_amount = total - (total * disc)
             self.final_amount_label.setText(f"{final_amount:.2f}")
 
-            conn = _connect()
-            cur = conn.cursor()
-            cur.execute(
-                """
-                SELECT COALESCE(SUM(amount_paid), 0)
-                  FROM payment_history
-                 WHERE invoice_id = ?
-                """,
-                (self.selected_invoice_id,),
+            paid = float(
+                query_scalar("invoice.paid_total", (self.selected_invoice_id,)) or 0
             )
-            paid = float(cur.fetchone()[0] or 0)
-            conn.close()
 
             remaining = final_amount - paid
             self.remaining_balance_label.setText(f"{remaining:.2f}")
@@ -2938,12 +2156,7 @@ class BillingInvoicingScreen(QWidget):
             self.remaining_balance_label.setText("0.00")
 
     def calculate_totals_from_items(self):
-        total = 0.0
-        for r in range(self.item_table.rowCount()):
-            try:
-                total += float(self.item_table.item(r, 5).text())
-            except Exception:
-                pass
+        total = sum(float(line[COL_TOTAL] or 0) for line in self.item_tracker.lines())
         self.total_amount_input.setText(f"{total:.2f}")
         disc = self.discount_input.value() / 100.0
         final = total - (total * disc)
@@ -2954,18 +2167,14 @@ class BillingInvoicingScreen(QWidget):
         conn = _connect()
         cursor = conn.cursor()
 
-        cursor.execute(
-            "SELECT COALESCE(SUM(amount_paid), 0) FROM payment_history WHERE invoice_id = ?",
-            (invoice_id,),
+        total_paid = float(
+            query_scalar("invoice.paid_total", (invoice_id,), conn=conn) or 0.0
         )
-        total_paid = float(cursor.fetchone()[0] or 0.0)
 
         if not final_amount:
-            cursor.execute(
-                "SELECT COALESCE(final_amount,0) FROM invoices WHERE invoice_id = ?",
-                (invoice_id,),
+            final_amount = float(
+                query_scalar("invoice.final_amount", (invoice_id,), conn=conn) or 0.0
             )
-            final_amount = float((cursor.fetchone() or [0])[0] or 0.0)
 
         remaining_balance = round(final_amount - total_paid, 2)
         if remaining_balance < 0:
@@ -2990,23 +2199,20 @@ class BillingInvoicingScreen(QWidget):
         )
         if not path:
             return
-        rows = self.invoice_table.rowCount()
-        cols = self.invoice_table.columnCount()
+        model = self.invoice_model
+        model.fetch_all()  # export every matching invoice, not just loaded pages
+        rows = model.rowCount()
+        cols = model.columnCount()
         if rows == 0:
             QMessageBox.warning(self, "No Data", "There are no invoices to export.")
             return
         try:
             with open(path, "w", newline="", encoding="utf-8") as f:
                 w = csv.writer(f)
-                headers = [
-                    self.invoice_table.horizontalHeaderItem(c).text()
-                    for c in range(cols)
-                ]
+                headers = [model.headerData(c, Qt.Horizontal) for c in range(cols)]
                 w.writerow(headers)
                 for r in range(rows):
-                    w.writerow(
-                        [self.invoice_table.item(r, c).text() for c in range(cols)]
-                    )
+                    w.writerow([model.index(r, c).data() for c in range(cols)])
             QMessageBox.information(
                 self, "Export Successful", f"Invoices exported to {path}."
             )
@@ -3015,6 +2221,102 @@ class BillingInvoicingScreen(QWidget):
                 self, "Export Failed", f"An error occurred while exporting: {e}"
             )
 
+    def export_invoice_pdfs(self):
+        """A4 PDFs for the selected invoices, or every invoice matching the filters."""
+        model = self.invoice_model
+        selected = self.invoice_table.selectionModel().selectedRows()
+        rows = sorted({i.row() for i in selected})
+        if not rows:
+            model.fetch_all()  # every matching invoice, not just loaded pages
+            rows = range(model.rowCount())
+        ids = sorted(model.invoice_id(r) for r in rows)
+        if not ids:
+            QMessageBox.warning(self, "No Data", "There are no invoices to export.")
+            return
+        what = (
+            f"{len(ids)} selected invoice(s)"
+            if selected
+            else f"all {len(ids)} filtered invoice(s)"
+        )
+
+        from invoice_export import can_merge_pdf, export_invoices
+
+        msg = QMessageBox(self)
+        msg.setWindowTitle("Export PDFs")
+        msg.setText(f"Export {what} as A4 PDFs:")
+        folder_btn = msg.addButton("Separate Files", QMessageBox.AcceptRole)
+        zip_btn = msg.addButton("ZIP Archive", QMessageBox.AcceptRole)
+        merge_btn = None
+        if can_merge_pdf():
+            merge_btn = msg.addButton("One Merged PDF", QMessageBox.AcceptRole)
+        msg.addButton("Cancel", QMessageBox.RejectRole)
+        msg.exec()
+        clicked = msg.clickedButton()
+        span = (
+            f"{self.start_date.date().toString('yyyyMMdd')}_"
+            f"{self.end_date.date().toString('yyyyMMdd')}"
+        )
+        if clicked is folder_btn:
+            merge = None
+            dest = QFileDialog.getExistingDirectory(self, "Export Invoices To")
+        elif clicked is zip_btn:
+            merge = "zip"
+            dest, _ = QFileDialog.getSaveFileName(
+                self, "Save Invoices", f"Invoices_{span}.zip", "ZIP Files (*.zip)"
+            )
+        elif merge_btn is not None and clicked is merge_btn:
+            merge = "pdf"
+            dest, _ = QFileDialog.getSaveFileName(
+                self, "Save Invoices", f"Invoices_{span}.pdf", "PDF Files (*.pdf)"
+            )
+        else:
+            return
+        if not dest:
+            return
+
+        progress = QProgressDialog("Rendering invoices…", "Cancel", 0, len(ids), self)
+        progress.setWindowTitle("Export PDFs")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+
+        def on_progress(done, total):
+            progress.setValue(done)
+            QApplication.processEvents()
+            return not progress.wasCanceled()
+
+        try:
+            result = export_invoices(ids, dest, merge=merge, progress=on_progress)
+        except Exception as e:
+            log_error(f"Bulk invoice export failed: {e}")
+            QMessageBox.critical(
+                self, "Export Failed", f"Could not export invoices: {e}"
+            )
+            return
+        finally:
+            progress.close()
+
+        if result["cancelled"]:
+            QMessageBox.information(
+                self, "Export Cancelled", f"{result['invoices']} invoice(s) rendered."
+            )
+            return
+        if not result["files"]:
+            QMessageBox.critical(
+                self,
+                "Export Failed",
+                f"None of the {len(ids)} invoice(s) could be rendered; "
+                "nothing was saved. See the error log.",
+            )
+            return
+        text = (
+            f"{result['invoices']} invoice(s), {result['pages']} page(s) in "
+            f"{result['seconds']:.1f}s ({result['pages_per_sec']:.1f} pages/s).\n"
+            f"Saved to {dest}"
+        )
+        if result["failed"]:
+            text += f"\n\n{len(result['failed'])} invoice(s) failed; see the error log."
+        QMessageBox.information(self, "Export Complete", text)
+
     def clear_invoice_form(self):
         self.appointment_id_input.clear()
         self.patient_name_label.clear()
@@ -3026,6 +2328,7 @@ class BillingInvoicingScreen(QWidget):
         self.payment_method_dropdown.setCurrentIndex(0)
 
         self.item_table.setRowCount(0)
+        self.item_tracker.load(None, [])
 
         self.save_btn.setEnabled(False)
         self.delete_button.setEnabled(False)
@@ -1,6 +1,5 @@
 # consent_forms.py
 import os
-import sqlite3
 from datetime import datetime
 
 from PySide6.QtCore import QDate, Signal
@@ -20,11 +19,8 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QWidget,
 )
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.utils import ImageReader
-from reportlab.pdfgen import canvas as pdf_canvas
 
+from db import add_missing_columns, has_table, run_query, table_columns
 from db import connect as _connect
 
 # ---- Clinic Header (edit these) ------------------------------------------------
@@ -33,14 +29,31 @@ CLINIC_ADDR1 = "Kyriakou Adamou no.2, Shop 2&3, 8220"
 CLINIC_ADDR2 = ""
 CLINIC_PHONE = "Tel: 99941186"
 CLINIC_EMAIL = "Email: contact@petwellnessvets.com"
-CLINIC_LOGO = os.path.join(
-    os.path.dirname(__file__), "pet_wellness_logo.png"
-)  # optional
+# Logo: the shared clinic logo (render_assets.logo_path())
 
 
 # ---- Ensure / migrate consent_forms schema -------------------------------------
+_CONSENT_COLUMNS = (
+    ("template_id", "INTEGER"),
+    ("form_type", "TEXT"),
+    ("body_text", "TEXT"),
+    ("signed_by", "TEXT"),
+    ("relation", "TEXT"),
+    ("follow_up_date", "TEXT"),
+    ("signature_path", "TEXT"),
+    ("status", "TEXT NOT NULL DEFAULT 'Draft'"),
+    ("created_at", "TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP"),
+)
+
+
 def _ensure_consent_schema():
     conn = _connect()
+    # Fast path: everything already in place (answered from the schema cache)
+    if has_table("consent_templates", conn=conn) and {
+        col for col, _ in _CONSENT_COLUMNS
+    } <= table_columns("consent_forms", conn=conn):
+        conn.close()
+        return
     cur = conn.cursor()
     cur.execute(
         """
@@ -60,21 +73,7 @@ def _ensure_consent_schema():
     """
     )
     # Add columns if missing (safe re-run)
-    for col, ddl in [
-        ("template_id", "INTEGER"),
-        ("form_type", "TEXT"),
-        ("body_text", "TEXT"),
-        ("signed_by", "TEXT"),
-        ("relation", "TEXT"),
-        ("follow_up_date", "TEXT"),
-        ("signature_path", "TEXT"),
-        ("status", "TEXT NOT NULL DEFAULT 'Draft'"),
-        ("created_at", "TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP"),
-    ]:
-        try:
-            cur.execute(f"ALTER TABLE consent_forms ADD COLUMN {col} {ddl}")
-        except sqlite3.OperationalError:
-            pass
+    add_missing_columns(conn, "consent_forms", _CONSENT_COLUMNS)
     # Optional: minimal template table for dropdown (if you already have it, this is harmless)
     cur.execute(
         """
@@ -89,9 +88,6 @@ def _ensure_consent_schema():
     conn.close()
 
 
-_ensure_consent_schema()
-
-
 class ConsentFormsScreen(QWidget):
     # Allows Patient screen to preselect a patient & open "new consent" quickly
     create_for_patient = Signal(int, str)
@@ -102,6 +98,7 @@ class ConsentFormsScreen(QWidget):
         self.selected_consent_id = None
         self.selected_patient_id = None
         self._last_template_id_applied = None  # for smarter replace logic
+        _ensure_consent_schema()  # legacy DBs; here rather than at import
 
         main = QVBoxLayout(self)
 
@@ -282,20 +279,9 @@ class ConsentFormsScreen(QWidget):
         conn = _connect()  # autocommit
 
         conn.execute("PRAGMA foreign_keys=ON;")
-        cur = conn.cursor()
-        q = """
-            SELECT c.consent_id, p.name, c.form_type, c.status, c.follow_up_date,
-                   c.signed_by, c.relation, c.created_at, p.patient_id
-            FROM consent_forms c
-            JOIN patients p ON p.patient_id = c.patient_id
-            WHERE DATE(c.created_at) BETWEEN DATE(?) AND DATE(?)
-        """
-        params = [d1, d2]
-        if status != "All":
-            q += " AND c.status = ?"
-            params.append(status)
-        cur.execute(q, params)
-        rows = cur.fetchall()
+        rows = run_query(
+            conn, "consent_forms.in_range", (d1, d2, status, status)
+        ).fetchall()
         conn.close()
 
         # Basic keyword filter on patient or form type
@@ -480,11 +466,15 @@ class ConsentFormsScreen(QWidget):
 
     def _draw_header(self, pdf, W, H):
         """Draws the clinic header area on the canvas."""
+        from reportlab.lib import colors
+
+        from render_assets import logo_reader
+
         y = H - 50
         # Logo (left)
-        if CLINIC_LOGO and os.path.exists(CLINIC_LOGO):
+        img = logo_reader(80, 40)
+        if img:
             try:
-                img = ImageReader(CLINIC_LOGO)
                 pdf.drawImage(
                     img,
                     50,
@@ -546,9 +536,10 @@ class ConsentFormsScreen(QWidget):
 
         try:
             from reportlab.lib.pagesizes import A4
-            from reportlab.lib.utils import ImageReader
             from reportlab.pdfgen import canvas as pdf_canvas
 
+            from render_assets import logo_reader
+
             pdf = pdf_canvas.Canvas(out, pagesize=A4)
             W, H = A4
 
@@ -557,7 +548,6 @@ class ConsentFormsScreen(QWidget):
             clinic_address = "Kyriakou Adamou no.2, Shop 2&3, 8220"
             clinic_phone = "+357 99 941 186"
             clinic_email = "contact@petwellnessvets.com"
-            logo_path = os.path.join(os.path.dirname(__file__), "pet_wellness_logo.png")
 
             y = H - 40
             pdf.setFont("Helvetica-Bold", 14)
@@ -571,8 +561,8 @@ class ConsentFormsScreen(QWidget):
             pdf.drawString(50, y, clinic_email)
 
             # Logo aligned right
-            if os.path.exists(logo_path):
-                logo = ImageReader(logo_path)
+            logo = logo_reader(90, 60)
+            if logo:
                 pdf.drawImage(
                     logo,
                     W - 140,
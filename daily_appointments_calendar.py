@@ -12,6 +12,7 @@ from PySide6.QtWidgets import (
 )
 
 from db import connect as _connect
+from db import query_all
 
 
 class DailyAppointmentsCalendar(QWidget):
@@ -70,27 +71,8 @@ class DailyAppointmentsCalendar(QWidget):
         selected_date = date.toString("yyyy-MM-dd")
         self.date_label.setText(f"Appointments for: {selected_date}")
 
-        conn = _connect()
-        cursor = conn.cursor()
-
-        # Query to fetch appointments for the selected date
-        cursor.execute(
-            """
-            SELECT 
-                TIME(date_time) AS time,
-                p.name AS patient_name,
-                p.owner_name,
-                a.reason,
-                a.veterinarian
-            FROM appointments a
-            JOIN patients p ON a.patient_id = p.patient_id
-            WHERE DATE(a.date_time) = ?
-            ORDER BY a.date_time
-        """,
-            (selected_date,),
-        )
-        appointments = cursor.fetchall()
-        conn.close()
+        # Appointments for the selected date (indexed on DATE(date_time))
+        appointments = query_all("appointments.for_day", (selected_date,))
 
         # Populate the table with appointments
         self.appointments_table.setRowCount(0)
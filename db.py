@@ -3,7 +3,9 @@ from __future__ import annotations
 
 import contextlib
 import os
+import re
 import sqlite3
+import threading
 from typing import Any, Iterable, Iterator, Mapping
 
 from backup import DB_PATH  # the one source of truth for the file location
@@ -11,8 +13,19 @@ from backup import DB_PATH  # the one source of truth for the file location
 # Allow runtime override for QA/testing (optional)
 _DB_PATH = os.getenv("PETWELLNESS_DB") or str(DB_PATH)
 
+# Idle connections kept per thread; nested open/close pairs beyond this are closed.
+POOL_MAX_IDLE = int(os.getenv("PETWELLNESS_POOL_IDLE", "4"))
+# Per-connection prepared-statement cache (sqlite3 default is 128). Sized well
+# above the named-query registry so hot statements are never evicted.
+STATEMENT_CACHE_SIZE = 256
+
+
+# --- PRAGMA configuration applied once per physical connection ---
+def _casefold(value):
+    # SQLite's lower() only folds ASCII; names like 'Σουζάνα' need Python's
+    return None if value is None else str(value).casefold()
+
 
-# --- PRAGMA configuration applied everywhere ---
 def _configure(conn: sqlite3.Connection) -> sqlite3.Connection:
     # autocommit-style behavior to match your current pattern
     conn.isolation_level = None
@@ -20,12 +33,182 @@ def _configure(conn: sqlite3.Connection) -> sqlite3.Connection:
     conn.execute("PRAGMA synchronous=NORMAL;")
     conn.execute("PRAGMA busy_timeout=8000;")
     conn.execute("PRAGMA foreign_keys=ON;")
+    conn.create_function("casefold", 1, _casefold, deterministic=True)
+    return conn
+
+
+# --- Thread-local connection pool ---
+class PooledConnection(sqlite3.Connection):
+    """The pooled sqlite3 handle; callers only ever see it through a Checkout."""
+
+    _pool_generation = -1
+    _pool_pid = -1
+    _prepared: set[str] | None = None  # registry names already compiled here
+
+    def dispose(self) -> None:
+        """Really close the underlying handle."""
+        self.close()
+
+
+class Checkout:
+    """
+    What connect() returns: the pooled connection until close(), which hands it
+    back to the calling thread's pool. Like a closed sqlite3 connection, the
+    checkout then raises ProgrammingError, so a stale reference can never run on
+    (or commit, or roll back) the next caller's connection. Existing
+    `conn = connect(); ...; conn.close()` code keeps working unchanged.
+    """
+
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn: PooledConnection):
+        object.__setattr__(self, "_conn", conn)
+
+    def _live(self) -> PooledConnection:
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return self._conn
+
+    # Hot methods delegate directly; everything else goes through __getattr__.
+    def execute(self, *args):
+        return self._live().execute(*args)
+
+    def cursor(self, *args):
+        return self._live().cursor(*args)
+
+    def commit(self):
+        return self._live().commit()
+
+    def rollback(self):
+        return self._live().rollback()
+
+    @property
+    def _prepared(self):
+        return self._live()._prepared
+
+    def __getattr__(self, name):
+        return getattr(self._live(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._live(), name, value)
+
+    def __enter__(self):
+        self._live().__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._live().__exit__(*exc)
+
+    def close(self) -> None:
+        conn = self._conn
+        if conn is not None:  # closing twice is a no-op, as in sqlite3
+            object.__setattr__(self, "_conn", None)
+            _release(conn)
+
+
+_local = threading.local()
+_generation = 0
+_stats_lock = threading.Lock()
+_stats = {"opened": 0, "reused": 0, "discarded": 0}
+
+
+def _bump(key: str) -> None:
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def _idle() -> list[PooledConnection]:
+    idle = getattr(_local, "idle", None)
+    if idle is None:
+        idle = _local.idle = []
+    return idle
+
+
+def _open_raw(*, timeout: float = 10.0, factory=sqlite3.Connection):
+    """Open a brand-new configured connection (the pre-pool behaviour)."""
+    return _configure(
+        sqlite3.connect(
+            _DB_PATH,
+            timeout=timeout,
+            factory=factory,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+    )
+
+
+def _healthy(conn: PooledConnection) -> bool:
+    if conn._pool_generation != _generation or conn._pool_pid != os.getpid():
+        return False
+    try:
+        conn.execute("SELECT 1").fetchone()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+def _discard(conn: PooledConnection) -> None:
+    _bump("discarded")
+    try:
+        conn.dispose()
+    except sqlite3.Error:
+        pass
+
+
+def _acquire(timeout: float) -> PooledConnection:
+    idle = _idle()
+    while idle:
+        conn = idle.pop()
+        if _healthy(conn):
+            _bump("reused")
+            return conn
+        _discard(conn)
+    conn = _open_raw(timeout=timeout, factory=PooledConnection)
+    conn._pool_generation = _generation
+    conn._pool_pid = os.getpid()
+    conn._prepared = set()
+    _bump("opened")
     return conn
 
 
+def _release(conn: PooledConnection) -> None:
+    try:
+        if conn.in_transaction:
+            conn.rollback()  # never hand a half-finished transaction to the next caller
+        conn.row_factory = None
+    except sqlite3.Error:
+        _discard(conn)
+        return
+    idle = _idle()
+    if (
+        conn._pool_generation == _generation
+        and len(idle) < POOL_MAX_IDLE
+        and conn not in idle
+    ):
+        idle.append(conn)
+    else:
+        _discard(conn)
+
+
+def reset_pool() -> None:
+    """
+    Drop every pooled connection (e.g. before the DB file is swapped).
+    Idle connections of this thread close now; other threads drop theirs on next use.
+    """
+    global _generation
+    _generation += 1
+    idle = _idle()
+    while idle:
+        _discard(idle.pop())
+
+
+def pool_stats() -> dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
+
+
 def connect(*, timeout: float = 10.0) -> sqlite3.Connection:
-    """Open a connection to the single, canonical DB with consistent PRAGMAs."""
-    return _configure(sqlite3.connect(_DB_PATH, timeout=timeout))
+    """Borrow a connection to the canonical DB (pooled per thread, PRAGMAs preset)."""
+    return Checkout(_acquire(timeout))
 
 
 @contextlib.contextmanager
@@ -38,6 +221,556 @@ def open_conn(*, timeout: float = 10.0) -> Iterator[sqlite3.Connection]:
         conn.close()
 
 
+# --- Schema introspection cache ---
+# Which tables / columns exist, answered from memory. Every lookup costs one
+# probe of the DB file, PRAGMA schema_version (bumped by SQLite on any DDL, from
+# any connection or process) and the app's schema_version row; the cached
+# sqlite_master / PRAGMA table_info answers are dropped when that key moves.
+_SCHEMA_PROBE = """
+    SELECT (SELECT file FROM pragma_database_list WHERE name = 'main'),
+           (SELECT schema_version FROM pragma_schema_version),
+           (SELECT version FROM schema_version WHERE id = 1)
+"""
+_SCHEMA_PROBE_BARE = """
+    SELECT (SELECT file FROM pragma_database_list WHERE name = 'main'),
+           (SELECT schema_version FROM pragma_schema_version),
+           NULL
+"""
+_schema_lock = threading.Lock()
+# db file -> ((PRAGMA schema_version, app version), {table or None: names})
+_schema_cache: dict[str, tuple[tuple, dict]] = {}
+_schema_stats = {"probes": 0, "introspections": 0}
+
+
+def _schema_entry(conn: sqlite3.Connection) -> dict:
+    try:
+        path, cookie, version = conn.execute(_SCHEMA_PROBE).fetchone()
+    except sqlite3.OperationalError:  # no schema_version table (yet)
+        path, cookie, version = conn.execute(_SCHEMA_PROBE_BARE).fetchone()
+    key = (cookie, version)
+    with _schema_lock:
+        _schema_stats["probes"] += 1
+        cached = _schema_cache.get(path)
+        if cached is None or cached[0] != key:
+            cached = _schema_cache[path] = (key, {})
+        return cached[1]
+
+
+def _introspect(conn, table: str | None) -> frozenset[str]:
+    entry = _schema_entry(conn)
+    names = entry.get(table)
+    if names is None:
+        if table is None:
+            rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        else:
+            rows = conn.execute("SELECT name FROM pragma_table_info(?)", (table,))
+        names = frozenset(r[0] for r in rows)
+        with _schema_lock:
+            _schema_stats["introspections"] += 1
+            entry[table] = names
+    return names
+
+
+def table_names(*, conn: sqlite3.Connection | None = None) -> frozenset[str]:
+    """Names of the tables in the DB."""
+    if conn is not None:
+        return _introspect(conn, None)
+    with open_conn() as con:
+        return _introspect(con, None)
+
+
+def table_columns(
+    table: str, *, conn: sqlite3.Connection | None = None
+) -> frozenset[str]:
+    """Column names of `table` (empty if the table doesn't exist)."""
+    if conn is not None:
+        return _introspect(conn, table)
+    with open_conn() as con:
+        return _introspect(con, table)
+
+
+def has_table(table: str, *, conn: sqlite3.Connection | None = None) -> bool:
+    return table in table_names(conn=conn)
+
+
+def has_column(
+    table: str, column: str, *, conn: sqlite3.Connection | None = None
+) -> bool:
+    return column in table_columns(table, conn=conn)
+
+
+def add_missing_columns(
+    conn: sqlite3.Connection, table: str, columns: Iterable[tuple[str, str]]
+) -> list[str]:
+    """
+    ALTER TABLE ... ADD COLUMN for each (name, declaration) `table` lacks; returns
+    the names added. Columns SQLite refuses to add to an existing table (e.g. a
+    non-constant DEFAULT) are skipped, as the old try/ALTER/except loops did.
+    """
+    have = _introspect(conn, table)
+    added = []
+    for name, decl in columns:
+        if name in have:
+            continue
+        try:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+            added.append(name)
+        except sqlite3.OperationalError:
+            pass
+    return added
+
+
+def schema_cache_stats() -> dict[str, int]:
+    """Schema probes served vs real sqlite_master / table_info reads."""
+    with _schema_lock:
+        return dict(_schema_stats)
+
+
+def clear_schema_cache() -> None:
+    with _schema_lock:
+        _schema_cache.clear()
+
+
+# --- Named query registry ---
+# Hot statements live here under stable names so every screen sends the exact
+# same SQL text (one compiled statement per connection) and we can see which
+# ones are hot via query_stats(). A "miss" is the first run of a name on a
+# connection (statement gets prepared); later runs are served from the cache.
+QUERIES: dict[str, str] = {}
+# Names whose plan must be index-driven; see full_scan_offenders().
+HOT_QUERIES: set[str] = set()
+_query_stats: dict[str, dict[str, int]] = {}
+
+
+def register_query(name: str, sql: str, *, hot: bool = False) -> str:
+    """Register `sql` under `name`; re-registering identical SQL is a no-op."""
+    existing = QUERIES.get(name)
+    if existing is not None and existing != sql:
+        raise ValueError(f"Query {name!r} is already registered with different SQL")
+    QUERIES[name] = sql
+    if hot:
+        HOT_QUERIES.add(name)
+    return name
+
+
+def _note_run(conn: sqlite3.Connection, name: str) -> None:
+    prepared = getattr(conn, "_prepared", None)
+    hit = isinstance(prepared, set) and name in prepared
+    if isinstance(prepared, set) and not hit:
+        prepared.add(name)
+    with _stats_lock:
+        st = _query_stats.setdefault(name, {"calls": 0, "hits": 0, "misses": 0})
+        st["calls"] += 1
+        st["hits" if hit else "misses"] += 1
+
+
+def run_query(
+    conn: sqlite3.Connection,
+    name: str,
+    params: Iterable[Any] | Mapping[str, Any] = (),
+) -> sqlite3.Cursor:
+    """Execute the registered statement `name` on an open connection."""
+    try:
+        sql = QUERIES[name]
+    except KeyError:
+        raise KeyError(f"Unknown query {name!r}") from None
+    _note_run(conn, name)
+    return conn.execute(sql, params)
+
+
+def query_all(name: str, params=(), *, conn: sqlite3.Connection | None = None):
+    if conn is not None:
+        return run_query(conn, name, params).fetchall()
+    with open_conn() as con:
+        return run_query(con, name, params).fetchall()
+
+
+def query_one(name: str, params=(), *, conn: sqlite3.Connection | None = None):
+    if conn is not None:
+        return run_query(conn, name, params).fetchone()
+    with open_conn() as con:
+        return run_query(con, name, params).fetchone()
+
+
+def query_scalar(name: str, params=(), *, conn: sqlite3.Connection | None = None):
+    row = query_one(name, params, conn=conn)
+    return None if row is None else row[0]
+
+
+def query_stats() -> dict[str, dict[str, int]]:
+    """Per-name call/hit/miss counters, hottest first."""
+    with _stats_lock:
+        snap = {k: dict(v) for k, v in _query_stats.items()}
+    return dict(sorted(snap.items(), key=lambda kv: kv[1]["calls"], reverse=True))
+
+
+def _dummy_params(sql: str):
+    named = re.findall(r"(?<![\w'])[:@$]([A-Za-z_]\w*)", sql)
+    if named:
+        return {n: None for n in named}
+    return [None] * sql.count("?")
+
+
+def query_plan(conn: sqlite3.Connection, name: str) -> list[str]:
+    """EXPLAIN QUERY PLAN detail lines for a registered statement."""
+    sql = QUERIES[name]
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", _dummy_params(sql)).fetchall()
+    return [str(r[3]) for r in rows]
+
+
+def full_scan_offenders(
+    conn: sqlite3.Connection, names: Iterable[str] | None = None
+) -> list[tuple[str, str]]:
+    """
+    (name, plan line) for every hot query that walks a whole table or index
+    instead of SEARCHing it. Empty list == all hot predicates are indexed.
+    """
+    offenders = []
+    for name in sorted(HOT_QUERIES if names is None else names):
+        for detail in query_plan(conn, name):
+            # Virtual-table scans walk bound values (json_each(:ids)), not a table
+            if (
+                detail.startswith("SCAN ")
+                and "CONSTANT ROW" not in detail
+                and "VIRTUAL TABLE" not in detail
+            ):
+                offenders.append((name, detail))
+    return offenders
+
+
+register_query(
+    "invoice.paid_total",
+    "SELECT COALESCE(paid_total, 0) FROM invoices WHERE invoice_id = ?",
+    hot=True,
+)
+register_query(
+    "invoice.final_amount",
+    "SELECT COALESCE(final_amount, 0) FROM invoices WHERE invoice_id = ?",
+    hot=True,
+)
+register_query(
+    "invoice.items",
+    """
+    SELECT item_id, description, quantity, unit_price, vat_amount, discount_amount,
+           total_price
+      FROM invoice_items
+     WHERE invoice_id = ?
+     ORDER BY item_id
+    """,
+    hot=True,
+)
+# Print payload (invoice_pdf). Each statement is registered twice: for a bulk
+# export batch, :ids is a JSON array of invoice ids; the "_one" variant reads a
+# single print by :id directly (json_each costs more than the reads themselves
+# for one invoice). name -> (table, alias, SQL over {source} / {where})
+_PRINT_SQL = {
+    "invoice.print_header": (
+        "invoices",
+        "i",
+        """
+    SELECT i.invoice_id, i.appointment_id, i.owner_name, p.owner_name, p.name,
+           COALESCE(i.discount, 0), COALESCE(i.final_amount, 0),
+           COALESCE(i.invoice_type, 'INVOICE'), COALESCE(i.payment_status, 'Unpaid'),
+           COALESCE(i.paid_total, 0)
+      FROM {source}
+      LEFT JOIN appointments a ON a.appointment_id = i.appointment_id
+      LEFT JOIN patients p     ON p.patient_id     = a.patient_id
+     {where}
+    """,
+    ),
+    "invoice.print_items": (
+        "invoice_items",
+        "it",
+        """
+    SELECT it.invoice_id, it.description, it.quantity, it.unit_price,
+           it.discount_amount, it.total_price, it.vat_amount
+      FROM {source}
+     {where}
+     ORDER BY it.invoice_id, it.item_id
+    """,
+    ),
+    # VAT breakdown per (invoice, rate): net excl. VAT, VAT amount, flag
+    "invoice.print_vat": (
+        "invoice_items",
+        "it",
+        """
+    SELECT it.invoice_id, it.vat_pct,
+           SUM(COALESCE(it.total_price, 0) - COALESCE(it.vat_amount, 0)),
+           SUM(COALESCE(it.vat_amount, 0)),
+           MIN(it.vat_flag)
+      FROM {source}
+     {where}
+     GROUP BY it.invoice_id, it.vat_pct
+     ORDER BY it.invoice_id, it.vat_pct
+    """,
+    ),
+}
+for _name, (_table, _alias, _sql) in _PRINT_SQL.items():
+    register_query(
+        _name,
+        _sql.format(
+            source=f"json_each(:ids) j\n      JOIN {_table} {_alias}"
+            f" ON {_alias}.invoice_id = j.value",
+            where="",
+        ),
+        hot=True,
+    )
+    register_query(
+        f"{_name}_one",
+        _sql.format(
+            source=f"{_table} {_alias}", where=f"WHERE {_alias}.invoice_id = :id"
+        ),
+        hot=True,
+    )
+# Invoice list filters, shared by the page and summary queries. Params:
+#   :start / :end   inclusive yyyy-MM-dd bounds on created_at
+#   :status         'All' | 'Open' (not Paid) | 'Paid'
+#   :q              search text ('' = no search) matched case-insensitively
+#                   (casefold(), Unicode-aware) against appointment id,
+#                   patient/owner name and owner contact
+# Walk-ins have no appointment, so fall back to the owner snapshot. Kept as a
+# correlated lookup (not a JOIN) so the summary only pays for it when searching.
+_INVOICE_PATIENT_OR_OWNER = """COALESCE(
+               (SELECT p.name FROM appointments a
+                  JOIN patients p ON p.patient_id = a.patient_id
+                 WHERE a.appointment_id = i.appointment_id),
+               i.owner_name)"""
+_INVOICE_FILTER_SQL = f"""
+      FROM invoices i
+     WHERE {{created}} >= :start
+       AND {{created}} < date(:end, '+1 day')
+       AND (:status = 'All'
+            OR (:status = 'Open' AND i.payment_status != 'Paid')
+            OR (:status = 'Paid' AND i.payment_status = 'Paid'))
+       AND (:q = ''
+            OR instr(CAST(i.appointment_id AS TEXT), :q) > 0
+            OR instr(casefold({_INVOICE_PATIENT_OR_OWNER}), casefold(:q)) > 0
+            OR instr(casefold(i.owner_contact), casefold(:q)) > 0)
+"""
+# Keyset pagination: pass the last invoice_id seen as :before (first page:
+# INVOICE_PAGE_START) and the page size as :limit. The unary + on created_at
+# keeps the planner on the rowid walk, which stops after :limit rows.
+INVOICE_PAGE_START = 2**63 - 1
+register_query(
+    "invoice.page",
+    f"""
+    SELECT i.invoice_id,
+           i.appointment_id,
+           {_INVOICE_PATIENT_OR_OWNER} AS patient_or_owner,
+           i.total_amount,
+           i.final_amount,
+           i.payment_status,
+           i.payment_method,
+           (i.final_amount - i.paid_total) AS remaining,
+           i.owner_contact,
+           i.created_at
+    {_INVOICE_FILTER_SQL.format(created="+i.created_at")}
+       AND i.invoice_id < :before
+     ORDER BY i.invoice_id DESC
+     LIMIT :limit
+    """,
+    hot=True,
+)
+# Summary strip (Total / Remaining / Payments) over every matching payable row;
+# answered from idx_invoices_list_cover without touching the table rows.
+register_query(
+    "invoice.summary",
+    f"""
+    SELECT COALESCE(SUM(i.final_amount), 0),
+           COALESCE(SUM(i.final_amount - i.paid_total), 0),
+           COUNT(CASE WHEN i.payment_status != 'Unpaid' THEN 1 END)
+    {_INVOICE_FILTER_SQL.format(created="i.created_at")}
+       AND upper(i.payment_status) NOT IN ('ESTIMATE', 'CHARITY', 'N/A')
+    """,
+)
+
+
+# Batched SKU lookup for document stock deduction (JSON array param)
+register_query(
+    "items.ids_by_name",
+    """
+    SELECT name, MIN(item_id)
+      FROM items
+     WHERE name IN (SELECT value FROM json_each(:names))
+     GROUP BY name
+    """,
+    hot=True,
+)
+register_query(
+    "appointments.for_day",
+    """
+    SELECT TIME(a.date_time) AS time,
+           p.name AS patient_name,
+           p.owner_name,
+           a.reason,
+           a.veterinarian
+      FROM appointments a
+      JOIN patients p ON a.patient_id = p.patient_id
+     WHERE DATE(a.date_time) = ?
+     ORDER BY a.date_time
+    """,
+    hot=True,
+)
+# Overlap check for one vet; pass appointment_id=None when booking a new slot.
+register_query(
+    "appointments.vet_conflicts",
+    """
+    SELECT COUNT(*)
+      FROM appointments
+     WHERE veterinarian = ?
+       AND appointment_id IS NOT ?
+       AND datetime(date_time, '+' || duration_minutes || ' minutes') > ?
+       AND date_time < ?
+    """,
+    hot=True,
+)
+register_query(
+    "appointments.reminder_candidates",
+    """
+    SELECT a.appointment_id, a.date_time, a.reason, a.status,
+           p.owner_email, p.owner_name
+      FROM appointments a
+      JOIN patients p ON a.patient_id = p.patient_id
+     WHERE a.date_time BETWEEN ? AND ?
+       AND a.notification_status = 'Not Sent'
+       AND a.status IN ('Scheduled','To be Confirmed')
+    """,
+    hot=True,
+)
+register_query(
+    "appointments.recent_for_patient",
+    """
+    SELECT appointment_id, COALESCE(date_time,''), COALESCE(veterinarian,''), COALESCE(reason,'')
+      FROM appointments
+     WHERE patient_id = ?
+       AND date(date_time) >= date('now', '-60 days')
+     ORDER BY datetime(date_time) DESC
+    """,
+    hot=True,
+)
+
+_REMINDER_LIST_SQL = """
+    SELECT r.reminder_id,
+           a.date_time AS appointment_time,
+           p.name AS patient_name,
+           p.owner_name AS owner_name,
+           p.owner_contact AS owner_contact,
+           p.owner_email AS owner_email,
+           a.appointment_type AS appointment_type,
+           a.reason AS appointment_reason,
+           a.veterinarian AS assigned_vet,
+           a.status AS appointment_status,
+           r.reminder_time,
+           r.reminder_status,
+           r.reminder_reason
+      FROM reminders r
+      JOIN appointments a ON r.appointment_id = a.appointment_id
+      JOIN patients p ON a.patient_id = p.patient_id
+"""
+register_query("reminders.all", _REMINDER_LIST_SQL)
+register_query(
+    "reminders.for_day",
+    _REMINDER_LIST_SQL + "     WHERE DATE(r.reminder_time) = ?\n",
+    hot=True,
+)
+register_query(
+    "reminders.pending_due",
+    """
+    SELECT r.reminder_id,
+           r.appointment_id,
+           r.reminder_time,
+           r.reminder_reason,
+           p.owner_email,
+           p.owner_name,
+           a.appointment_type,
+           a.reason
+      FROM reminders r
+      JOIN appointments a ON r.appointment_id = a.appointment_id
+      JOIN patients p     ON a.patient_id   = p.patient_id
+     WHERE r.reminder_time <= ?
+       AND r.reminder_status = 'Pending'
+    """,
+    hot=True,
+)
+# Status filter: pass the combo text twice; 'All' disables it.
+register_query(
+    "consent_forms.in_range",
+    """
+    SELECT c.consent_id, p.name, c.form_type, c.status, c.follow_up_date,
+           c.signed_by, c.relation, c.created_at, p.patient_id
+      FROM consent_forms c
+      JOIN patients p ON p.patient_id = c.patient_id
+     WHERE DATE(c.created_at) BETWEEN DATE(?) AND DATE(?)
+       AND (? = 'All' OR c.status = ?)
+    """,
+    hot=True,
+)
+register_query(
+    "error_logs.in_range",
+    """
+    SELECT timestamp, error_type, error_message
+      FROM error_logs
+     WHERE DATE(timestamp) BETWEEN DATE(?) AND DATE(?)
+     ORDER BY timestamp DESC
+    """,
+    hot=True,
+)
+
+# Z-report, answered from the trigger-maintained rollups (sales_rollup.py).
+# :first / :last are inclusive business dates; :start / :end bound the payment
+# window and are whole hours (matching the hourly tender buckets), :shift is
+# the '-N hours' modifier mapping a bucket to its business date. Every
+# statement returns one row per business date plus the period totals, whose
+# date column is NULL (sorted first).
+register_query(
+    "z.sales_by_rate",
+    """
+    SELECT business_date, vat_rate, ROUND(net, 2), ROUND(vat, 2), ROUND(gross, 2)
+      FROM daily_sales_rollup
+     WHERE business_date BETWEEN :first AND :last AND lines <> 0
+    UNION ALL
+    SELECT NULL, vat_rate, ROUND(SUM(net), 2), ROUND(SUM(vat), 2), ROUND(SUM(gross), 2)
+      FROM daily_sales_rollup
+     WHERE business_date BETWEEN :first AND :last AND lines <> 0
+     GROUP BY vat_rate
+     ORDER BY 1, 2
+    """,
+    hot=True,
+)
+register_query(
+    "z.sales_totals",
+    """
+    SELECT business_date, invoice_count, ROUND(gross_sales, 2)
+      FROM daily_sales_totals
+     WHERE business_date BETWEEN :first AND :last AND invoice_count <> 0
+    UNION ALL
+    SELECT NULL, SUM(invoice_count), ROUND(SUM(gross_sales), 2)
+      FROM daily_sales_totals
+     WHERE business_date BETWEEN :first AND :last AND invoice_count <> 0
+     ORDER BY 1
+    """,
+    hot=True,
+)
+register_query(
+    "z.tenders",
+    """
+    SELECT DATE(pay_hour, :shift) AS day, method,
+           ROUND(SUM(payments), 2), ROUND(SUM(refunds), 2)
+      FROM tender_rollup
+     WHERE pay_hour >= :start AND pay_hour < :end
+     GROUP BY day, method
+    HAVING SUM(payments_count) <> 0
+    UNION ALL
+    SELECT NULL, method, ROUND(SUM(payments), 2), ROUND(SUM(refunds), 2)
+      FROM tender_rollup
+     WHERE pay_hour >= :start AND pay_hour < :end
+     GROUP BY method
+    HAVING SUM(payments_count) <> 0
+     ORDER BY 1, 2
+    """,
+    hot=True,
+)
+
 # --- Small convenience helpers (optional) ---
 def execute(sql: str, params: Iterable[Any] | Mapping[str, Any] = ()):
     with open_conn() as con:
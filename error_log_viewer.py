@@ -17,6 +17,7 @@ from PySide6.QtWidgets import (
 
 from backup import LOG_PATH
 from db import connect as _connect
+from db import query_all
 
 
 class ErrorLogViewer(QDialog):
@@ -76,20 +77,7 @@ class ErrorLogViewer(QDialog):
         end_date = self.end_date_filter.date().toString("yyyy-MM-dd")
 
         try:
-            conn = _connect()
-            cursor = conn.cursor()
-
-            cursor.execute(
-                """
-                SELECT timestamp, error_type, error_message
-                  FROM error_logs
-                 WHERE DATE(timestamp) BETWEEN DATE(?) AND DATE(?)
-                 ORDER BY timestamp DESC
-            """,
-                (start_date, end_date),
-            )
-            logs = cursor.fetchall()
-            conn.close()
+            logs = query_all("error_logs.in_range", (start_date, end_date))
 
             for row_index, (ts, type, msg) in enumerate(logs):
                 self.log_table.insertRow(row_index)
@@ -1,78 +1,139 @@
 # init_db.py
+import sqlite3
+import sys
 from hashlib import sha256
 
+from analytics_data import DATA_VERSION_TABLES, DATA_VERSION_TRIGGERS
 from db import connect as _connect
-
-
-# --- migrations helpers (ADD THIS BLOCK) ---
-def _ensure_schema_version_table(conn):
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS schema_version (
-            id INTEGER PRIMARY KEY CHECK (id = 1),
-            version INTEGER NOT NULL
-        )
+from db import INVOICE_PAGE_START, add_missing_columns, full_scan_offenders
+from db import query_all
+from sales_rollup import SALES_ROLLUP_TABLES, SALES_ROLLUP_TRIGGERS
+from sales_rollup import rebuild as rebuild_sales_rollup
+
+# Index set for the predicates the screens filter on (schema v3). Date filters
+# are written as DATE(col) in the UI queries, hence the expression indexes.
+HOT_INDEXES = (
+    # SUM(amount_paid) per invoice is answered from the index alone
+    (
+        "CREATE INDEX IF NOT EXISTS idx_payment_history_invoice"
+        " ON payment_history(invoice_id, amount_paid)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_invoice_items_invoice"
+        " ON invoice_items(invoice_id)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_stock_movements_item"
+        " ON stock_movements(item_id, change_qty)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_appointments_date_time"
+        " ON appointments(date_time)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_appointments_day"
+        " ON appointments(DATE(date_time), date_time)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_appointments_vet_date"
+        " ON appointments(veterinarian, date_time)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_appointments_patient_date"
+        " ON appointments(patient_id, date_time)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_reminders_status_time"
+        " ON reminders(reminder_status, reminder_time)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_reminders_day"
+        " ON reminders(DATE(reminder_time))"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_reminders_appt"
+        " ON reminders(appointment_id)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_consent_forms_day"
+        " ON consent_forms(DATE(created_at))"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_error_logs_day"
+        " ON error_logs(DATE(timestamp), timestamp)"
+    ),
+)
+
+# invoices.paid_total / remaining_balance are materialized (schema v4).
+# payment_history triggers keep paid_total equal to SUM(amount_paid); the
+# invoices trigger derives remaining_balance from it. Lists read the columns
+# instead of running a correlated SUM per row.
+_PAID_TOTAL_SQL = (
+    "(SELECT COALESCE(SUM(amount_paid), 0) FROM payment_history"
+    " WHERE invoice_id = {ref}.invoice_id)"
+)
+PAYMENT_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_payment_history_ai
+    AFTER INSERT ON payment_history
+    BEGIN
+        UPDATE invoices SET paid_total = {_PAID_TOTAL_SQL.format(ref="NEW")}
+         WHERE invoice_id = NEW.invoice_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_payment_history_au
+    AFTER UPDATE OF invoice_id, amount_paid ON payment_history
+    BEGIN
+        UPDATE invoices SET paid_total = {_PAID_TOTAL_SQL.format(ref="OLD")}
+         WHERE invoice_id = OLD.invoice_id;
+        UPDATE invoices SET paid_total = {_PAID_TOTAL_SQL.format(ref="NEW")}
+         WHERE invoice_id = NEW.invoice_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_payment_history_ad
+    AFTER DELETE ON payment_history
+    BEGIN
+        UPDATE invoices SET paid_total = {_PAID_TOTAL_SQL.format(ref="OLD")}
+         WHERE invoice_id = OLD.invoice_id;
+    END
+    """,
     """
-    )
-    cur = conn.execute("SELECT version FROM schema_version WHERE id=1")
-    if cur.fetchone() is None:
-        conn.execute("INSERT INTO schema_version (id, version) VALUES (1, 1)")
-
-
-def _get_version(conn) -> int:
-    cur = conn.execute("SELECT version FROM schema_version WHERE id=1")
-    row = cur.fetchone()
-    return int(row[0]) if row else 1
-
-
-def _set_version(conn, v: int):
-    conn.execute("UPDATE schema_version SET version=? WHERE id=1", (v,))
-
-
-def _migrate(conn):
-    _ensure_schema_version_table(conn)
-    v = _get_version(conn)
-
-    # --- BEGIN PATCH: init_db._migrate additions ---
-    # Find: def _migrate(conn): ... v = _get_version(conn)
-    # Add the block below right after computing `v`.
-    if v < 2:
-        # Add owner snapshot columns for owner‑first invoicing
-        conn.execute("ALTER TABLE invoices ADD COLUMN owner_name TEXT")
-        conn.execute("ALTER TABLE invoices ADD COLUMN owner_contact TEXT")
-        conn.execute("ALTER TABLE invoices ADD COLUMN owner_email TEXT")
-        _set_version(conn, 2)
-
-    # --- END PATCH ---
-
-
-    # example future migration:
-    # if v < 2:
-    #     conn.execute("ALTER TABLE invoices ADD COLUMN notes TEXT DEFAULT NULL")
-    #     _set_version(conn, 2)
-
-
-def main():
-    conn = _connect()
-    cursor = conn.cursor()
-
-    # Always enforce FKs
-    cursor.execute("PRAGMA foreign_keys = ON;")
-
+    CREATE TRIGGER IF NOT EXISTS trg_invoices_balance
+    AFTER UPDATE OF final_amount, payable, paid_total ON invoices
+    BEGIN
+        UPDATE invoices
+           SET remaining_balance = CASE
+                 WHEN NEW.payable = 0 THEN 0
+                 ELSE MAX(ROUND(NEW.final_amount - NEW.paid_total, 2), 0)
+               END
+         WHERE invoice_id = NEW.invoice_id;
+    END
+    """,
+)
+
+
+# Stock deductions made for a document line carry this key (schema v7), so a
+# line is taken out of stock at most once (inventory.deduct_for_document).
+STOCK_SOURCE_INDEX = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_stock_movements_source"
+    " ON stock_movements(source_doc_type, source_doc_id, line_no)"
+)
+
+# Base tables and indexes, created by main() before the migrations run
+BASE_SCHEMA = (
     # -----------------------------
     # Roles & Users
     # -----------------------------
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS roles (
         role_id    INTEGER PRIMARY KEY,
         role_name  TEXT NOT NULL UNIQUE
     )
-    """
-    )
+    """,
 
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS users (
         user_id   INTEGER PRIMARY KEY,
         username  TEXT NOT NULL UNIQUE,
@@ -80,14 +141,12 @@ def main():
         role_id   INTEGER,
         FOREIGN KEY (role_id) REFERENCES roles(role_id)
     )
-    """
-    )
+    """,
 
     # -----------------------------
     # Patients
     # -----------------------------
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS patients (
         patient_id    INTEGER PRIMARY KEY AUTOINCREMENT,
         name          TEXT NOT NULL,
@@ -99,14 +158,12 @@ def main():
         owner_contact TEXT,
         owner_email   TEXT
     )
-    """
-    )
+    """,
 
     # -----------------------------
     # Appointments
     # -----------------------------
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS appointments (
         appointment_id      INTEGER PRIMARY KEY AUTOINCREMENT,
         patient_id          INTEGER NOT NULL,
@@ -119,14 +176,12 @@ def main():
         duration_minutes    INTEGER NOT NULL DEFAULT 30,
         FOREIGN KEY (patient_id) REFERENCES patients(patient_id)
     )
-    """
-    )
+    """,
 
     # -----------------------------
     # Reminders
     # -----------------------------
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS reminders (
         reminder_id     INTEGER PRIMARY KEY AUTOINCREMENT,
         appointment_id  INTEGER,
@@ -135,14 +190,12 @@ def main():
         reminder_reason TEXT,
         FOREIGN KEY (appointment_id) REFERENCES appointments(appointment_id)
     )
-    """
-    )
+    """,
 
     # -----------------------------
     # Invoices (supports INVOICE / ESTIMATE / CHARITY)
     # -----------------------------
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS invoices (
         invoice_id         INTEGER PRIMARY KEY AUTOINCREMENT,
         invoice_date       TEXT NOT NULL,
@@ -176,32 +229,24 @@ def main():
         FOREIGN KEY (appointment_id) REFERENCES appointments(appointment_id),
         FOREIGN KEY (patient_id)    REFERENCES patients(patient_id)
     )
-    """
-    )
+    """,
 
     # One document per (appointment_id, invoice_type); allows all three per appointment
     # appointment_id can be NULL, so we make it a partial unique index.
-    cursor.execute(
-        """
+    """
         CREATE UNIQUE INDEX IF NOT EXISTS ux_invoices_appt_type
         ON invoices(appointment_id, invoice_type)
         WHERE appointment_id IS NOT NULL
-    """
-    )
+    """,
 
     # Helpful filters
-    cursor.execute(
-        "CREATE INDEX IF NOT EXISTS idx_invoices_type ON invoices(invoice_type)"
-    )
-    cursor.execute(
-        "CREATE INDEX IF NOT EXISTS idx_invoices_created ON invoices(created_at)"
-    )
+    "CREATE INDEX IF NOT EXISTS idx_invoices_type ON invoices(invoice_type)",
+    "CREATE INDEX IF NOT EXISTS idx_invoices_created ON invoices(created_at)",
 
     # -----------------------------
     # Payment History
     # -----------------------------
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS payment_history (
         payment_id     INTEGER PRIMARY KEY AUTOINCREMENT,
         invoice_id     INTEGER NOT NULL,
@@ -211,14 +256,12 @@ def main():
         notes          TEXT,
         FOREIGN KEY (invoice_id) REFERENCES invoices(invoice_id) ON DELETE CASCADE
     )
-    """
-    )
+    """,
 
     # -----------------------------
     # Invoice Items
     # -----------------------------
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS invoice_items (
         item_id         INTEGER PRIMARY KEY AUTOINCREMENT,
         invoice_id      INTEGER,
@@ -236,14 +279,12 @@ def main():
 
         FOREIGN KEY (invoice_id) REFERENCES invoices(invoice_id) ON DELETE CASCADE
     )
-    """
-    )
+    """,
 
     # -----------------------------
     # Inventory
     # -----------------------------
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS items (
       item_id            INTEGER PRIMARY KEY AUTOINCREMENT,
       name               TEXT NOT NULL,
@@ -252,12 +293,10 @@ def main():
       unit_price         REAL NOT NULL DEFAULT 0,
       reorder_threshold  INTEGER NOT NULL DEFAULT 0
     )
-    """
-    )
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_items_name ON items(name)")
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_items_name ON items(name)",
 
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS stock_movements (
       movement_id INTEGER PRIMARY KEY AUTOINCREMENT,
       item_id     INTEGER NOT NULL REFERENCES items(item_id) ON DELETE CASCADE,
@@ -265,14 +304,22 @@ def main():
       reason      TEXT,
       timestamp   TEXT NOT NULL
     )
+    """,
+
+    # On-hand balance per item, maintained alongside the ledger
+    # (inventory.record_movement); re-derivable via inventory.reconcile_stock
     """
+    CREATE TABLE IF NOT EXISTS item_stock (
+      item_id     INTEGER PRIMARY KEY REFERENCES items(item_id) ON DELETE CASCADE,
+      on_hand     INTEGER NOT NULL DEFAULT 0,
+      updated_at  TEXT
     )
+    """,
 
     # -----------------------------
     # Prescriptions
     # -----------------------------
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS prescriptions (
       prescription_id INTEGER PRIMARY KEY AUTOINCREMENT,
       patient_id      INTEGER NOT NULL REFERENCES patients(patient_id),
@@ -284,11 +331,9 @@ def main():
       dispensed       INTEGER NOT NULL DEFAULT 0,
       date_dispensed  TEXT
     )
-    """
-    )
+    """,
 
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS prescription_history (
         history_id       INTEGER PRIMARY KEY AUTOINCREMENT,
         prescription_id  INTEGER NOT NULL REFERENCES prescriptions(prescription_id) ON DELETE CASCADE,
@@ -297,14 +342,12 @@ def main():
         timestamp        TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
         changes_json     TEXT
     )
-    """
-    )
+    """,
 
     # -----------------------------
     # Consents (simple) + Templates/Forms
     # -----------------------------
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS consents (
         consent_id   INTEGER PRIMARY KEY AUTOINCREMENT,
         patient_id   INTEGER NOT NULL REFERENCES patients(patient_id),
@@ -315,20 +358,16 @@ def main():
         valid_until  TEXT,
         file_path    TEXT
     )
-    """
-    )
+    """,
 
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS consent_templates (
       template_id INTEGER PRIMARY KEY AUTOINCREMENT,
       name        TEXT NOT NULL UNIQUE,
       body_text   TEXT NOT NULL
     )
+    """,
     """
-    )
-    cursor.execute(
-        """
     CREATE TABLE IF NOT EXISTS consent_forms (
       consent_id      INTEGER PRIMARY KEY AUTOINCREMENT,
       patient_id      INTEGER NOT NULL REFERENCES patients(patient_id),
@@ -343,29 +382,12 @@ def main():
       created_at      TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
       FOREIGN KEY (template_id) REFERENCES consent_templates(template_id)
     )
-    """
-    )
-
-    cursor.execute(
-        "INSERT OR IGNORE INTO consent_templates (name, body_text) VALUES (?, ?)",
-        (
-            "General Treatment Consent",
-            "I, {owner_name}, consent to examination and treatment for {patient_name}...",
-        ),
-    )
-    cursor.execute(
-        "INSERT OR IGNORE INTO consent_templates (name, body_text) VALUES (?, ?)",
-        (
-            "Surgery Consent",
-            "I, {owner_name}, authorize surgical procedure for {patient_name} on {date}...",
-        ),
-    )
+    """,
 
     # -----------------------------
     # Visits
     # -----------------------------
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS visits (
         visit_id            INTEGER PRIMARY KEY AUTOINCREMENT,
         patient_id          INTEGER NOT NULL REFERENCES patients(patient_id) ON DELETE CASCADE,
@@ -393,10 +415,8 @@ def main():
         notes               TEXT,
         created_at          TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
     )
+    """,
     """
-    )
-    cursor.execute(
-        """
     CREATE TABLE IF NOT EXISTS visit_attachments (
         attach_id   INTEGER PRIMARY KEY AUTOINCREMENT,
         visit_id    INTEGER NOT NULL REFERENCES visits(visit_id) ON DELETE CASCADE,
@@ -404,48 +424,252 @@ def main():
         note        TEXT,
         added_at    TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
     )
-    """
-    )
+    """,
 
-    cursor.execute(
-        """
+    """
     CREATE INDEX IF NOT EXISTS idx_visits_patient_date
     ON visits(patient_id, visit_date)
+    """,
     """
-    )
-    cursor.execute(
-        """
     CREATE INDEX IF NOT EXISTS idx_visits_appt
     ON visits(appointment_id)
+    """,
     """
-    )
-    cursor.execute(
-        """
     CREATE UNIQUE INDEX IF NOT EXISTS ux_visits_appt
     ON visits(appointment_id)
     WHERE appointment_id IS NOT NULL
-    """
-    )
+    """,
 
     # -----------------------------
     # Error Logs
     # -----------------------------
-    cursor.execute(
-        """
+    """
     CREATE TABLE IF NOT EXISTS error_logs (
         log_id        INTEGER PRIMARY KEY AUTOINCREMENT,
         timestamp     TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
         error_type    TEXT,
         error_message TEXT NOT NULL
     )
+    """,
+)
+
+# Latest _migrate() step; app_launcher re-runs main() when a DB is behind it.
+SCHEMA_VERSION = 9
+
+# schema_version.fingerprint once main() has run: the migration level plus a
+# hash of every DDL statement this module issues. app_launcher compares it in
+# one read (schema_current) and skips main() entirely when it matches.
+_DDL = (
+    BASE_SCHEMA
+    + HOT_INDEXES
+    + PAYMENT_TRIGGERS
+    + (STOCK_SOURCE_INDEX,)
+    + tuple(SALES_ROLLUP_TABLES + SALES_ROLLUP_TRIGGERS)
+    + tuple(DATA_VERSION_TABLES + DATA_VERSION_TRIGGERS)
+)
+SCHEMA_FINGERPRINT = (
+    f"{SCHEMA_VERSION}:{sha256(chr(10).join(_DDL).encode()).hexdigest()[:16]}"
+)
+
+
+# --- migrations helpers (ADD THIS BLOCK) ---
+def _ensure_schema_version_table(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL,
+            fingerprint TEXT
+        )
     """
     )
+    add_missing_columns(conn, "schema_version", (("fingerprint", "TEXT"),))
+    cur = conn.execute("SELECT version FROM schema_version WHERE id=1")
+    if cur.fetchone() is None:
+        conn.execute("INSERT INTO schema_version (id, version) VALUES (1, 1)")
+
+
+def _get_version(conn) -> int:
+    cur = conn.execute("SELECT version FROM schema_version WHERE id=1")
+    row = cur.fetchone()
+    return int(row[0]) if row else 1
+
+
+def _set_version(conn, v: int):
+    conn.execute("UPDATE schema_version SET version=? WHERE id=1", (v,))
+
+
+def _migrate(conn):
+    _ensure_schema_version_table(conn)
+    v = _get_version(conn)
+
+    # --- BEGIN PATCH: init_db._migrate additions ---
+    # Find: def _migrate(conn): ... v = _get_version(conn)
+    # Add the block below right after computing `v`.
+    if v < 2:
+        # Add owner snapshot columns for owner‑first invoicing
+        conn.execute("ALTER TABLE invoices ADD COLUMN owner_name TEXT")
+        conn.execute("ALTER TABLE invoices ADD COLUMN owner_contact TEXT")
+        conn.execute("ALTER TABLE invoices ADD COLUMN owner_email TEXT")
+        _set_version(conn, 2)
+
+    # --- END PATCH ---
+
+    if v < 3:
+        # Indexes for the hot screen predicates (see HOT_INDEXES)
+        for ddl in HOT_INDEXES:
+            conn.execute(ddl)
+        conn.execute("ANALYZE")
+        _set_version(conn, 3)
+
+    if v < 4:
+        # Materialized paid_total + triggers; backfill existing invoices once
+        conn.execute(
+            "ALTER TABLE invoices ADD COLUMN paid_total REAL NOT NULL DEFAULT 0"
+        )
+        for ddl in PAYMENT_TRIGGERS:
+            conn.execute(ddl)
+        conn.execute(
+            f"UPDATE invoices SET paid_total = {_PAID_TOTAL_SQL.format(ref='invoices')}"
+        )
+        _set_version(conn, 4)
+
+    if v < 5:
+        # Seed item_stock balances from the existing ledger
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO item_stock (item_id, on_hand, updated_at)
+            SELECT item_id, SUM(change_qty), CURRENT_TIMESTAMP
+              FROM stock_movements
+             GROUP BY item_id
+            """
+        )
+        _set_version(conn, 5)
+
+    if v < 6:
+        # Covering index for the invoice-list summary (db "invoice.summary")
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_invoices_list_cover
+            ON invoices(created_at, payment_status, final_amount, paid_total,
+                        appointment_id, owner_name, owner_contact)
+            """
+        )
+        _set_version(conn, 6)
+
+    if v < 7:
+        # Idempotency key for document stock deductions. Legacy rows get their
+        # document from the reason text; invoice lines can't be recovered
+        # (line_no stays NULL), Rx dispensing is one line per prescription. The
+        # index goes on first so a doubled legacy Rx row stays unkeyed.
+        # (app_launcher's bootstrap table already has the columns)
+        add_missing_columns(
+            conn,
+            "stock_movements",
+            (
+                ("source_doc_type", "TEXT"),
+                ("source_doc_id", "INTEGER"),
+                ("line_no", "INTEGER"),
+            ),
+        )
+        conn.execute(STOCK_SOURCE_INDEX)
+        conn.execute(
+            """
+            UPDATE OR IGNORE stock_movements
+               SET source_doc_type = 'prescription',
+                   source_doc_id   = CAST(substr(reason, 15) AS INTEGER),
+                   line_no         = 1
+             WHERE reason LIKE 'Dispensed Rx #%'
+            """
+        )
+        conn.execute(
+            """
+            UPDATE stock_movements
+               SET source_doc_type = 'invoice',
+                   source_doc_id   =
+                       CAST(substr(reason, instr(reason, '#') + 1) AS INTEGER)
+             WHERE reason LIKE 'Dispensed via %#%' AND source_doc_type IS NULL
+            """
+        )
+        _set_version(conn, 7)
+
+    if v < 8:
+        # Z-report rollups kept by triggers (see sales_rollup.py); backfill once
+        for ddl in SALES_ROLLUP_TABLES + SALES_ROLLUP_TRIGGERS:
+            conn.execute(ddl)
+        rebuild_sales_rollup(conn)
+        _set_version(conn, 8)
+
+    if v < 9:
+        # Per-table write counters that invalidate cached analytics results
+        for ddl in DATA_VERSION_TABLES + DATA_VERSION_TRIGGERS:
+            conn.execute(ddl)
+        _set_version(conn, 9)
+
+
+    # example future migration:
+    # if v < 2:
+    #     conn.execute("ALTER TABLE invoices ADD COLUMN notes TEXT DEFAULT NULL")
+    #     _set_version(conn, 2)
+
+
+def main():
+    conn = _connect()
+    # Always enforce FKs (before BEGIN: the pragma is a no-op in a transaction)
+    conn.execute("PRAGMA foreign_keys = ON;")
+
+    # Tables, seed rows, migrations and the fingerprint commit together
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        cursor = conn.cursor()
+        for ddl in BASE_SCHEMA:
+            cursor.execute(ddl)
+        _seed(cursor)
+
+        # run migrations LAST so they can rely on base tables existing
+        _migrate(conn)
+        conn.execute(
+            "UPDATE schema_version SET fingerprint=? WHERE id=1", (SCHEMA_FINGERPRINT,)
+        )
+    except Exception:
+        conn.execute("ROLLBACK")
+        conn.close()
+        raise
+    conn.execute("COMMIT")
+    conn.close()
+
+    # avoid mojibake in frozen/redirected output
+    try:
+        print("✅ Database initialized successfully.")
+    except Exception:
+        print("Database initialized successfully.")
+
+
+def _seed(cursor):
+    """Default consent templates, roles and users (INSERT OR IGNORE)."""
+    cursor.execute(
+        "INSERT OR IGNORE INTO consent_templates (name, body_text) VALUES (?, ?)",
+        (
+            "General Treatment Consent",
+            "I, {owner_name}, consent to examination and treatment for {patient_name}...",
+        ),
+    )
+    cursor.execute(
+        "INSERT OR IGNORE INTO consent_templates (name, body_text) VALUES (?, ?)",
+        (
+            "Surgery Consent",
+            "I, {owner_name}, authorize surgical procedure for {patient_name} on {date}...",
+        ),
+    )
 
     # Seed roles and a few users
     for role in ("Admin", "Veterinarian", "Receptionist"):
         cursor.execute("INSERT OR IGNORE INTO roles (role_name) VALUES (?)", (role,))
 
     def create_user(username: str, password: str, role_name: str):
+        cursor.execute("SELECT 1 FROM users WHERE username=?", (username,))
+        if cursor.fetchone():
+            return  # already seeded; skip the password hash
         hashed = sha256(password.encode()).hexdigest()
         cursor.execute("SELECT role_id FROM roles WHERE role_name=?", (role_name,))
         row = cursor.fetchone()
@@ -461,18 +685,76 @@ def main():
     create_user("vetuser", "vet123", "Veterinarian")
     create_user("reception", "recep123", "Receptionist")
 
-    # run migrations LAST so they can rely on base tables existing
-    _migrate(conn)
 
-    conn.commit()
-    conn.close()
+def schema_current() -> bool:
+    """True if main() has already run for SCHEMA_FINGERPRINT (one read, no DDL)."""
+    conn = _connect()
+    try:
+        cur = conn.execute("SELECT fingerprint FROM schema_version WHERE id=1")
+        row = cur.fetchone()
+    except sqlite3.OperationalError:  # new DB, or no fingerprint column yet
+        return False
+    finally:
+        conn.close()
+    return row is not None and row[0] == SCHEMA_FINGERPRINT
 
-    # avoid mojibake in frozen/redirected output
+
+def search_folding_misses(conn) -> list[str]:
+    """
+    Search texts that fail to find a throwaway non-ASCII invoice through
+    invoice.page (SQLite's lower() only folds ASCII). Rolled back afterwards.
+    """
+    conn.execute("BEGIN")
     try:
-        print("✅ Database initialized successfully.")
-    except Exception:
-        print("Database initialized successfully.")
+        inv_id = conn.execute(
+            """INSERT INTO invoices
+                      (invoice_date, created_at, owner_name, owner_contact)
+               VALUES ('2000-01-01', '2000-01-01 09:00:00',
+                       'ΣΟΥΖΆΝΑ Παπαδοπούλου', 'ÉLODIE@MAIL.GR')"""
+        ).lastrowid
+        params = {
+            "start": "2000-01-01",
+            "end": "2000-01-01",
+            "status": "All",
+            "before": INVOICE_PAGE_START,
+            "limit": 10,
+        }
+        misses = []
+        for q in ("σουζάνα", "ΠΑΠΑΔΟΠΟΎΛΟΥ", "élodie@mail"):
+            rows = query_all("invoice.page", {**params, "q": q}, conn=conn)
+            if inv_id not in [r[0] for r in rows]:
+                misses.append(q)
+        return misses
+    finally:
+        conn.execute("ROLLBACK")
+
+
+def check_query_plans() -> int:
+    """
+    Regression gate: every hot query in db.QUERIES must SEARCH an index, and
+    the invoice search must match non-ASCII names case-insensitively.
+    Prints offenders and returns a process exit code (0 = OK).
+    """
+    main()
+    conn = _connect()
+    try:
+        offenders = full_scan_offenders(conn)
+        misses = search_folding_misses(conn)
+    finally:
+        conn.close()
+    for name, detail in offenders:
+        print(f"FULL SCAN  {name}: {detail}")
+    for q in misses:
+        print(f"SEARCH MISS  invoice.page q={q!r} (non-ASCII case folding)")
+    if offenders:
+        print(f"{len(offenders)} hot query plan(s) fell back to a full scan.")
+    if offenders or misses:
+        return 1
+    print("Query plans OK.")
+    return 0
 
 
 if __name__ == "__main__":
+    if "--check-plans" in sys.argv[1:]:
+        sys.exit(check_query_plans())
     main()
@@ -1,8 +1,23 @@
 # inventory.py
+import json
 import sqlite3
+import sys
 from datetime import datetime
 
 from db import connect as _connect
+from db import query_all
+
+# On-hand quantities live in item_stock (one row per item), kept in step with
+# the stock_movements ledger by record_movement(). reconcile_stock() re-derives
+# them from the ledger.
+_LEDGER_BALANCES_SQL = """
+    SELECT i.item_id, i.name,
+           IFNULL(s.on_hand, 0) AS recorded,
+           IFNULL((SELECT SUM(change_qty) FROM stock_movements sm
+                    WHERE sm.item_id = i.item_id), 0) AS ledger
+      FROM items i
+      LEFT JOIN item_stock s ON s.item_id = i.item_id
+"""
 
 
 def get_all_items():
@@ -13,11 +28,10 @@ def get_all_items():
           SELECT
       i.item_id, i.name, i.description,
       i.unit_cost, i.unit_price,
-      IFNULL(SUM(sm.change_qty),0) AS on_hand,
+      IFNULL(s.on_hand,0) AS on_hand,
       i.reorder_threshold
         FROM items i
-        LEFT JOIN stock_movements sm ON i.item_id=sm.item_id
-        GROUP BY i.item_id
+        LEFT JOIN item_stock s ON i.item_id=s.item_id
     """
     )
     rows = cur.fetchall()
@@ -33,12 +47,11 @@ def items_below_reorder():
         SELECT
       i.item_id, i.name, i.description,
       i.unit_cost, i.unit_price,
-      IFNULL(SUM(sm.change_qty),0) AS on_hand,
+      IFNULL(s.on_hand,0) AS on_hand,
       i.reorder_threshold
         FROM items i
-        LEFT JOIN stock_movements sm ON i.item_id=sm.item_id
-        GROUP BY i.item_id
-        HAVING on_hand <= i.reorder_threshold
+        LEFT JOIN item_stock s ON i.item_id=s.item_id
+       WHERE IFNULL(s.on_hand,0) <= i.reorder_threshold
     """
     )
     rows = cur.fetchall()
@@ -79,17 +92,165 @@ def delete_item(item_id):
     conn.close()
 
 
+def record_movement(conn, item_id, change_qty, reason=None, ts=None):
+    """
+    Append a ledger row and move the item_stock balance by the same amount,
+    atomically, on the caller's connection (inside or outside a transaction).
+    """
+    ts = ts or datetime.now().isoformat(" ", "seconds")
+    conn.execute("SAVEPOINT record_movement")
+    try:
+        conn.execute(
+            """
+          INSERT INTO stock_movements
+            (item_id,change_qty,reason,timestamp)
+          VALUES (?,?,?,?)
+        """,
+            (item_id, change_qty, reason, ts),
+        )
+        conn.execute(
+            """
+          INSERT INTO item_stock (item_id, on_hand, updated_at)
+          VALUES (?,?,?)
+          ON CONFLICT(item_id) DO UPDATE
+            SET on_hand = on_hand + excluded.on_hand,
+                updated_at = excluded.updated_at
+        """,
+            (item_id, change_qty, ts),
+        )
+    except Exception:
+        conn.execute("ROLLBACK TO record_movement")
+        conn.execute("RELEASE record_movement")
+        raise
+    conn.execute("RELEASE record_movement")
+
+
+def item_ids_by_name(conn, names) -> dict[str, int]:
+    """{name: item_id} for the inventory SKUs among `names`, in one lookup."""
+    names = sorted({str(n).strip() for n in names})
+    if not names:
+        return {}
+    rows = query_all("items.ids_by_name", {"names": json.dumps(names)}, conn=conn)
+    return dict(rows)
+
+
+# --- Document deductions (invoices, charity documents, prescriptions) ---
+def deduct_for_document(conn, doc_type, doc_id, lines, ts=None, skus=None) -> int:
+    """
+    Take stock out for a document's lines, at most once per line.
+
+    `lines` are (line_no, item_name, qty, reason); names that aren't inventory
+    SKUs and non-positive quantities are skipped. Every movement carries the
+    (doc_type, doc_id, line_no) key of idx_stock_movements_source and goes in
+    with one INSERT OR IGNORE batch, so running it again for the same document
+    only deducts lines that weren't deducted before; item_stock moves by the
+    rows that actually landed. Runs on the caller's connection, inside the
+    caller's transaction (one per document). Returns the new movement count.
+    `skus` is an {item_name: item_id} the caller already resolved with
+    item_ids_by_name; without it the names are looked up here.
+    """
+    lines = [
+        (line_no, str(name).strip(), int(qty), reason)
+        for line_no, name, qty, reason in lines
+        if qty and qty > 0
+    ]
+    if skus is None:
+        skus = item_ids_by_name(conn, [name for _, name, _, _ in lines])
+    rows = [
+        (skus[name], -qty, reason, doc_type, doc_id, line_no)
+        for line_no, name, qty, reason in lines
+        if name in skus
+    ]
+    if not rows:
+        return 0
+    ts = ts or datetime.now().isoformat(" ", "seconds")
+    conn.execute("SAVEPOINT deduct_for_document")
+    try:
+        after = conn.execute(
+            "SELECT COALESCE(MAX(movement_id), 0) FROM stock_movements"
+        ).fetchone()[0]
+        added = conn.executemany(
+            """
+          INSERT OR IGNORE INTO stock_movements
+            (item_id, change_qty, reason, timestamp,
+             source_doc_type, source_doc_id, line_no)
+          VALUES (?,?,?,?,?,?,?)
+        """,
+            [(item_id, qty, reason, ts, *key) for item_id, qty, reason, *key in rows],
+        ).rowcount
+        conn.execute(
+            """
+          INSERT INTO item_stock (item_id, on_hand, updated_at)
+          SELECT item_id, SUM(change_qty), ?
+            FROM stock_movements
+           WHERE source_doc_type = ? AND source_doc_id = ? AND movement_id > ?
+           GROUP BY item_id
+          ON CONFLICT(item_id) DO UPDATE
+            SET on_hand = on_hand + excluded.on_hand,
+                updated_at = excluded.updated_at
+        """,
+            (ts, doc_type, doc_id, after),
+        )
+    except Exception:
+        conn.execute("ROLLBACK TO deduct_for_document")
+        conn.execute("RELEASE deduct_for_document")
+        raise
+    conn.execute("RELEASE deduct_for_document")
+    return added
+
+
 def adjust_stock(item_id, change_qty, reason=None):
-    ts = datetime.now().isoformat(" ", "seconds")
     conn = _connect()
-    cur = conn.cursor()
-    cur.execute(
-        """
-      INSERT INTO stock_movements
-        (item_id,change_qty,reason,timestamp)
-      VALUES (?,?,?,?)
-    """,
-        (item_id, change_qty, reason, ts),
-    )
-    conn.commit()
-    conn.close()
+    try:
+        record_movement(conn, item_id, change_qty, reason)
+    finally:
+        conn.close()
+
+
+def reconcile_stock(fix=True):
+    """
+    Re-derive every item's balance from stock_movements.
+    Returns [(item_id, name, recorded, ledger)] for items that had drifted;
+    with fix=True those item_stock rows are rewritten to the ledger value.
+    """
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        drift = [
+            row
+            for row in conn.execute(_LEDGER_BALANCES_SQL).fetchall()
+            if row[2] != row[3]
+        ]
+        if fix and drift:
+            ts = datetime.now().isoformat(" ", "seconds")
+            conn.executemany(
+                """
+              INSERT INTO item_stock (item_id, on_hand, updated_at)
+              VALUES (?,?,?)
+              ON CONFLICT(item_id) DO UPDATE
+                SET on_hand = excluded.on_hand,
+                    updated_at = excluded.updated_at
+            """,
+                [(item_id, ledger, ts) for item_id, _, _, ledger in drift],
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return drift
+
+
+if __name__ == "__main__":
+    # python inventory.py --reconcile [--dry-run]
+    if "--reconcile" not in sys.argv[1:]:
+        print("usage: python inventory.py --reconcile [--dry-run]")
+        sys.exit(2)
+    dry_run = "--dry-run" in sys.argv[1:]
+    drifted = reconcile_stock(fix=not dry_run)
+    for item_id, name, recorded, ledger in drifted:
+        print(f"DRIFT  #{item_id} {name}: item_stock={recorded} ledger={ledger}")
+    verb = "found" if dry_run else "fixed"
+    print(f"{len(drifted)} drifted balance(s) {verb}.")
+    sys.exit(1 if drifted and dry_run else 0)
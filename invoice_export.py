@@ -0,0 +1,207 @@
+# invoice_export.py
+"""
+Bulk A4 invoice export (month-end runs for the accountant).
+
+    result = export_invoices(invoice_ids, "invoices.zip", merge="zip")
+    print(result["pages"], result["pages_per_sec"])
+
+Payloads are read in the calling process (load_print_payloads); the ReportLab
+layout, which is pure Python and CPU-bound, runs in a ProcessPoolExecutor so
+it uses every core instead of sharing one GIL. Worker processes only import
+this module and invoice_pdf, so nothing here may touch Qt.
+
+merge=None writes one PDF per invoice into the `dest` folder; "zip" bundles
+them into a single archive and "pdf" concatenates them into a single document
+(needs the optional pypdf package). Both write `dest` as a file.
+"""
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from db import INVOICE_PAGE_START, query_all
+from invoice_pdf import generate_pdf_a4, load_print_payloads
+from logger import log_error
+from render_assets import RENDER_ERRORS
+
+try:
+    import pypdf
+except ImportError:  # optional: only needed for merge="pdf"
+    pypdf = None
+
+MERGE_MODES = (None, "zip", "pdf")
+
+
+def can_merge_pdf() -> bool:
+    return pypdf is not None
+
+
+def invoice_ids_in_range(start: str, end: str, status: str = "All") -> list[int]:
+    """Invoice ids created in [start, end] (yyyy-MM-dd), oldest first."""
+    rows = query_all(
+        "invoice.page",
+        {
+            "start": start,
+            "end": end,
+            "status": status,
+            "q": "",
+            "before": INVOICE_PAGE_START,
+            "limit": -1,
+        },
+    )
+    return sorted(int(r[0]) for r in rows)
+
+
+def export_filename(payload: dict) -> str:
+    owner = re.sub(r"[^\w-]", "", payload.get("owner_name") or "")
+    return f"Invoice_{payload['inv_id']}_{owner}.pdf"
+
+
+def _render_a4(path: str, payload: dict) -> int:
+    """Worker entry point: lay out one invoice, return its page count."""
+    return generate_pdf_a4(path, **payload)
+
+
+def export_invoices(
+    invoice_ids, dest, *, merge=None, workers=None, progress=None
+) -> dict:
+    """
+    Render every invoice in `invoice_ids` with the A4 layout.
+
+    progress(done, total) is called as invoices finish (and periodically while
+    waiting); returning False cancels the invoices not yet rendered.
+
+    Returns a dict: files (written PDFs, or [dest] when merged; empty, with
+    `dest` not written, when no invoice rendered), invoices, pages, failed
+    [(invoice_id, message)], cancelled, seconds, pages_per_sec.
+    """
+    if merge not in MERGE_MODES:
+        raise ValueError(f"merge must be one of {MERGE_MODES}, got {merge!r}")
+    if merge == "pdf" and pypdf is None:
+        raise RuntimeError("Merging into one PDF needs the 'pypdf' package.")
+
+    t0 = time.perf_counter()
+    ids = [int(i) for i in invoice_ids]
+    now = datetime.now()
+    stamp = {"created_date": f"{now:%d-%b-%Y}", "created_time": f"{now:%H:%M}"}
+
+    work_dir = dest if merge is None else tempfile.mkdtemp(prefix="invoices_")
+    os.makedirs(work_dir, exist_ok=True)
+    try:
+        payloads = load_print_payloads(ids)  # one batched read for the whole run
+        jobs = []  # (invoice_id, path, payload), in invoice_ids order
+        for inv_id in ids:
+            if inv_id not in payloads:
+                continue  # deleted since it was listed
+            payload = {**payloads[inv_id], **stamp}
+            jobs.append(
+                (inv_id, os.path.join(work_dir, export_filename(payload)), payload)
+            )
+
+        pages, failed, cancelled = _render_all(jobs, workers, progress)
+        done = [path for inv_id, path, _ in jobs if inv_id in pages]
+
+        if not done or (merge is not None and cancelled):
+            files = []  # nothing rendered, or cancelled: `dest` stays unwritten
+        elif merge == "zip":
+            with zipfile.ZipFile(dest, "w", zipfile.ZIP_DEFLATED) as zf:
+                for path in done:
+                    zf.write(path, os.path.basename(path))
+            files = [dest]
+        elif merge == "pdf":
+            writer = pypdf.PdfWriter()
+            for path in done:
+                writer.append(path)
+            with open(dest, "wb") as f:
+                writer.write(f)
+            files = [dest]
+        else:
+            files = done
+    finally:
+        if merge is not None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    seconds = time.perf_counter() - t0
+    total_pages = sum(pages.values())
+    return {
+        "files": files,
+        "invoices": len(pages),
+        "pages": total_pages,
+        "failed": failed,
+        "cancelled": cancelled,
+        "seconds": seconds,
+        "pages_per_sec": total_pages / seconds if seconds else 0.0,
+    }
+
+
+def _render_all(jobs, workers, progress):
+    """Returns ({invoice_id: pages}, [(invoice_id, message)], cancelled)."""
+    pages, failed = {}, []
+    total = len(jobs)
+
+    def _keep_going():
+        if progress is None:
+            return True
+        return progress(len(pages) + len(failed), total) is not False
+
+    if workers == 1 or total <= 1:
+        # Not worth spawning processes (also the baseline for benchmarks.py)
+        for inv_id, path, payload in jobs:
+            if not _keep_going():
+                return pages, failed, True
+            try:
+                pages[inv_id] = _render_a4(path, payload)
+            except RENDER_ERRORS as e:
+                log_error(f"Bulk export of invoice {inv_id} failed: {e}")
+                failed.append((inv_id, str(e)))
+        _keep_going()
+        return pages, failed, False
+
+    workers = min(workers or os.cpu_count() or 1, total)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {
+            pool.submit(_render_a4, path, payload): inv_id
+            for inv_id, path, payload in jobs
+        }
+        while pending:
+            finished, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                inv_id = pending.pop(fut)
+                try:
+                    pages[inv_id] = fut.result()
+                except (*RENDER_ERRORS, BrokenProcessPool) as e:
+                    log_error(f"Bulk export of invoice {inv_id} failed: {e}")
+                    failed.append((inv_id, str(e)))
+            if not _keep_going():
+                for fut in pending:
+                    fut.cancel()
+                pool.shutdown(wait=True, cancel_futures=True)
+                return pages, failed, True
+    return pages, failed, False
+
+
+if __name__ == "__main__":
+    # python invoice_export.py FROM TO DEST [--zip | --merge]
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) != 3:
+        print("usage: python invoice_export.py FROM TO DEST [--zip | --merge]")
+        sys.exit(2)
+    start, end, dest = args
+    merge = "zip" if "--zip" in sys.argv else "pdf" if "--merge" in sys.argv else None
+    result = export_invoices(invoice_ids_in_range(start, end), dest, merge=merge)
+    for inv_id, msg in result["failed"]:
+        print(f"FAILED #{inv_id}: {msg}")
+    if not result["files"]:
+        print("Nothing exported: no invoice rendered.")
+        sys.exit(1)
+    print(
+        f"{result['invoices']} invoice(s), {result['pages']} page(s) in "
+        f"{result['seconds']:.1f}s ({result['pages_per_sec']:.1f} pages/s) -> {dest}"
+    )
+    sys.exit(1 if result["failed"] else 0)
@@ -0,0 +1,131 @@
+# invoice_items.py
+"""
+Change tracking for the billing item grid.
+
+ItemChangeTracker keeps the invoice_items rows the grid was loaded from and
+the lines as currently edited (one tuple per grid row, in grid column order):
+
+    (description, quantity, unit_net, vat_amount, discount_amount, total)
+
+save() diffs the two and issues only the INSERT / UPDATE / DELETE statements
+needed, each batched with executemany, on the caller's connection (so it runs
+inside the caller's transaction).
+"""
+
+# Grid columns, which are also the editable invoice_items fields
+COL_DESC, COL_QTY, COL_UNIT, COL_VAT, COL_DISC, COL_TOTAL = range(6)
+
+
+def parse_cell(col: int, text: str):
+    """Grid text -> stored value for column `col`; raises ValueError if invalid."""
+    text = (text or "").strip()
+    if col == COL_DESC:
+        if not text:
+            raise ValueError("Description is required.")
+        return text
+    if col == COL_QTY:
+        return int(float(text))
+    return float(text)
+
+
+def format_cell(col: int, value) -> str:
+    if col == COL_UNIT:
+        try:
+            return f"{float(value):.4f}"
+        except (TypeError, ValueError):
+            pass
+    return str(value)
+
+
+def derive_columns(line: tuple) -> tuple:
+    """
+    invoice_items values for a grid line: the VAT / discount fractions and the
+    VAT flag are derived from the amounts, as in ItemizedBillingDialog.
+    """
+    desc, qty, unit_net, vat_amt, disc_amt, total = line
+    base_before_disc = unit_net * qty
+    disc_frac = 0.0 if base_before_disc <= 0 else (disc_amt / base_before_disc)
+    net_after_disc = base_before_disc - disc_amt
+    vat_frac = 0.0 if net_after_disc <= 0 else (vat_amt / net_after_disc)
+    rate = int(round(vat_frac * 100))
+    flag = "B" if rate == 5 else "C" if rate == 19 else ""
+    return (desc, qty, unit_net, vat_frac, vat_amt, disc_frac, disc_amt, total, flag)
+
+
+class ItemChangeTracker:
+    def __init__(self):
+        self.invoice_id = None
+        self._loaded: dict[int, tuple] = {}  # item_id -> line as loaded
+        self._rows: list[list] = []  # [item_id or None, line], grid order
+
+    def load(self, invoice_id, rows) -> None:
+        """Reset from `(item_id, *line)` rows, e.g. the invoice.items query."""
+        self.invoice_id = invoice_id
+        self._loaded = {r[0]: tuple(r[1:]) for r in rows}
+        self._rows = [[r[0], tuple(r[1:])] for r in rows]
+
+    def item_id(self, row: int):
+        return self._rows[row][0]
+
+    def line(self, row: int) -> tuple:
+        return self._rows[row][1]
+
+    def lines(self) -> list[tuple]:
+        return [line for _, line in self._rows]
+
+    def set_value(self, row: int, col: int, value) -> None:
+        line = list(self._rows[row][1])
+        line[col] = value
+        self._rows[row][1] = tuple(line)
+
+    def append(self, line: tuple) -> None:
+        self._rows.append([None, tuple(line)])
+
+    def remove(self, row: int) -> None:
+        del self._rows[row]
+
+    def changes(self):
+        """(inserts, updates, deletes): new lines, (item_id, line) pairs, item_ids."""
+        inserts = [line for item_id, line in self._rows if item_id is None]
+        updates = [
+            (item_id, line)
+            for item_id, line in self._rows
+            if item_id is not None and self._loaded.get(item_id) != line
+        ]
+        kept = {item_id for item_id, _ in self._rows}
+        deletes = [item_id for item_id in self._loaded if item_id not in kept]
+        return inserts, updates, deletes
+
+    def save(self, conn) -> tuple[int, int, int]:
+        """Write pending changes on `conn`; returns (inserted, updated, deleted)."""
+        inserts, updates, deletes = self.changes()
+        if deletes:
+            conn.executemany(
+                "DELETE FROM invoice_items WHERE item_id = ? AND invoice_id = ?",
+                [(item_id, self.invoice_id) for item_id in deletes],
+            )
+        if updates:
+            conn.executemany(
+                """
+                UPDATE invoice_items
+                   SET description=?, quantity=?, unit_price=?, vat_pct=?, vat_amount=?,
+                       discount_pct=?, discount_amount=?, total_price=?, vat_flag=?
+                 WHERE item_id=? AND invoice_id=?
+                """,
+                [
+                    (*derive_columns(line), item_id, self.invoice_id)
+                    for item_id, line in updates
+                ],
+            )
+        if inserts:
+            conn.executemany(
+                """
+                INSERT INTO invoice_items
+                  (invoice_id, description, quantity, unit_price,
+                   vat_pct, vat_amount, discount_pct, discount_amount,
+                   total_price, vat_flag)
+                VALUES (?,?,?,?,?,?,?,?,?,?)
+                """,
+                [(self.invoice_id, *derive_columns(line)) for line in inserts],
+            )
+        return len(inserts), len(updates), len(deletes)
@@ -0,0 +1,134 @@
+# invoice_model.py
+"""
+Model/View backing for the invoice list in BillingInvoicingScreen.
+
+Rows are the tuples returned by the `invoice.page` query (see db.QUERIES):
+
+    (invoice_id, appointment_id, patient_or_owner, total_amount, final_amount,
+     payment_status, payment_method, remaining, owner_contact, created_at)
+
+Filtering happens in SQL; the model pulls keyset pages (invoice_id DESC) as the
+view scrolls, through canFetchMore/fetchMore. The view only asks for the cells
+it paints, so no QTableWidgetItem/QColor is allocated per cell.
+"""
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PySide6.QtGui import QBrush, QColor
+
+# (header, index into the invoice.page row)
+INVOICE_COLUMNS = (
+    ("Invoice\nID", 0),
+    ("Appointment\nID", 1),
+    ("Patient/Owner\nName", 2),
+    ("Total\nAmount", 3),
+    ("Final\nAmount", 4),
+    ("Payment\nStatus", 5),
+    ("Payment\nMethod", 6),
+    ("Remaining\nBalance", 7),
+    ("Created\nAt", 9),
+)
+MONEY_COLUMNS = frozenset({3, 4, 7})
+STATUS_COLUMN = 5
+
+# Shared brushes, looked up by lower-cased payment_status
+STATUS_BRUSHES = {
+    "paid": QBrush(QColor("#d4edda")),
+    "partially paid": QBrush(QColor("#fff3cd")),
+    "unpaid": QBrush(QColor("#f8d7da")),
+    "estimate": QBrush(QColor("#e0e0f8")),
+    "charity": QBrush(QColor("#e0e0f8")),
+    "n/a": QBrush(QColor("#e0e0f8")),
+}
+
+
+PAGE_SIZE = 200
+_ROOT = QModelIndex()  # the invalid (top-level) parent index
+
+
+class InvoiceTableModel(QAbstractTableModel):
+    """
+    Read-only table over invoice rows. set_source(fetch_page) installs a
+    `fetch_page(before_id, limit) -> rows` callable; before_id is None for the
+    first page and the last invoice_id loaded afterwards.
+    """
+
+    def __init__(self, parent=None, page_size: int = PAGE_SIZE):
+        super().__init__(parent)
+        self._rows: list[tuple] = []
+        self._fetch_page = None
+        self._exhausted = True
+        self.page_size = page_size
+
+    # --- data ---
+    def set_source(self, fetch_page) -> None:
+        """Drop loaded rows and load the first page from `fetch_page`."""
+        self.beginResetModel()
+        self._fetch_page = fetch_page
+        self._rows = self._next_page(None)
+        self.endResetModel()
+
+    def set_rows(self, rows) -> None:
+        """Show a fixed, fully-loaded row list (no paging)."""
+        self.beginResetModel()
+        self._fetch_page = None
+        self._exhausted = True
+        self._rows = list(rows)
+        self.endResetModel()
+
+    def fetch_all(self) -> None:
+        """Load every remaining page (e.g. before exporting)."""
+        while self.canFetchMore():
+            self.fetchMore()
+
+    def _next_page(self, before_id) -> list[tuple]:
+        rows = list(self._fetch_page(before_id, self.page_size))
+        self._exhausted = len(rows) < self.page_size
+        return rows
+
+    def row_tuple(self, row: int) -> tuple:
+        return self._rows[row]
+
+    def invoice_id(self, row: int) -> int:
+        return int(self._rows[row][0])
+
+    # --- QAbstractTableModel ---
+    def canFetchMore(self, parent=_ROOT):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=_ROOT):
+        if parent.isValid() or self._exhausted:
+            return
+        rows = self._next_page(self._rows[-1][0] if self._rows else None)
+        if rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+
+    def rowCount(self, parent=_ROOT):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=_ROOT):
+        return 0 if parent.isValid() else len(INVOICE_COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        col = index.column()
+        val = self._rows[index.row()][INVOICE_COLUMNS[col][1]]
+        if role == Qt.DisplayRole:
+            if col in MONEY_COLUMNS:
+                try:
+                    return f"{float(val):.2f}"
+                except (TypeError, ValueError):
+                    return str(val)
+            return str(val)
+        if role == Qt.BackgroundRole and col == STATUS_COLUMN:
+            return STATUS_BRUSHES.get(str(val).strip().lower())
+        if role == Qt.UserRole:
+            return val
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return INVOICE_COLUMNS[section][0]
+        return super().headerData(section, orientation, role)
@@ -0,0 +1,555 @@
+# invoice_pdf.py
+"""
+ReportLab layouts for invoices (A4 and 80 mm thermal).
+
+Plain functions of the print payload (see load_print_payload), with no widget
+state, so they can run on a worker thread (render_service) or in a worker
+process (invoice_export). Each returns the number of pages written.
+"""
+import json
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.platypus import (
+    Paragraph,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    TableStyle,
+)
+
+from db import connect as _connect
+from db import query_all
+from render_assets import logo_flowable, paragraph_style, stylesheet
+
+
+# --- Payload ---
+def load_print_payloads(invoice_ids) -> dict:
+    """
+    {invoice_id: payload} with all data needed for PDF building/printing.
+    Header, owner/pet, paid total, lines and the per-rate VAT rollup come from
+    three registered statements in one read transaction, batched over every id.
+    Falls back to the owner snapshot if there's no appointment/patient.
+    """
+    ids = json.dumps([int(i) for i in invoice_ids])
+    return _build_payloads(*_read_payload_rows("", {"ids": ids}))
+
+
+def load_print_payload(inv_id) -> dict:
+    """Print payload for one invoice, read by id (the everyday print path)."""
+    rows = _read_payload_rows("_one", {"id": int(inv_id)})
+    payload = _build_payloads(*rows).get(int(inv_id))
+    if payload is None:
+        raise LookupError(f"Invoice {inv_id} not found")
+    return payload
+
+
+def _read_payload_rows(variant: str, params: dict) -> tuple:
+    """(headers, lines, vat rows) from the invoice.print_* statements `variant`."""
+    conn = _connect()
+    try:
+        conn.execute("BEGIN")  # one snapshot: totals can't shift between reads
+        rows = tuple(
+            query_all(f"invoice.print_{part}{variant}", params, conn=conn)
+            for part in ("header", "items", "vat")
+        )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+    return rows
+
+
+def _build_payloads(headers, lines, vat_rows) -> dict:
+    items, vat = {}, {}
+    for inv_id, desc, qty, unit, d_amt, total, v_amt in lines:
+        items.setdefault(inv_id, []).append(
+            {
+                "desc": desc,
+                "qty": qty,
+                "unit": unit,
+                "disc_amt": d_amt,
+                "total": total,
+                "vat_amt": v_amt,
+            }
+        )
+    for inv_id, rate, net, v_amt, flag in vat_rows:
+        vat.setdefault(inv_id, []).append(
+            {"vat_pct": rate, "net": net, "vat_amount": v_amt, "flag": flag}
+        )
+
+    payloads = {}
+    for (
+        inv_id,
+        appt_id,
+        snap_owner,
+        p_owner,
+        p_name,
+        disc_pct,
+        final_total,
+        doc_type,
+        status,
+        paid_amount,
+    ) in headers:
+        if appt_id:
+            owner_name, pet_name = p_owner or "", p_name or ""
+        else:
+            # walk-in: pull snapshot from invoices
+            owner_name, pet_name = snap_owner or "", ""
+        inv_items = items.get(inv_id, [])
+        vat_breakdown = vat.get(inv_id, [])
+
+        subtotal = sum(float(it["total"] or 0) for it in inv_items)  # gross (incl VAT)
+        discount_amount = subtotal * (float(disc_pct) / 100.0)
+        computed_total = float(final_total or (subtotal - discount_amount))
+        balance_due = max(computed_total - float(paid_amount), 0.0)
+
+        payloads[inv_id] = {
+            "inv_id": inv_id,
+            "owner_name": owner_name,
+            "pet_name": pet_name,
+            "items": inv_items,
+            "vat_breakdown": vat_breakdown,
+            "subtotal": subtotal,
+            "disc_pct": float(disc_pct),
+            "discount_amount": discount_amount,
+            "final_total": computed_total,
+            "doc_type": doc_type,
+            "net_excl_vat": sum(v["net"] for v in vat_breakdown),
+            "vat_total": sum(v["vat_amount"] for v in vat_breakdown),
+            "paid_amount": float(paid_amount),
+            "balance_due": balance_due,
+            "status": status,
+        }
+    return payloads
+
+
+# --- Layouts ---
+def generate_pdf_thermal(
+    path,
+    inv_id,
+    created_date,
+    created_time,
+    owner_name,
+    pet_name,
+    items,
+    subtotal,
+    disc_pct,
+    final_total,
+    vat_breakdown,
+    doc_type,
+    net_excl_vat,
+    vat_total,
+    paid_amount,
+    balance_due,
+    status,
+    **_,
+):
+    width, margin = 80 * mm, 5 * mm
+    cw = width - 2 * margin
+    styles = {
+        "Normal": paragraph_style("ThermalNormal", fontName="Courier", fontSize=6),
+        "Title": paragraph_style(
+            "ThermalTitle", "Title", fontName="Courier-Bold", fontSize=9
+        ),
+    }
+
+    elems = []
+
+    # Logo
+    img = logo_flowable(cw * 0.6, cw * 0.3)
+    if img:
+        img.hAlign = "CENTER"
+        elems += [img, Spacer(1, 6 * mm)]
+
+    # Clinic header
+    elems.append(Paragraph("PET WELLNESS VETS", styles["Title"]))
+    elems.append(
+        Paragraph("Kyriakou Adamou no.2, Shop 2&3, 8220", styles["Normal"])
+    )
+    elems.append(
+        Paragraph(
+            "Tel: 99941186   Email: contact@petwellnessvets.com", styles["Normal"]
+        )
+    )
+    elems.append(Spacer(1, 3 * mm))
+
+    # Title
+    title_map = {
+        "INVOICE": "INVOICE",
+        "ESTIMATE": "ESTIMATE",
+        "CHARITY": "CHARITY / PRO BONO",
+    }
+    elems.append(
+        Paragraph(title_map.get(str(doc_type).upper(), "INVOICE"), styles["Title"])
+    )
+    elems.append(Spacer(1, 2 * mm))
+
+    # Meta
+    meta = [
+        ["Inv#:", str(inv_id), "Date:", created_date],
+        ["Time:", created_time, "Customer:", owner_name],
+        ["Pet:", pet_name, "", ""],
+    ]
+    meta_tbl = Table(meta, colWidths=[cw * 0.20, cw * 0.30, cw * 0.20, cw * 0.30])
+    meta_tbl.setStyle(
+        TableStyle(
+            [
+                ["FONTSIZE", (0, 0), (-1, -1), 7],
+                ["BOTTOMPADDING", (0, 0), (-1, -1), 2],
+            ]
+        )
+    )
+    elems += [meta_tbl, Spacer(1, 3 * mm)]
+
+    # Items
+    data = [["Desc", "Qty", "Unit", "Disc", "Total", "VAT"]]
+    for it in items:
+        data.append(
+            [
+                it["desc"],
+                str(it["qty"]),
+                f"{float(it['unit']):.2f}",
+                f"{float(it['disc_amt']):.2f}",
+                f"{float(it['total']):.2f}",
+                f"{float(it['vat_amt']):.2f}",
+            ]
+        )
+    itbl = Table(
+        data,
+        colWidths=[
+            cw * 0.40,
+            cw * 0.10,
+            cw * 0.15,
+            cw * 0.10,
+            cw * 0.15,
+            cw * 0.10,
+        ],
+    )
+    itbl.setStyle(
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+                ("GRID", (0, 0), (-1, -1), 0.3, colors.black),
+                ("FONTSIZE", (0, 0), (-1, -1), 7),
+                ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+            ]
+        )
+    )
+    elems += [itbl, Spacer(1, 3 * mm)]
+
+    # VAT breakdown
+    vat_data = [["Net", "VAT%", "VAT", "Flag"]]
+    for row in vat_breakdown:
+        vat_data.append(
+            [
+                f"{float(row['net'] or 0):.2f}",
+                f"{row['vat_pct']:.2f}%",
+                f"{float(row['vat_amount'] or 0):.2f}",
+                row["flag"],
+            ]
+        )
+    vat_data.append(["", "", "Total VAT", f"€{float(vat_total or 0):.2f}"])
+    vtbl = Table(vat_data, colWidths=[cw * 0.40, cw * 0.20, cw * 0.20, cw * 0.20])
+    vtbl.setStyle(
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+                ("GRID", (0, 0), (-1, -1), 0.3, colors.black),
+                ("FONTSIZE", (0, 0), (-1, -1), 7),
+                ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+            ]
+        )
+    )
+    elems += [vtbl, Spacer(1, 3 * mm)]
+
+    # Accounting block
+    gross_subtotal = sum(float(it["total"] or 0) for it in items)
+    disc_pct_val = float(disc_pct or 0)
+    discount_amount = gross_subtotal * (disc_pct_val / 100.0)
+
+    accounting = [
+        ["Subtotal (Excl. VAT):", f"€{float(net_excl_vat or 0):.2f}"],
+        ["VAT Total:", f"€{float(vat_total or 0):.2f}"],
+        ["Gross Subtotal (Incl. VAT):", f"€{gross_subtotal:.2f}"],
+    ]
+    if disc_pct_val > 0:
+        accounting.append(
+            [f"Invoice Discount ({disc_pct_val:.0f}%):", f"–€{discount_amount:.2f}"]
+        )
+    accounting += [
+        ["Total (Incl. VAT):", f"€{float(final_total or gross_subtotal):.2f}"],
+        ["Amount Paid:", f"€{float(paid_amount or 0):.2f}"],
+        ["Balance Due:", f"€{float(balance_due or 0):.2f}"],
+        ["Status:", status],
+    ]
+    atbl = Table(accounting, colWidths=[cw * 0.60, cw * 0.40], hAlign="RIGHT")
+    atbl.setStyle(
+        TableStyle(
+            [
+                ("FONTSIZE", (0, 0), (-1, -1), 7),
+                ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+                ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+            ]
+        )
+    )
+    elems += [atbl, Spacer(1, 3 * mm)]
+
+    # Non-payable note
+    if str(doc_type).upper() == "ESTIMATE":
+        elems.append(
+            Paragraph(
+                "This is a non-binding estimate. No payment due. Stock is not reserved and may change.",
+                styles["Normal"],
+            )
+        )
+        elems.append(Spacer(1, 2 * mm))
+    elif str(doc_type).upper() == "CHARITY":
+        elems.append(
+            Paragraph(
+                "Charity / pro bono document. No payment due (clinic-sponsored).",
+                styles["Normal"],
+            )
+        )
+        elems.append(Spacer(1, 2 * mm))
+
+    # Signatures
+    sig = [["Doctor:", "Issued By:", "Received By:"], ["____", "____", "____"]]
+    s_tbl = Table(sig, colWidths=[cw / 3] * 3)
+    s_tbl.setStyle(
+        TableStyle(
+            [
+                ["FONTSIZE", (0, 0), (-1, -1), 7],
+                ["BOTTOMPADDING", (0, 0), (2, 0), 4],
+            ]
+        )
+    )
+    elems.append(s_tbl)
+
+    # Auto height
+    total_h = margin * 2
+    for f in elems:
+        _, h = f.wrap(cw, A4[1])
+        total_h += h
+
+    doc = SimpleDocTemplate(
+        path,
+        pagesize=(width, total_h),
+        leftMargin=margin,
+        rightMargin=margin,
+        topMargin=margin,
+        bottomMargin=margin,
+    )
+    doc.build(elems)
+    return doc.page
+
+def generate_pdf_a4(
+    path,
+    inv_id,
+    created_date,
+    created_time,
+    owner_name,
+    pet_name,
+    items,
+    subtotal,
+    disc_pct,
+    final_total,
+    vat_breakdown,
+    doc_type,
+    net_excl_vat,
+    vat_total,
+    paid_amount,
+    balance_due,
+    status,
+    **_,
+):
+    doc = SimpleDocTemplate(
+        path,
+        pagesize=A4,
+        leftMargin=18 * mm,
+        rightMargin=18 * mm,
+        topMargin=18 * mm,
+        bottomMargin=15 * mm,
+    )
+    styles = stylesheet()
+    h1 = paragraph_style("H1", "Heading1", fontSize=14, leading=16, spaceAfter=6)
+    small = paragraph_style("small", fontSize=9, leading=11)
+
+    elems = []
+
+    # Header with logo on the right
+    clinic_left = [
+        Paragraph("<b>PET WELLNESS VETS</b>", h1),
+        Paragraph("Kyriakou Adamou no.2, Shop 2&3, 8220", small),
+        Paragraph("Tel: 99941186", small),
+        Paragraph("Email: contact@petwellnessvets.com", small),
+    ]
+    logo = logo_flowable(35 * mm, 18 * mm)
+    logo_cell = [logo] if logo else []
+    header_tbl = Table([[clinic_left, logo_cell]], colWidths=[120 * mm, 49 * mm])
+    header_tbl.setStyle(
+        TableStyle(
+            [
+                ["VALIGN", (0, 0), (-1, -1), "TOP"],
+                ["ALIGN", (1, 0), (1, 0), "RIGHT"],
+            ]
+        )
+    )
+    elems += [header_tbl, Spacer(1, 6 * mm)]
+
+    # Title & meta
+    title_map = {
+        "INVOICE": "INVOICE",
+        "ESTIMATE": "ESTIMATE",
+        "CHARITY": "CHARITY / PRO BONO",
+    }
+    title = title_map.get(str(doc_type).upper(), "INVOICE")
+    meta_tbl = Table(
+        [
+            [Paragraph(f"<b>{title}</b>", styles["Title"]), ""],
+            ["Invoice #:", str(inv_id)],
+            ["Date:", created_date],
+            ["Time:", created_time],
+            ["Customer:", owner_name],
+            ["Pet:", pet_name],
+        ],
+        colWidths=[35 * mm, 134 * mm],
+    )
+    meta_tbl.setStyle(
+        TableStyle(
+            [
+                ["BOTTOMPADDING", (0, 0), (-1, -1), 3],
+                ["FONTSIZE", (0, 1), (-1, -1), 10],
+            ]
+        )
+    )
+    elems += [meta_tbl, Spacer(1, 8 * mm)]
+
+    # Items table
+    data = [
+        [
+            "Description",
+            "Qty",
+            "Unit (net €)",
+            "Discount (€)",
+            "VAT (€)",
+            "Line Total (€)",
+        ]
+    ]
+    for it in items:
+        data.append(
+            [
+                it["desc"],
+                str(it["qty"]),
+                f"{float(it['unit']):.2f}",
+                f"{float(it['disc_amt']):.2f}",
+                f"{float(it['vat_amt']):.2f}",
+                f"{float(it['total']):.2f}",
+            ]
+        )
+    itbl = Table(
+        data, colWidths=[90 * mm, 15 * mm, 22 * mm, 24 * mm, 20 * mm, 28 * mm]
+    )
+    itbl.setStyle(
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f0f0f0")),
+                ("LINEABOVE", (0, 0), (-1, 0), 0.6, colors.black),
+                ("LINEBELOW", (0, 0), (-1, 0), 0.6, colors.black),
+                ("GRID", (0, 1), (-1, -1), 0.25, colors.HexColor("#c8c8c8")),
+                ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                ("FONTSIZE", (0, 0), (-1, -1), 10),
+            ]
+        )
+    )
+    elems += [itbl, Spacer(1, 8 * mm)]
+
+    # VAT breakdown
+    vat_data = [["Net (€)", "VAT %", "VAT (€)", "Flag"]]
+    for v in vat_breakdown:
+        vat_data.append(
+            [
+                f"{float(v['net'] or 0):.2f}",
+                f"{v['vat_pct']:.2f}%",
+                f"{float(v['vat_amount'] or 0):.2f}",
+                v["flag"],
+            ]
+        )
+    vat_data.append(["", "", "Total VAT", f"€{float(vat_total or 0):.2f}"])
+    vtbl = Table(vat_data, colWidths=[40 * mm, 20 * mm, 30 * mm, 20 * mm])
+    vtbl.setStyle(
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f0f0f0")),
+                ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#c8c8c8")),
+                ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+                ("FONTSIZE", (0, 0), (-1, -1), 10),
+            ]
+        )
+    )
+    elems += [vtbl, Spacer(1, 8 * mm)]
+
+    # Accounting block
+    gross_subtotal = sum(float(it["total"] or 0) for it in items)
+    disc_pct_val = float(disc_pct or 0)
+    discount_amount = gross_subtotal * (disc_pct_val / 100.0)
+
+    accounting = [
+        ["Subtotal (Excl. VAT):", f"€{float(net_excl_vat or 0):.2f}"],
+        ["VAT Total:", f"€{float(vat_total or 0):.2f}"],
+        ["Gross Subtotal (Incl. VAT):", f"€{gross_subtotal:.2f}"],
+    ]
+    if disc_pct_val > 0:
+        accounting.append(
+            [f"Invoice Discount ({disc_pct_val:.0f}%):", f"-€{discount_amount:.2f}"]
+        )
+    accounting += [
+        ["Total (Incl. VAT):", f"€{float(final_total or gross_subtotal):.2f}"],
+        ["Amount Paid:", f"€{float(paid_amount or 0):.2f}"],
+        ["Balance Due:", f"€{float(balance_due or 0):.2f}"],
+        ["Status:", status],
+    ]
+    audit_tbl = Table(accounting, colWidths=[60 * mm, 40 * mm], hAlign="RIGHT")
+    audit_tbl.setStyle(
+        TableStyle(
+            [
+                ["ALIGN", (1, 0), (1, -1), "RIGHT"],
+                ["FONTSIZE", (0, 0), (-1, -1), 11],
+                ["BOTTOMPADDING", (0, 0), (-1, -1), 2],
+            ]
+        )
+    )
+    elems += [audit_tbl, Spacer(1, 6 * mm)]
+
+    # Non-payable note
+    if str(doc_type).upper() == "ESTIMATE":
+        elems += [
+            Paragraph(
+                "This is a non-binding estimate. No payment due. Stock is not reserved and may change.",
+                small,
+            ),
+            Spacer(1, 4 * mm),
+        ]
+    elif str(doc_type).upper() == "CHARITY":
+        elems += [
+            Paragraph(
+                "Charity / pro bono document. No payment due (clinic-sponsored).",
+                small,
+            ),
+            Spacer(1, 4 * mm),
+        ]
+
+    # Signatures
+    sig_tbl = Table(
+        [
+            ["Doctor:", "Issued By:", "Received By:"],
+            ["__________________", "__________________", "__________________"],
+        ],
+        colWidths=[60 * mm, 60 * mm, 49 * mm],
+    )
+    sig_tbl.setStyle(TableStyle([["FONTSIZE", (0, 0), (-1, -1), 10]]))
+    elems.append(sig_tbl)
+
+    doc.build(elems)
+    return doc.page
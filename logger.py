@@ -14,7 +14,8 @@ logging.basicConfig(
 )
 
 
-# Ensure the error log table exists in the database
+# Ensure the error log table exists in the database (app_launcher calls this
+# once at startup; importing the module touches no DB)
 def setup_error_logging():
     conn = _connect()
     cursor = conn.cursor()
@@ -32,10 +33,6 @@ def setup_error_logging():
     conn.close()
 
 
-# Call setup function at the start
-setup_error_logging()
-
-
 def log_error(error_message: str, error_type: str = "General"):
     """Log errors to both a file and the database for debugging."""
     logging.error(error_message)
@@ -1,14 +1,16 @@
-from PySide6.QtCore import Qt
+import importlib
+
+from PySide6.QtCore import Qt, QThreadPool, QTimer
 from PySide6.QtGui import QAction, QPixmap
 from PySide6.QtWidgets import (
 
-    QApplication,
     QDialog,
     QDialogButtonBox,
     QHBoxLayout,
     QLabel,
     QMainWindow,
     QMessageBox,
+    QProgressDialog,
     QPushButton,
     QStackedWidget,
     QStatusBar,
@@ -17,62 +19,45 @@ from PySide6.QtWidgets import (
 )
 
 
-from appointment_scheduling import AppointmentSchedulingScreen
 from backup import DB_PATH, backup_now, resource_path
-from billing_invoicing import BillingInvoicingScreen
 from daily_appointments_calendar import DailyAppointmentsCalendar
-from error_log_viewer import ErrorLogViewer
 from logger import log_error
-from notifications_reminders import NotificationsRemindersScreen
-from patient_management import PatientManagementScreen
-from reports import ZReportWidget
-from reports_analytics import ReportsAnalyticsScreen
-from user_management import UserManagementScreen
-from user_password_dialog import ChangeMyPasswordDialog
+from startup_tasks import Task
 from version import APP_VERSION, CHANNEL
 
+# Stacked pages in sidebar order: (MainWindow attribute, module, screen class).
+# A screen's module is imported and the screen constructed on first
+# display_screen(idx); see MainWindow.get_screen().
+SCREENS = (
+    ("patient_screen", "patient_management", "PatientManagementScreen"),
+    ("appointment_screen", "appointment_scheduling", "AppointmentSchedulingScreen"),
+    ("billing_screen", "billing_invoicing", "BillingInvoicingScreen"),
+    ("inventory_screen", "inventory_management", "InventoryManagementScreen"),
+    ("prescription_screen", "prescription_management", "PrescriptionManagementScreen"),
+    ("medical_records_screen", "medical_records", "MedicalRecordsScreen"),
+    ("consent_screen", "consent_forms", "ConsentFormsScreen"),
+    ("notifications_screen", "notifications_reminders", "NotificationsRemindersScreen"),
+    ("reports_screen", "reports", "ZReportWidget"),
+    ("analytics_screen", "reports_analytics", "ReportsAnalyticsScreen"),
+    ("user_mgmt_screen", "user_management", "UserManagementScreen"),
+)
+(
+    PATIENTS,
+    APPOINTMENTS,
+    BILLING,
+    INVENTORY,
+    PRESCRIPTIONS,
+    MEDICAL_RECORDS,
+    CONSENT,
+    NOTIFICATIONS,
+    REPORTS,
+    ANALYTICS,
+    USER_MGMT,
+) = range(len(SCREENS))
+# Screens that run periodic reminder/e-mail checks: built right after the
+# window is shown (not on first visit) so those timers keep running.
+BACKGROUND_SCREENS = (APPOINTMENTS, NOTIFICATIONS)
 
-# Optional modules with graceful fallbacks
-try:
-    from inventory_management import InventoryManagementScreen
-except Exception as e:
-    log_error(f"Inventory import failed: {e}")
-
-    class InventoryManagementScreen(QLabel):
-        def __init__(self):
-            super().__init__("⚠ï¸ Inventory module failed to load")
-
-
-try:
-    from prescription_management import PrescriptionManagementScreen
-except Exception as e:
-    log_error(f"Prescription import failed: {e}")
-
-    class PrescriptionManagementScreen(QLabel):
-        def __init__(self):
-            super().__init__("⚠ï¸ Prescription module failed to load")
-
-
-# NEW: Medical Records (Visits) import with fallback
-try:
-    from medical_records import MedicalRecordsScreen
-except Exception as e:
-    log_error(f"Medical Records import failed: {e}")
-
-    class MedicalRecordsScreen(QLabel):
-        def __init__(self):
-            super().__init__("ðŸ—'ï¸ Medical Records (Visits) screen not available")
-
-
-# NEW: Consent Forms import with fallback
-try:
-    from consent_forms import ConsentFormsScreen
-except Exception as e:
-    log_error(f"Consent Forms import failed: {e}")
-
-    class ConsentFormsScreen(QLabel):
-        def __init__(self):
-            super().__init__("📠Consent Forms screen not available")
 
 class AboutDialog(QDialog):
     def __init__(self, parent=None):
@@ -159,6 +144,11 @@ class MainWindow(QMainWindow):
         self.user_role = "Guest"
         self.logged_in_username = None
 
+        # "Backup now" runs here, off the GUI thread; closeEvent waits for it
+        self._backup_pool = QThreadPool(self)
+        self._backup_pool.setMaxThreadCount(1)
+        self._backup_task: Task | None = None
+
         # Sidebar buttons
         self.patient_button = QPushButton("Patient Management")
         self.appointment_button = QPushButton("Appointment Scheduling")
@@ -176,48 +166,28 @@ class MainWindow(QMainWindow):
         self.backup_button = QPushButton("Backup now")
         self.fullscreen_button = QPushButton("Exit Full Screen")
 
-        # Screens (instantiate early so we can wire signals)
-        self.patient_screen = PatientManagementScreen()
-        self.appointment_screen = AppointmentSchedulingScreen()
-        self.billing_screen = BillingInvoicingScreen()
-        self.inventory_screen = InventoryManagementScreen()
-        self.prescription_screen = PrescriptionManagementScreen()
-        self.medical_records_screen = MedicalRecordsScreen()  # NEW
-        self.consent_screen = ConsentFormsScreen()  # NEW
-        self.notifications_screen = NotificationsRemindersScreen()
-        self.reports_screen = ZReportWidget()
-        self.analytics_screen = ReportsAnalyticsScreen()
-        self.user_mgmt_screen = UserManagementScreen()
-
-        # Stacked widget (NOTE: index order must match button handlers below)
+        # Screens: one placeholder page each until first shown (see get_screen())
         self.stacked = QStackedWidget()
-        for screen in (
-            self.patient_screen,  # 0
-            self.appointment_screen,  # 1
-            self.billing_screen,  # 2
-            self.inventory_screen,  # 3
-            self.prescription_screen,  # 4
-            self.medical_records_screen,  # 5
-            self.consent_screen,  # 6
-            self.notifications_screen,  # 7
-            self.reports_screen,  # 8
-            self.analytics_screen,  # 9
-            self.user_mgmt_screen,  # 10
-        ):
-            self.stacked.addWidget(screen)
+        self._screens = {}  # stacked index -> constructed screen
+        for attr, _module, _cls in SCREENS:
+            setattr(self, attr, None)
+            self.stacked.addWidget(QWidget())
 
         # Connect buttons to stacked indices
-        self.patient_button.clicked.connect(lambda: self.display_screen(0))
-        self.appointment_button.clicked.connect(lambda: self.display_screen(1))
-        self.billing_button.clicked.connect(lambda: self.display_screen(2))
-        self.inventory_button.clicked.connect(lambda: self.display_screen(3))
-        self.prescription_button.clicked.connect(lambda: self.display_screen(4))
-        self.medical_records_button.clicked.connect(lambda: self.display_screen(5))
-        self.consent_button.clicked.connect(lambda: self.display_screen(6))
-        self.notifications_button.clicked.connect(lambda: self.display_screen(7))
-        self.basic_reports_button.clicked.connect(lambda: self.display_screen(8))
-        self.analytics_button.clicked.connect(lambda: self.display_screen(9))
-        self.user_mgmt_button.clicked.connect(lambda: self.display_screen(10))
+        for button, idx in (
+            (self.patient_button, PATIENTS),
+            (self.appointment_button, APPOINTMENTS),
+            (self.billing_button, BILLING),
+            (self.inventory_button, INVENTORY),
+            (self.prescription_button, PRESCRIPTIONS),
+            (self.medical_records_button, MEDICAL_RECORDS),
+            (self.consent_button, CONSENT),
+            (self.notifications_button, NOTIFICATIONS),
+            (self.basic_reports_button, REPORTS),
+            (self.analytics_button, ANALYTICS),
+            (self.user_mgmt_button, USER_MGMT),
+        ):
+            button.clicked.connect(lambda _checked=False, i=idx: self.display_screen(i))
         self.my_account_button.clicked.connect(self.open_account_settings)
         self.error_log_button.clicked.connect(self.open_error_logs)
         self.backup_button.clicked.connect(self.on_backup_now_clicked)
@@ -273,81 +243,128 @@ class MainWindow(QMainWindow):
         status.addPermanentWidget(brand, 1)  # right-aligned
         self.setStatusBar(status)
 
-        # Cross-screen connections (guarded for compatibility)
+        self.display_screen(PATIENTS)
+        QTimer.singleShot(0, self._build_background_screens)
+
+    # Lazy screens
+    def get_screen(self, idx: int) -> QWidget:
+        """The screen at stacked index `idx`, constructed and wired on first use."""
+        widget = self._screens.get(idx)
+        if widget is not None:
+            return widget
+        attr, module, cls = SCREENS[idx]
+        try:
+            widget = getattr(importlib.import_module(module), cls)()
+        except Exception as e:
+            log_error(f"{cls} failed to load: {e}")
+            widget = QLabel(f"⚠ {cls} failed to load")
+        placeholder = self.stacked.widget(idx)
+        self.stacked.insertWidget(idx, widget)
+        self.stacked.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self._screens[idx] = widget
+        setattr(self, attr, widget)
+
+        wire = {
+            PATIENTS: self._wire_patient_screen,
+            APPOINTMENTS: self._wire_appointment_screen,
+            BILLING: self._wire_billing_screen,
+        }.get(idx)
+        if wire is not None and not isinstance(widget, QLabel):
+            wire(widget)
+        return widget
+
+    def _build_background_screens(self):
+        for idx in BACKGROUND_SCREENS:
+            self.get_screen(idx)
+
+    # Cross-screen connections (guarded for compatibility). Each screen wires
+    # its own signals when built; targets are resolved through get_screen() at
+    # emit time, and refreshes for screens not built yet are skipped (they
+    # load fresh data when constructed).
+    def _wire_patient_screen(self, patient_screen):
         try:
-            self.patient_screen.patient_list_updated.connect(
-                self.appointment_screen.reload_patients
+            patient_screen.patient_list_updated.connect(
+                self._reload_appointment_patients
             )
         except Exception as e:
             log_error(f"Wire patient_list_updated → reload_patients failed: {e}")
 
         try:
-            self.patient_screen.patient_selected.connect(
-                self.appointment_screen.load_patient_details
-            )
-            self.patient_screen.patient_selected.connect(self.handle_patient_selected)
+            patient_screen.patient_selected.connect(self.handle_patient_selected)
         except Exception as e:
             log_error(f"Wire patient_selected signals failed: {e}")
 
         # Patient → Medical Records (Visits)
-        if hasattr(self.patient_screen, "create_medical_record"):
+        if hasattr(patient_screen, "create_medical_record"):
             try:
-                self.patient_screen.create_medical_record.connect(
+                patient_screen.create_medical_record.connect(
                     self.open_med_record_from_patient
                 )
             except Exception as e:
                 log_error(f"Wire create_medical_record failed: {e}")
 
-        # Appointment → Medical Records (Visits)
-        # main_window.py
-        self.appointment_screen.open_visit_requested.connect(
-            lambda visit_id, _pid: self.open_visit(visit_id)
-        )
-
         # Patient → Consent Forms
-        if hasattr(self.patient_screen, "create_consent_requested"):
+        if hasattr(patient_screen, "create_consent_requested"):
             try:
-                self.patient_screen.create_consent_requested.connect(
-                    lambda pid, pname: self._open_consent_for_patient(pid, pname)
+                patient_screen.create_consent_requested.connect(
+                    self._open_consent_for_patient
                 )
             except Exception as e:
                 log_error(f"Wire create_consent_requested failed: {e}")
 
+    def _wire_appointment_screen(self, appointment_screen):
+        # Appointment → Medical Records (Visits)
+        appointment_screen.open_visit_requested.connect(self.open_visit)
+
         # Appointment → Notifications pane
         try:
-            self.appointment_screen.reminders_list_updated.connect(
-                self.notifications_screen.reload_reminders
+            appointment_screen.reminders_list_updated.connect(
+                self._reload_notifications
             )
         except Exception as e:
             log_error(f"Wire reminders_list_updated → reload_reminders failed: {e}")
 
         # Appointment → Billing (single, canonical route)
         try:
-            self.appointment_screen.navigate_to_billing_signal.connect(
+            appointment_screen.navigate_to_billing_signal.connect(
                 self.navigate_to_billing_screen
             )
         except Exception as e:
             log_error(f"Wire navigate_to_billing_signal failed: {e}")
 
+    def _wire_billing_screen(self, billing_screen):
         # Billing → Notifications (load reminders by invoice selection)
         try:
-            self.billing_screen.invoiceSelected.connect(
-                self.notifications_screen.load_reminders
+            billing_screen.invoiceSelected.connect(
+                lambda invoice_id: self.get_screen(NOTIFICATIONS).load_reminders(
+                    invoice_id
+                )
             )
         except Exception as e:
             log_error(
                 f"Wire invoiceSelected → notifications.load_reminders failed: {e}"
             )
 
+    def _reload_appointment_patients(self):
+        if APPOINTMENTS in self._screens:
+            self._screens[APPOINTMENTS].reload_patients()
+
+    def _reload_notifications(self):
+        if NOTIFICATIONS in self._screens:
+            self._screens[NOTIFICATIONS].reload_reminders()
+
     # Helpers / plumbing
     def display_screen(self, idx: int):
-        self.stacked.setCurrentIndex(idx)
+        self.stacked.setCurrentWidget(self.get_screen(idx))
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Escape:
             self.showNormal()
 
     def open_error_logs(self):
+        from error_log_viewer import ErrorLogViewer
+
         ErrorLogViewer().exec()
 
     def toggle_fullscreen(self):
@@ -360,19 +377,19 @@ class MainWindow(QMainWindow):
         )
 
     def handle_patient_selected(self, pid, pname):
-        self.appointment_screen.load_patient_details(pid, pname)
-        self.display_screen(1)
+        self.get_screen(APPOINTMENTS).load_patient_details(pid, pname)
+        self.display_screen(APPOINTMENTS)
 
     # *** Simplified, canonical billing router ***
     def navigate_to_billing_screen(self, appt_id: int):
         try:
-            self.billing_screen.open_billing_for_appointment(appt_id)
+            self.get_screen(BILLING).open_billing_for_appointment(appt_id)
         except Exception as e:
             log_error(f"open_billing_for_appointment failed: {e}")
             QMessageBox.warning(
                 self, "Billing", "Could not open Billing for this appointment."
             )
-        self.display_screen(2)
+        self.display_screen(BILLING)
 
     def set_user_context(self, username, role):
         self.logged_in_username = username
@@ -404,55 +421,80 @@ class MainWindow(QMainWindow):
         if not self.logged_in_username:
             QMessageBox.warning(self, "Error", "No logged-in user.")
             return
+        from user_password_dialog import ChangeMyPasswordDialog
+
         dlg = ChangeMyPasswordDialog(self.logged_in_username)
         dlg.exec()
 
     # NEW: open Medical Records screen focused on a patient (if supported)
     def open_med_record_from_patient(self, patient_id: int, patient_name: str):
         try:
-            focus_fn = getattr(self.medical_records_screen, "focus_on_patient", None)
+            records = self.get_screen(MEDICAL_RECORDS)
+            focus_fn = getattr(records, "focus_on_patient", None)
             if callable(focus_fn):
                 focus_fn(patient_id, patient_name)
         except Exception as e:
             log_error(f"MedicalRecords focus failed: {e}")
-        idx = self.stacked.indexOf(self.medical_records_screen)
-        if idx != -1:
-            self.display_screen(idx)
+        self.display_screen(MEDICAL_RECORDS)
 
     # NEW: open Consent Forms with patient preselected (if supported)
     def _open_consent_for_patient(self, pid: int, pname: str):
         try:
-            quick_create = getattr(self.consent_screen, "quick_create_for", None)
+            quick_create = getattr(self.get_screen(CONSENT), "quick_create_for", None)
             if callable(quick_create):
                 quick_create(pid, pname)
         except Exception as e:
             log_error(f"Consent quick_create_for failed: {e}")
 
-        idx = self.stacked.indexOf(self.consent_screen)
-        if idx != -1:
-            self.display_screen(idx)
+        self.display_screen(CONSENT)
 
     def open_visit(self, visit_id: int):
         try:
-            fn = getattr(self.medical_records_screen, "focus_on_visit", None)
+            fn = getattr(self.get_screen(MEDICAL_RECORDS), "focus_on_visit", None)
             if callable(fn):
                 fn(visit_id)
         except Exception as e:
             log_error(f"focus_on_visit failed: {e}")
-        idx = self.stacked.indexOf(self.medical_records_screen)
-        if idx != -1:
-            self.display_screen(idx)
+        self.display_screen(MEDICAL_RECORDS)
 
     def on_backup_now_clicked(self):
-        try:
-            path = backup_now()
+        # Paced copy, integrity check and compression: minutes on a large
+        # database, so it runs on a pool thread behind a progress dialog.
+        if self._backup_task is not None:
+            return
+        self.backup_button.setEnabled(False)
+        dialog = QProgressDialog("Backing up database…", None, 0, 100, self)
+        dialog.setWindowTitle("Backup")
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(500)
+
+        task = Task("backup_now", lambda progress: backup_now(progress))
+        task.setAutoDelete(False)
+        task.signals.progress.connect(
+            lambda done, total: dialog.setValue(done * 100 // max(total, 1))
+        )
+        task.signals.finished.connect(
+            lambda path: self._on_backup_done(dialog, path, None)
+        )
+        task.signals.failed.connect(
+            lambda message: self._on_backup_done(dialog, None, message)
+        )
+        self._backup_task = task
+        self._backup_pool.start(task)
+
+    def _on_backup_done(self, dialog, path, error):
+        self._backup_task = None
+        dialog.close()
+        self.backup_button.setEnabled(True)
+        if error is None:
             QMessageBox.information(
                 self, "Backup complete", f"Backup saved to:\n{path}"
             )
-        except Exception as e:
-            QMessageBox.critical(self, "Backup failed", str(e))
+        else:
+            QMessageBox.critical(self, "Backup failed", error)
 
     def closeEvent(self, e):
+        self._backup_pool.waitForDone()  # let a running backup complete
         # Ask every child widget to shut down timers if they implement stop_timers()
         for w in self.findChildren(QWidget):
             stop = getattr(w, "stop_timers", None)
@@ -25,6 +25,7 @@ from PySide6.QtWidgets import (
 )
 
 from db import connect as _connect
+from db import run_query
 
 
 class MedicalRecordsScreen(QWidget):
@@ -243,17 +244,7 @@ class MedicalRecordsScreen(QWidget):
         conn = _connect()  # autocommit
 
         conn.execute("PRAGMA foreign_keys=ON;")
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT appointment_id, COALESCE(date_time,''), COALESCE(veterinarian,''), COALESCE(reason,'')
-            FROM appointments
-            WHERE patient_id = ?
-              AND date(date_time) >= date('now', '-60 days')
-            ORDER BY datetime(date_time) DESC
-        """,
-            (patient_id,),
-        )
+        cur = run_query(conn, "appointments.recent_for_patient", (patient_id,))
         for appt_id, dt, vet, reason in cur.fetchall():
             label = f"#{appt_id} ̢ۢ {dt} ̢ۢ {vet} ̢ۢ {reason}"
             self.appt_combo.addItem(label, appt_id)
@@ -18,6 +18,7 @@ from PySide6.QtWidgets import (
 )
 
 from db import connect as _connect
+from db import query_all, run_query
 
 # Import the email sender AND the kill-switch flag if available.
 # Fallback to reading ENABLE_EMAILS from env if the module doesn't expose it yet.
@@ -169,40 +170,12 @@ class NotificationsRemindersScreen(QWidget):
 
     def load_reminders(self, show_all=False):
         """Load reminders into the table. By default, show only today's reminders."""
-        conn = _connect()
-        cursor = conn.cursor()
-
-        # Base query
-        query = """
-            SELECT 
-                r.reminder_id,
-                a.date_time AS appointment_time,
-                p.name AS patient_name,
-                p.owner_name AS owner_name,
-                p.owner_contact AS owner_contact,
-                p.owner_email AS owner_email,
-                a.appointment_type AS appointment_type,
-                a.reason AS appointment_reason,
-                a.veterinarian AS assigned_vet,
-                a.status AS appointment_status,
-                r.reminder_time,
-                r.reminder_status,
-                r.reminder_reason
-            FROM reminders r
-            JOIN appointments a ON r.appointment_id = a.appointment_id
-            JOIN patients p ON a.patient_id = p.patient_id
-        """
-        params = []
-
-        # Filter for today's reminders if not showing all
-        if not show_all:
+        if show_all:
+            reminders = query_all("reminders.all")
+        else:
+            # Filter for today's reminders (indexed on DATE(reminder_time))
             today = datetime.now().strftime("%Y-%m-%d")
-            query += " WHERE DATE(r.reminder_time) = ?"
-            params.append(today)
-
-        cursor.execute(query, params)
-        reminders = cursor.fetchall()
-        conn.close()
+            reminders = query_all("reminders.for_day", (today,))
 
         # Populate the table
         self.reminders_table.setRowCount(0)
@@ -229,25 +202,7 @@ class NotificationsRemindersScreen(QWidget):
         cursor = conn.cursor()
 
         # Fetch all pending reminders up to now
-        cursor.execute(
-            """
-            SELECT r.reminder_id,
-                   r.appointment_id,
-                   r.reminder_time,
-                   r.reminder_reason,
-                   p.owner_email,
-                   p.owner_name,
-                   a.appointment_type,
-                   a.reason
-              FROM reminders r
-              JOIN appointments a ON r.appointment_id = a.appointment_id
-              JOIN patients p     ON a.patient_id   = p.patient_id
-             WHERE r.reminder_time <= ?
-               AND r.reminder_status = 'Pending'
-        """,
-            (now,),
-        )
-        reminders = cursor.fetchall()
+        reminders = run_query(conn, "reminders.pending_due", (now,)).fetchall()
 
         for (
             rem_id,
@@ -281,11 +236,7 @@ class NotificationsRemindersScreen(QWidget):
                 # Look up invoice status & remaining balance
                 cursor.execute(
                     """
-                    SELECT final_amount - COALESCE((
-                        SELECT SUM(amount_paid)
-                          FROM payment_history
-                         WHERE invoice_id = i.invoice_id
-                    ),0),
+                    SELECT final_amount - paid_total,
                     payment_status
                       FROM invoices i
                      WHERE i.appointment_id = ?
@@ -1,7 +1,5 @@
 # prescription_management.py
 
-import sqlite3
-
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (
     QComboBox,
@@ -18,30 +16,24 @@ from PySide6.QtWidgets import (
 )
 
 import inventory
+from db import add_missing_columns
 from db import connect as _connect
 
 
 # â â  Ensure the dispensed columns exist â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â
 def _ensure_dispensed_columns():
     conn = _connect()
-    cur = conn.cursor()
-    try:
-        cur.execute(
-            "ALTER TABLE prescriptions ADD COLUMN dispensed INTEGER NOT NULL DEFAULT 0"
-        )
-    except sqlite3.OperationalError:
-        pass
-    try:
-        cur.execute("ALTER TABLE prescriptions ADD COLUMN date_dispensed TEXT")
-    except sqlite3.OperationalError:
-        pass
-    conn.commit()
+    add_missing_columns(
+        conn,
+        "prescriptions",
+        (
+            ("dispensed", "INTEGER NOT NULL DEFAULT 0"),
+            ("date_dispensed", "TEXT"),
+        ),
+    )
     conn.close()
 
 
-_ensure_dispensed_columns()
-
-
 # â â  CRUD API â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â
 def get_all_prescriptions():
     conn = _connect()
@@ -112,6 +104,7 @@ class PrescriptionManagementScreen(QWidget):
         super().__init__()
         self.setWindowTitle("Prescription Management")
         self.selected_prescription_id = None
+        _ensure_dispensed_columns()  # legacy DBs; here rather than at import
 
         main = QVBoxLayout(self)
 
@@ -280,40 +273,51 @@ class PrescriptionManagementScreen(QWidget):
             return
         med_name = res[0]
 
-        # 2) Lookup SKU
+        # 2) Resolve the SKU the way deduct_for_document matches names (stripped),
+        #    3) deduct stock and 4) mark dispensed, all in one transaction
         conn = _connect()
-        cur = conn.cursor()
-        cur.execute("SELECT item_id FROM items WHERE name = ?", (med_name,))
-        row = cur.fetchone()
-        conn.close()
-        if not row:
-            QMessageBox.warning(
-                self, "No SKU", f"No inventory item named {med_name}found."
-            )
-            return
-        item_id = row[0]
-
-        # 3) Deduct stock
         try:
-            inventory.adjust_stock(item_id, -1, f"Dispensed Rx #{pid}")
+            conn.execute("BEGIN IMMEDIATE")
+            skus = inventory.item_ids_by_name(conn, [med_name])
+            if not skus:
+                conn.rollback()
+                QMessageBox.warning(
+                    self, "No SKU", f"No inventory item named {med_name} found."
+                )
+                return
+            deducted = inventory.deduct_for_document(
+                conn,
+                "prescription",
+                pid,
+                [(1, med_name, 1, f"Dispensed Rx #{pid}")],
+                skus=skus,
+            )
+            if not deducted:
+                conn.rollback()
+                QMessageBox.warning(
+                    self,
+                    "Not Dispensed",
+                    f"No stock of {med_name} was deducted (it may already have "
+                    f"been taken out for Rx #{pid}), so the prescription was not "
+                    "marked dispensed.",
+                )
+                return
+            conn.execute(
+                """
+                UPDATE prescriptions
+                   SET dispensed = 1,
+                       date_dispensed = datetime('now')
+                 WHERE prescription_id = ?
+            """,
+                (pid,),
+            )
+            conn.commit()
         except Exception as e:
+            conn.rollback()
             QMessageBox.critical(self, "Error", f"Could not adjust stock:\n{e}")
             return
-
-        # 4) Mark dispensed
-        conn = _connect()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            UPDATE prescriptions
-               SET dispensed = 1,
-                   date_dispensed = datetime('now')
-             WHERE prescription_id = ?
-        """,
-            (pid,),
-        )
-        conn.commit()
-        conn.close()
+        finally:
+            conn.close()
 
         QMessageBox.information(
             self, "Dispensed", f"1 × {med_name} removed from stock."
@@ -0,0 +1,166 @@
+# render_assets.py
+"""
+Shared assets for the ReportLab documents (invoices, Z-report, consent forms).
+
+The clinic logo path is resolved once and the image decoded once per size:
+logo_flowable() / logo_reader() hand out copies downscaled to the requested
+box at LOGO_DPI, kept in memory as PNG bytes, instead of every PDF probing the
+filesystem and embedding the full-size icon. Paragraph styles are built once.
+
+Everything is dropped when LOGO_PNG changes on disk (one stat per call), so a
+replaced logo shows up without a restart. Cached styles are shared between
+documents and render threads: never mutate them, derive a new one with
+paragraph_style() instead.
+"""
+import io
+import os
+import sys
+import threading
+
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Image, LayoutError
+
+from backup import DB_PATH, LOGO_PNG
+from logger import log_error
+
+LOGO_DPI = 300
+
+_LOGO_NAMES = (
+    "pet_wellness_logo.png",
+    "pet_wellness_logo.jpg",
+    "clinic_logo.png",
+    "clinic_logo.jpg",
+    "logo.png",
+    "logo.jpg",
+)
+
+# What a document render can raise on bad data, a missing image or font, or a
+# failing disk; the render workers (render_service, invoice_export) catch these
+RENDER_ERRORS = (
+    OSError,
+    ValueError,
+    LookupError,
+    TypeError,
+    AttributeError,
+    LayoutError,
+)
+
+_lock = threading.Lock()
+_stamp = object()  # LOGO_PNG (mtime, size) the cache was filled for
+_cache: dict = {}  # "logo_path" / ("logo", w_px, h_px) / ("style", ...) -> value
+
+
+def _find_logo_path():
+    """
+    Resolve the clinic logo path.
+    1) If backup.LOGO_PNG exists, use it.
+    2) Else try common locations (handles dev & PyInstaller).
+    """
+    if LOGO_PNG and os.path.exists(str(LOGO_PNG)):
+        return str(LOGO_PNG)
+
+    # Fallback scan (should rarely be needed if LOGO_PNG is bundled)
+    env = os.getenv("PETWELLNESS_LOGO")
+    if env and os.path.exists(env):
+        return env
+
+    bases = []
+    if hasattr(sys, "_MEIPASS"):
+        bases.append(sys._MEIPASS)
+    bases.append(os.path.dirname(os.path.abspath(sys.argv[0])))
+    bases.append(os.path.dirname(__file__))
+    bases.append(os.getcwd())
+    bases.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    bases.append(os.path.dirname(str(DB_PATH)))
+
+    for base in bases:
+        for sub in ("", "assets", "resources"):
+            for n in _LOGO_NAMES:
+                p = os.path.join(base, sub, n)
+                if os.path.exists(p):
+                    return p
+    return None
+
+
+def _logo_stamp():
+    try:
+        st = os.stat(str(LOGO_PNG))
+        return st.st_mtime_ns, st.st_size
+    except (OSError, TypeError):
+        return None
+
+
+def _cached(key, build):
+    """Cache lookup under the lock; empties the cache if LOGO_PNG changed."""
+    global _stamp
+    with _lock:
+        stamp = _logo_stamp()
+        if stamp != _stamp:
+            _cache.clear()
+            _stamp = stamp
+        if key not in _cache:
+            _cache[key] = build()
+        return _cache[key]
+
+
+def clear() -> None:
+    """Forget everything (e.g. after PETWELLNESS_LOGO was changed)."""
+    global _stamp
+    with _lock:
+        _cache.clear()
+        _stamp = object()
+
+
+# --- Logo ---
+def logo_path():
+    return _cached("logo_path", _find_logo_path)
+
+
+def _scaled_logo(width, height):
+    """PNG bytes of the logo fitted into a width x height pt box, or None."""
+    path = logo_path()
+    if not path:
+        return None
+    size = (max(1, round(width * LOGO_DPI / 72)), max(1, round(height * LOGO_DPI / 72)))
+
+    def build():
+        from PIL import Image as PILImage
+
+        try:
+            with PILImage.open(path) as im:
+                im = im.convert("RGBA")
+                im.thumbnail(size, PILImage.LANCZOS)  # keeps aspect, never upscales
+                buf = io.BytesIO()
+                im.save(buf, "PNG")
+            return buf.getvalue()
+        except (OSError, ValueError, PILImage.DecompressionBombError) as e:
+            log_error(f"Logo load failed ({path}): {e}")
+            return None
+
+    return _cached(("logo", *size), build)
+
+
+def logo_flowable(width, height):
+    """Platypus Image of the logo drawn at width x height pt, or None."""
+    data = _scaled_logo(width, height)
+    return Image(io.BytesIO(data), width=width, height=height) if data else None
+
+
+def logo_reader(width, height):
+    """ImageReader for canvas.drawImage() into a width x height pt box, or None."""
+    data = _scaled_logo(width, height)
+    return ImageReader(io.BytesIO(data)) if data else None
+
+
+# --- Paragraph styles ---
+def stylesheet():
+    """The shared getSampleStyleSheet() (read-only)."""
+    return _cached("stylesheet", getSampleStyleSheet)
+
+
+def paragraph_style(name, parent="Normal", **attrs):
+    """ParagraphStyle `name` based on stylesheet()[parent], built once."""
+    key = ("style", name, parent, tuple(sorted(attrs.items())))
+    sheet = stylesheet()
+    return _cached(key, lambda: ParagraphStyle(name, parent=sheet[parent], **attrs))
@@ -0,0 +1,130 @@
+# render_service.py
+"""
+Off-GUI-thread document rendering on a QThreadPool.
+
+    service = RenderService(parent)
+    service.finished.connect(on_done)      # (job_id, path)
+    service.failed.connect(on_error)       # (job_id, message)
+    job_id = service.submit(generate_pdf_a4, path, payload)
+    service.cancel(job_id)
+
+Render functions are called as render_fn(path, **payload) and must not touch
+widgets. Output is written to "<path>.part" and renamed into place only when
+the job completes un-cancelled, so a cancelled or failed job never leaves a
+half-written file behind.
+"""
+import itertools
+import os
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from logger import log_error
+
+
+class _JobSignals(QObject):
+    finished = Signal(int, str)
+    failed = Signal(int, str)
+    cancelled = Signal(int)
+
+
+class RenderJob(QRunnable):
+    def __init__(self, job_id: int, render_fn, path: str, payload: dict):
+        super().__init__()
+        self.setAutoDelete(False)  # the service keeps a reference until done
+        self.job_id = job_id
+        self.render_fn = render_fn
+        self.path = path
+        self.payload = payload
+        self.signals = _JobSignals()
+        self._cancel = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def run(self):
+        if self.is_cancelled:
+            self.signals.cancelled.emit(self.job_id)
+            return
+        from render_assets import RENDER_ERRORS  # reportlab, loaded with the job
+
+        tmp = f"{self.path}.part"
+        try:
+            self.render_fn(tmp, **self.payload)
+            if self.is_cancelled:
+                os.remove(tmp)
+                self.signals.cancelled.emit(self.job_id)
+                return
+            os.replace(tmp, self.path)
+        except RENDER_ERRORS as e:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            log_error(f"Render job {self.job_id} ({self.path}) failed: {e}")
+            self.signals.failed.emit(self.job_id, str(e))
+            return
+        self.signals.finished.emit(self.job_id, self.path)
+
+
+class RenderService(QObject):
+    """Runs render jobs concurrently on a private QThreadPool."""
+
+    started = Signal(int, str)  # job_id, path
+    finished = Signal(int, str)  # job_id, path
+    failed = Signal(int, str)  # job_id, message
+    cancelled = Signal(int)  # job_id
+
+    def __init__(self, parent=None, max_threads: int | None = None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        if max_threads:
+            self._pool.setMaxThreadCount(max_threads)
+        self._jobs: dict[int, RenderJob] = {}
+        self._ids = itertools.count(1)
+
+    def submit(self, render_fn, path: str, payload: dict) -> int:
+        job = RenderJob(next(self._ids), render_fn, path, payload)
+        job.signals.finished.connect(self._on_finished)
+        job.signals.failed.connect(self._on_failed)
+        job.signals.cancelled.connect(self._on_cancelled)
+        self._jobs[job.job_id] = job
+        self._pool.start(job)
+        self.started.emit(job.job_id, path)
+        return job.job_id
+
+    def cancel(self, job_id: int) -> None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        job.cancel()
+        # Not picked up by a thread yet: drop it from the queue outright
+        if self._pool.tryTake(job):
+            self._on_cancelled(job_id)
+
+    def cancel_all(self) -> None:
+        for job_id in list(self._jobs):
+            self.cancel(job_id)
+
+    def pending(self) -> int:
+        return len(self._jobs)
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    # Slots run on the GUI thread (queued from the worker's signals)
+    def _on_finished(self, job_id: int, path: str):
+        if self._jobs.pop(job_id, None) is not None:
+            self.finished.emit(job_id, path)
+
+    def _on_failed(self, job_id: int, message: str):
+        if self._jobs.pop(job_id, None) is not None:
+            self.failed.emit(job_id, message)
+
+    def _on_cancelled(self, job_id: int):
+        if self._jobs.pop(job_id, None) is not None:
+            self.cancelled.emit(job_id)
@@ -1,10 +1,12 @@
 # reports.py
 import os
 import sqlite3
+from collections import defaultdict
 from datetime import datetime, timedelta
 
 from PySide6.QtCore import QDate
 from PySide6.QtWidgets import (
+    QCheckBox,
     QDateEdit,
     QFileDialog,
     QHBoxLayout,
@@ -20,13 +22,7 @@ from PySide6.QtWidgets import (
 )
 
 from db import connect as _connect
-
-
-# choose invoice date column that exists in your DB
-def _invoice_date_expr(cur) -> str:
-    cur.execute("PRAGMA table_info(invoices)")
-    cols = [row[1] for row in cur.fetchall()]
-    return "DATE(i.invoice_date)" if "invoice_date" in cols else "DATE(i.created_at)"
+from db import query_all
 
 
 # business day → [start, end) timestamps using cutoff hour (0–23)
@@ -37,78 +33,9 @@ def _business_window(business_date: str, cutoff_hour: int):
     return start.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S")
 
 
-def _invoice_date_expr(cur) -> str:
-    """
-    Returns the SQL expression to use for the invoice 'date' filter,
-    preferring i.invoice_date if it exists, otherwise DATE(i.created_at).
-    """
-    cur.execute("PRAGMA table_info(invoices)")
-    cols = [row[1] for row in cur.fetchall()]
-    return "DATE(i.invoice_date)" if "invoice_date" in cols else "DATE(i.created_at)"
-
-
 # ---------- Core data fetcher (used by both PDF + on-screen + Excel) ----------
-def get_z_report_data(business_date: str, cutoff_hour: int = 0):
-    """
-    Returns:
-      {
-        "window": {"start_ts","end_ts","cutoff_hour"},
-        "sales":  {"invoice_count","gross_sales","tax_collected",
-                   "net_by_rate":[...], "vat_by_rate":[...], "gross_by_rate":[...],
-                   "totals":{"net","vat","gross"}},
-        "tenders": {"by_method":[{"method","payments_total","refunds_total"}...],
-                    "net_total": float},
-      }
-    """
-    import sqlite3
-
-    conn = _connect()
-    cur = conn.cursor()
-
-    start_ts, end_ts = _business_window(business_date, int(cutoff_hour))
-    date_expr = _invoice_date_expr(cur)
-
-    # --- Sales: invoices for that business date (invoice_date) ---
+def _sales_section(rate_rows, count_row) -> dict:
     # Gross sales = SUM(final_amount), VAT by rate discount-aware, Net = Gross - VAT
-    # Discount-aware per-rate rollup
-    vat_sql = f"""
-    WITH inv AS (
-      SELECT i.invoice_id, COALESCE(i.discount,0) AS disc_pct, COALESCE(i.final_amount,0) AS final_amount
-      FROM invoices i
-      WHERE {date_expr} = :D
-        AND i.invoice_type = 'INVOICE'
-        AND COALESCE(i.revenue_eligible,1) = 1
-    ),
-    lines AS (
-      SELECT ii.invoice_id,
-             COALESCE(
-               CAST(ROUND(ii.vat_pct * 100.0, 0) AS INTEGER),
-               CASE ii.vat_flag WHEN 'B' THEN 5 WHEN 'C' THEN 19 ELSE 0 END, 0
-             ) AS vat_rate,
-             SUM(ii.total_price - COALESCE(ii.vat_amount,0)) AS net_pre,
-             SUM(COALESCE(ii.vat_amount,0))                  AS vat_pre,
-             SUM(ii.total_price)                             AS gross_pre
-      FROM invoice_items ii
-      JOIN inv ON inv.invoice_id = ii.invoice_id
-      GROUP BY ii.invoice_id, vat_rate
-    ),
-    adj AS (
-      SELECT l.vat_rate,
-             (l.net_pre   * (1.0 - inv.disc_pct/100.0)) AS net_adj,
-             (l.vat_pre   * (1.0 - inv.disc_pct/100.0)) AS vat_adj,
-             (l.gross_pre * (1.0 - inv.disc_pct/100.0)) AS gross_adj
-      FROM lines l JOIN inv ON inv.invoice_id = l.invoice_id
-    )
-    SELECT vat_rate,
-           ROUND(SUM(net_adj),  2) AS net_excl_vat,
-           ROUND(SUM(vat_adj),  2) AS vat_amount,
-           ROUND(SUM(gross_adj),2) AS gross_incl_vat
-    FROM adj
-    GROUP BY vat_rate
-    ORDER BY vat_rate;
-    """
-    cur.execute(vat_sql, {"D": business_date})
-    rows = cur.fetchall()
     by_rate = [
         {
             "rate": int(r[0]),
@@ -116,104 +43,155 @@ def get_z_report_data(business_date: str, cutoff_hour: int = 0):
             "vat": float(r[2] or 0.0),
             "gross": float(r[3] or 0.0),
         }
-        for r in rows
+        for r in rate_rows
     ]
     totals = {
         "net": round(sum(r["net"] for r in by_rate), 2),
         "vat": round(sum(r["vat"] for r in by_rate), 2),
         "gross": round(sum(r["gross"] for r in by_rate), 2),
     }
+    inv_count, gross_sales = count_row or (0, 0.0)
+    return {
+        "invoice_count": int(inv_count or 0),
+        "gross_sales": float(gross_sales or 0.0),
+        "tax_collected": float(totals["vat"]),
+        "by_rate": by_rate,
+        "totals": totals,
+    }
 
-    # Invoice count & gross sales = SUM(final_amount) for the day
-    cur.execute(
-        f"""
-        SELECT COUNT(*), ROUND(SUM(COALESCE(final_amount,0)), 2)
-          FROM invoices i
-         WHERE {date_expr} = :D
-           AND i.invoice_type = 'INVOICE'
-           AND COALESCE(i.revenue_eligible,1) = 1
-    """,
-        {"D": business_date},
-    )
-    inv_count, gross_sales = cur.fetchone() or (0, 0.0)
 
-    # --- Tenders & refunds: payments within the business window ---
+def _tender_section(tender_rows) -> dict:
     # We currently don't track refunds; if you ever store them as negative payments,
     # this split keeps them separate.
-    tender_sql = """
-    SELECT
-      COALESCE(payment_method,'Other') AS method,
-      ROUND(SUM(CASE WHEN amount_paid >= 0 THEN amount_paid ELSE 0 END), 2) AS payments_total,
-      ROUND(ABS(SUM(CASE WHEN amount_paid <  0 THEN amount_paid ELSE 0 END)), 2) AS refunds_total
-    FROM payment_history
-    WHERE DATETIME(payment_date) >= DATETIME(:START)
-      AND DATETIME(payment_date) <  DATETIME(:END)
-    GROUP BY payment_method
-    ORDER BY method;
-    """
-    cur.execute(tender_sql, {"START": start_ts, "END": end_ts})
     tenders = [
         {
             "method": m or "Other",
             "payments_total": float(p or 0.0),
             "refunds_total": float(r or 0.0),
         }
-        for (m, p, r) in cur.fetchall()
+        for (m, p, r) in tender_rows
     ]
     net_total = round(sum(t["payments_total"] - t["refunds_total"] for t in tenders), 2)
+    return {"by_method": tenders, "net_total": net_total}
 
-    conn.close()
+
+def get_z_report_range(first_date: str, last_date: str, cutoff_hour: int = 0):
+    """
+    Z-report for the business dates first_date..last_date (inclusive), e.g. a
+    month for the VAT return. Returns the period totals shaped like
+    get_z_report_data(), with "first_date"/"last_date" in the window, plus
+    "days": one get_z_report_data()-shaped dict (and "business_date") per date.
+
+    Three statements over the sales_rollup tables answer every day and the
+    totals at once, however long the period.
+    """
+    cutoff_hour = int(cutoff_hour)
+    if last_date < first_date:
+        raise ValueError(f"Z-report range {first_date}..{last_date} is reversed")
+    start_ts = _business_window(first_date, cutoff_hour)[0]
+    end_ts = _business_window(last_date, cutoff_hour)[1]
+    params = {
+        "first": first_date,
+        "last": last_date,
+        "start": start_ts,
+        "end": end_ts,
+        "shift": f"-{cutoff_hour} hours",
+    }
+
+    conn = _connect()
+    try:
+        conn.execute("BEGIN")  # sales and tenders from one snapshot
+        rate_rows = query_all("z.sales_by_rate", params, conn=conn)
+        count_rows = query_all("z.sales_totals", params, conn=conn)
+        tender_rows = query_all("z.tenders", params, conn=conn)
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    # Rows are keyed by business date; None holds the period totals
+    rates, tenders = defaultdict(list), defaultdict(list)
+    for day, *row in rate_rows:
+        rates[day].append(row)
+    for day, *row in tender_rows:
+        tenders[day].append(row)
+    counts = {day: row for day, *row in count_rows}
+
+    days = []
+    day = datetime.strptime(first_date, "%Y-%m-%d")
+    while (business_date := day.strftime("%Y-%m-%d")) <= last_date:
+        day_start, day_end = _business_window(business_date, cutoff_hour)
+        days.append(
+            {
+                "business_date": business_date,
+                "window": {
+                    "start_ts": day_start,
+                    "end_ts": day_end,
+                    "cutoff_hour": cutoff_hour,
+                },
+                "sales": _sales_section(
+                    rates[business_date], counts.get(business_date)
+                ),
+                "tenders": _tender_section(tenders[business_date]),
+            }
+        )
+        day += timedelta(days=1)
 
     return {
         "window": {
             "start_ts": start_ts,
             "end_ts": end_ts,
-            "cutoff_hour": int(cutoff_hour),
+            "cutoff_hour": cutoff_hour,
+            "first_date": first_date,
+            "last_date": last_date,
         },
-        "sales": {
-            "invoice_count": int(inv_count or 0),
-            "gross_sales": float(gross_sales or 0.0),
-            "tax_collected": float(totals["vat"]),
-            "by_rate": by_rate,
-            "totals": totals,
-        },
-        "tenders": {"by_method": tenders, "net_total": net_total},
+        "sales": _sales_section(rates[None], counts.get(None)),
+        "tenders": _tender_section(tenders[None]),
+        "days": days,
     }
 
 
-# ---------- PDF export ----------
-# â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â
-# Helper: find logo in a few common spots
-# â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â
-def _find_logo_path():
-    import os
-
-    here = os.path.dirname(__file__)
-    candidates = [
-        os.path.join(here, "pet_wellness_logo.png"),
-        os.path.join(here, "logo.png"),
-        os.path.join(os.path.dirname(here), "pet_wellness_logo.png"),
-        os.path.join(os.path.dirname(here), "logo.png"),
-    ]
-    for p in candidates:
-        if os.path.exists(p):
-            return p
-    return None
+def get_z_report_data(business_date: str, cutoff_hour: int = 0):
+    """
+    Returns:
+      {
+        "business_date": str,
+        "window": {"start_ts","end_ts","cutoff_hour"},
+        "sales":  {"invoice_count","gross_sales","tax_collected",
+                   "by_rate":[{"rate","net","vat","gross"}...],
+                   "totals":{"net","vat","gross"}},
+        "tenders": {"by_method":[{"method","payments_total","refunds_total"}...],
+                    "net_total": float},
+      }
+    Read from the sales_rollup tables: a few primary-key rows per call. Use
+    `python sales_rollup.py --verify` to check them against the raw rows.
+    """
+    return get_z_report_range(business_date, business_date, cutoff_hour)["days"][0]
+
+
+def _z_report_for(business_date, cutoff_hour, last_date=None):
+    """(data, period label) for the exporters: one day, or a period with "days"."""
+    if last_date and last_date != business_date:
+        data = get_z_report_range(business_date, last_date, cutoff_hour)
+        return data, f"{business_date} → {last_date}"
+    return get_z_report_data(business_date, cutoff_hour), business_date
 
 
+# ---------- PDF export ----------
+
 # â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â
 # Export Z-Report → PDF (with header, logo, section titles, table headers)
 # â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â â
-def export_z_report_pdf(parent, business_date: str, cutoff_hour: int = 0):
+def export_z_report_pdf(
+    parent, business_date: str, cutoff_hour: int = 0, last_date: str | None = None
+):
+    """One business day, or business_date..last_date with a daily breakdown."""
     from datetime import datetime
 
     from PySide6.QtWidgets import QFileDialog, QMessageBox
     from reportlab.lib import colors
     from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
     from reportlab.lib.units import mm
     from reportlab.platypus import (
-        Image,
         Paragraph,
         SimpleDocTemplate,
         Spacer,
@@ -221,14 +199,16 @@ def export_z_report_pdf(parent, business_date: str, cutoff_hour: int = 0):
         TableStyle,
     )
 
-    # Pull business-day data
-    data = get_z_report_data(business_date, cutoff_hour)
+    from render_assets import logo_flowable, paragraph_style, stylesheet
+
+    # Pull business-day (or period) data
+    data, period = _z_report_for(business_date, cutoff_hour, last_date)
     sales = data["sales"]
     tend = data["tenders"]
     win = data["window"]
 
     # Save-as path
-    default_name = f"Z_Report_{business_date}.pdf"
+    default_name = f"Z_Report_{period.replace(' → ', '_')}.pdf"
     path, _ = QFileDialog.getSaveFileName(
         parent, "Save Z-Report (PDF)", default_name, "PDF Files (*.pdf)"
     )
@@ -236,14 +216,10 @@ def export_z_report_pdf(parent, business_date: str, cutoff_hour: int = 0):
         return
 
     # Styles
-    styles = getSampleStyleSheet()
-    H1 = ParagraphStyle(
-        "H1", parent=styles["Heading1"], fontSize=16, leading=18, spaceAfter=8
-    )
-    H2 = ParagraphStyle(
-        "H2", parent=styles["Heading2"], fontSize=13, leading=15, spaceAfter=6
-    )
-    SMALL = ParagraphStyle("SMALL", parent=styles["Normal"], fontSize=9, leading=11)
+    styles = stylesheet()
+    H1 = paragraph_style("H1", "Heading1", fontSize=16, leading=18, spaceAfter=8)
+    H2 = paragraph_style("H2", "Heading2", fontSize=13, leading=15, spaceAfter=6)
+    SMALL = paragraph_style("SMALL", fontSize=9, leading=11)
     NORMAL = styles["Normal"]
 
     doc = SimpleDocTemplate(
@@ -265,8 +241,8 @@ def export_z_report_pdf(parent, business_date: str, cutoff_hour: int = 0):
         Paragraph("Email: contact@petwellnessvets.com", SMALL),
         Paragraph("VAT / Tax ID: 60118644C", SMALL),
     ]
-    logo_fp = _find_logo_path()
-    logo_cell = [Image(logo_fp, width=35 * mm, height=18 * mm)] if logo_fp else []
+    logo = logo_flowable(35 * mm, 18 * mm)
+    logo_cell = [logo] if logo else []
     header_tbl = Table([[clinic_left, logo_cell]], colWidths=[120 * mm, 49 * mm])
     header_tbl.setStyle(
         TableStyle(
@@ -284,7 +260,8 @@ def export_z_report_pdf(parent, business_date: str, cutoff_hour: int = 0):
             [
                 Paragraph("<b>Z-REPORT</b>", styles["Title"]),
                 Paragraph(
-                    f"<b>Business Date:</b> {business_date}<br/>"
+                    f"<b>{'Period' if 'days' in data else 'Business Date'}:</b>"
+                    f" {period}<br/>"
                     f"<b>Cutoff Hour:</b> {cutoff_hour}<br/>"
                     f"<b>Window:</b> {win['start_ts']} → {win['end_ts']}",
                     SMALL,
@@ -387,6 +364,35 @@ def export_z_report_pdf(parent, business_date: str, cutoff_hour: int = 0):
     )
     elems += [v_tbl, Spacer(1, 10 * mm)]
 
+    # Daily breakdown (period reports)
+    if "days" in data:
+        elems += [Paragraph("DAILY BREAKDOWN", H2)]
+        day_rows = [["Date", "Invoices", "Net", "VAT", "Gross", "Tenders net"]]
+        for day in data["days"]:
+            t = day["sales"]["totals"]
+            day_rows.append(
+                [
+                    day["business_date"],
+                    str(day["sales"]["invoice_count"]),
+                    f"€{t['net']:.2f}",
+                    f"€{t['vat']:.2f}",
+                    f"€{t['gross']:.2f}",
+                    f"€{day['tenders']['net_total']:.2f}",
+                ]
+            )
+        d_tbl = Table(day_rows, colWidths=[30 * mm, 20 * mm] + [29.75 * mm] * 4)
+        d_tbl.setStyle(
+            TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f0f0f0")),
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#c8c8c8")),
+                    ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+                ]
+            )
+        )
+        elems += [d_tbl, Spacer(1, 10 * mm)]
+
     # Footer
     elems += [Paragraph(f"Generated at: {datetime.now():%Y-%m-%d %H:%M:%S}", SMALL)]
 
@@ -397,12 +403,15 @@ def export_z_report_pdf(parent, business_date: str, cutoff_hour: int = 0):
 
 
 # ---------- Excel export (single-sheet Z_REPORT) ----------
-def export_z_report_excel(parent, business_date: str, cutoff_hour: int = 0):
+def export_z_report_excel(
+    parent, business_date: str, cutoff_hour: int = 0, last_date: str | None = None
+):
+    """One business day, or business_date..last_date with DAILY / DAILY_VAT sheets."""
     from openpyxl import Workbook
     from openpyxl.styles import Alignment, Font
     from PySide6.QtWidgets import QFileDialog, QMessageBox
 
-    data = get_z_report_data(business_date, cutoff_hour)
+    data, period = _z_report_for(business_date, cutoff_hour, last_date)
     sales = data["sales"]
     tend = data["tenders"]
     win = data["window"]
@@ -434,8 +443,8 @@ def export_z_report_excel(parent, business_date: str, cutoff_hour: int = 0):
         ws.cell(r, 2, v)
         r += 1
 
-    ws.cell(r, 1, "Business Date")
-    ws.cell(r, 2, business_date)
+    ws.cell(r, 1, "Period" if "days" in data else "Business Date")
+    ws.cell(r, 2, period)
     r += 1
     ws.cell(r, 1, "Cutoff Hour (0–23)")
     ws.cell(r, 2, cutoff_hour)
@@ -538,8 +547,41 @@ def export_z_report_excel(parent, business_date: str, cutoff_hour: int = 0):
     for col in ("E", "F", "G"):
         ws.column_dimensions[col].width = 18
 
+    # Period reports: one row per business date, and per date and VAT rate
+    if "days" in data:
+        ws_days = wb.create_sheet("DAILY")
+        ws_days.append(["Date", "Invoices", "Net", "VAT", "Gross", "Tenders net"])
+        ws_vat = wb.create_sheet("DAILY_VAT")
+        ws_vat.append(["Date", "Rate", "Net taxable", "VAT amount", "Gross"])
+        for sheet in (ws_days, ws_vat):
+            for cell in sheet[1]:
+                cell.font = B
+            sheet.column_dimensions["A"].width = 14
+        for day in data["days"]:
+            t = day["sales"]["totals"]
+            ws_days.append(
+                [
+                    day["business_date"],
+                    day["sales"]["invoice_count"],
+                    t["net"],
+                    t["vat"],
+                    t["gross"],
+                    day["tenders"]["net_total"],
+                ]
+            )
+            for row in day["sales"]["by_rate"]:
+                ws_vat.append(
+                    [
+                        day["business_date"],
+                        f"{row['rate']}%",
+                        row["net"],
+                        row["vat"],
+                        row["gross"],
+                    ]
+                )
+
     # save
-    default = f"Z_Report_{business_date}.xlsx"
+    default = f"Z_Report_{period.replace(' → ', '_')}.xlsx"
     path, _ = QFileDialog.getSaveFileName(
         parent, "Save Z-Report (Excel)", default, "Excel Files (*.xlsx)"
     )
@@ -561,6 +603,15 @@ class ZReportWidget(QWidget):
         self.date_edit.setDisplayFormat("yyyy-MM-dd")
         self.date_edit.setCalendarPopup(True)
 
+        # Range mode: business date .. "through" date (e.g. a month's VAT return)
+        self.range_chk = QCheckBox("Through:")
+        self.to_edit = QDateEdit(QDate.currentDate())
+        self.to_edit.setDisplayFormat("yyyy-MM-dd")
+        self.to_edit.setCalendarPopup(True)
+        self.to_edit.setMinimumDate(self.date_edit.date())
+        self.to_edit.setEnabled(False)
+        self.mtd_btn = QPushButton("Month to date")
+
         self.cutoff_spin = QSpinBox()
         self.cutoff_spin.setRange(0, 23)
         self.cutoff_spin.setValue(0)  # default cutoff 00:00–24:00
@@ -572,6 +623,9 @@ class ZReportWidget(QWidget):
 
         ctl.addWidget(QLabel("Business date:"))
         ctl.addWidget(self.date_edit)
+        ctl.addWidget(self.range_chk)
+        ctl.addWidget(self.to_edit)
+        ctl.addWidget(self.mtd_btn)
         ctl.addSpacing(12)
         ctl.addWidget(QLabel("Cutoff:"))
         ctl.addWidget(self.cutoff_spin)
@@ -614,8 +668,14 @@ class ZReportWidget(QWidget):
         self.pdf_btn.clicked.connect(self.export_pdf)
         self.xlsx_btn.clicked.connect(self.export_xlsx)
 
-        # Auto-refresh when date or cutoff changes
+        self.mtd_btn.clicked.connect(self.month_to_date)
+        self.date_edit.dateChanged.connect(self.to_edit.setMinimumDate)
+        self.range_chk.toggled.connect(self.to_edit.setEnabled)
+
+        # Auto-refresh when date, range or cutoff changes
         self.date_edit.dateChanged.connect(lambda _d: self.refresh())
+        self.to_edit.dateChanged.connect(lambda _d: self.refresh())
+        self.range_chk.toggled.connect(lambda _on: self.refresh())
         self.cutoff_spin.valueChanged.connect(lambda _v: self.refresh())
 
         # Initial load
@@ -626,11 +686,23 @@ class ZReportWidget(QWidget):
     def _date_str(self) -> str:
         return self.date_edit.date().toString("yyyy-MM-dd")
 
+    def _last_date_str(self) -> str | None:
+        """End of the period in range mode, else None (single business day)."""
+        if not self.range_chk.isChecked():
+            return None
+        return self.to_edit.date().toString("yyyy-MM-dd")
+
+    def month_to_date(self):
+        today = QDate.currentDate()
+        self.date_edit.setDate(QDate(today.year(), today.month(), 1))
+        self.to_edit.setDate(today)
+        self.range_chk.setChecked(True)
+
     def refresh(self):
-        # pull data with cutoff
-        business_date = self._date_str()
-        cutoff = self.cutoff_spin.value()
-        data = get_z_report_data(business_date, cutoff)
+        # pull data with cutoff (period totals in range mode)
+        data, _period = _z_report_for(
+            self._date_str(), self.cutoff_spin.value(), self._last_date_str()
+        )
 
         sales = data.get("sales", {})
         tenders = data.get("tenders", {})
@@ -706,7 +778,11 @@ class ZReportWidget(QWidget):
             self.pay_tbl.setItem(row, 2, QTableWidgetItem(f"{float(refunds):.2f}"))
 
     def export_pdf(self):
-        export_z_report_pdf(self, self._date_str(), self.cutoff_spin.value())
+        export_z_report_pdf(
+            self, self._date_str(), self.cutoff_spin.value(), self._last_date_str()
+        )
 
     def export_xlsx(self):
-        export_z_report_excel(self, self._date_str(), self.cutoff_spin.value())
+        export_z_report_excel(
+            self, self._date_str(), self.cutoff_spin.value(), self._last_date_str()
+        )
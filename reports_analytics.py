@@ -3,11 +3,7 @@ import sqlite3
 from datetime import datetime
 from io import BytesIO
 
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-from PIL import Image
-from PySide6.QtCore import QDate
+from PySide6.QtCore import QDate, QObject, QRunnable, QThreadPool, Signal
 from PySide6.QtWidgets import (
     QDateEdit,
     QFileDialog,
@@ -22,13 +18,65 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QWidget,
 )
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas as pdf_canvas
 
-from db import connect as _connect
+import analytics_data
+from analytics_charts import ChartCache
+from logger import log_error
+
+WEEKDAYS = (
+    "Sunday",
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+)
+
+
+def _new_pdf(path: str):
+    """(ReportLab canvas, width, height) for an A4 export; imports on first use."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas as pdf_canvas
+
+    width, height = A4
+    return pdf_canvas.Canvas(path, pagesize=A4), width, height
+
+
+# --- Off-GUI-thread analytics queries ---
+class _FetchSignals(QObject):
+    done = Signal(str, object, object)  # tab, (report, start, end), rows
+    failed = Signal(str, object, str)  # tab, (report, start, end), message
+
+
+class _FetchJob(QRunnable):
+    """analytics_data.fetch() on a pool thread; results come back as signals."""
+
+    def __init__(self, tab: str, key: tuple):
+        super().__init__()
+        self.setAutoDelete(False)  # the screen keeps a reference until done
+        self.tab = tab
+        self.key = key
+        self.signals = _FetchSignals()
+
+    def run(self):
+        try:
+            rows = analytics_data.fetch(*self.key)
+        except Exception as e:
+            log_error(f"Analytics query {self.key} failed: {e}")
+            self.signals.failed.emit(self.tab, self.key, str(e))
+            return
+        self.signals.done.emit(self.tab, self.key, rows)
 
 
 class ReportsAnalyticsScreen(QWidget):
+    """
+    Tabs load on first show, not at construction: each one's query runs on a
+    worker thread and the chart is drawn when the rows arrive. Showing a tab
+    again re-asks analytics_data, which answers from its cache unless invoices
+    or appointments were written since, and redraws only if the rows changed.
+    """
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Reports & Analytics")
@@ -39,15 +87,136 @@ class ReportsAnalyticsScreen(QWidget):
         self.end_date = QDateEdit(QDate.currentDate())
         self.end_date.setCalendarPopup(True)
 
-        tabs = QTabWidget()
-        tabs.addTab(self.revenue_by_month_tab(), "Revenue by Month")
-        tabs.addTab(self.unpaid_invoices_tab(), "Unpaid Invoices")
-        tabs.addTab(self.appointments_by_species_tab(), "Appointments by Species")
-        tabs.addTab(self.top_items_tab(), "Top Medications/Items")
-        tabs.addTab(self.busiest_days_tab(), "Busiest Days/Times")
-        tabs.addTab(self.appointments_by_vet_tab(), "Appointments by Vet")
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(2)
+        self._jobs = {}  # tab -> running _FetchJob (at most one per tab)
+        self._wanted = {}  # tab -> latest requested (report, start, end)
+        self._shown = {}  # tab -> (key, rows) currently drawn
+        self._charts = ChartCache()  # figures + export PNGs, shared by screen and PDF
+        self._canvases = {}  # tab -> FigureCanvas, created on first draw
+        self._errors = {}  # tab -> QLabel showing its last failed load
+
+        # Tab ids in tab order; loaders request the rows, drawers render them
+        self._tab_ids = ["revenue", "unpaid", "species", "top_items", "busiest", "vet"]
+        self._loaders = {
+            "revenue": self.load_revenue_chart,
+            "unpaid": self.load_unpaid_table,
+            "species": self.load_species_chart,
+            "top_items": self.load_top_items_chart,
+            "busiest": self.load_busiest_days_chart,
+            "vet": self.load_vet_chart,
+        }
+        self._drawers = {
+            "revenue": self._draw_revenue_chart,
+            "unpaid": self._fill_unpaid_table,
+            "species": self._draw_species_chart,
+            "top_items": self._draw_top_items_chart,
+            "busiest": self._draw_busiest_days_chart,
+            "vet": self._draw_vet_chart,
+        }
+
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.revenue_by_month_tab(), "Revenue by Month")
+        self.tabs.addTab(self.unpaid_invoices_tab(), "Unpaid Invoices")
+        self.tabs.addTab(self.appointments_by_species_tab(), "Appointments by Species")
+        self.tabs.addTab(self.top_items_tab(), "Top Medications/Items")
+        self.tabs.addTab(self.busiest_days_tab(), "Busiest Days/Times")
+        self.tabs.addTab(self.appointments_by_vet_tab(), "Appointments by Vet")
+        self.tabs.currentChanged.connect(self._load_tab)
+
+        layout.addWidget(self.tabs)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._load_tab(self.tabs.currentIndex())
+
+    def _load_tab(self, index: int):
+        if self.isVisible() and 0 <= index < len(self._tab_ids):
+            self._loaders[self._tab_ids[index]]()
+
+    @staticmethod
+    def _range(start_edit, end_edit):
+        return (
+            start_edit.date().toString("yyyy-MM-dd"),
+            end_edit.date().toString("yyyy-MM-dd"),
+        )
+
+    def _request(self, tab: str, report: str, start=None, end=None):
+        key = (report, start, end)
+        self._wanted[tab] = key
+        if tab in self._jobs:  # the newest key is re-requested when it finishes
+            return
+        job = _FetchJob(tab, key)
+        job.signals.done.connect(self._on_fetched)
+        job.signals.failed.connect(self._on_fetch_failed)
+        self._jobs[tab] = job
+        self._pool.start(job)
+
+    def _on_fetched(self, tab: str, key: tuple, rows):
+        self._jobs.pop(tab, None)
+        if self._wanted.get(tab) != key:  # filter changed while it ran
+            self._request(tab, *self._wanted[tab])
+            return
+        self._set_error(tab, None)
+        if self._shown.get(tab) == (key, rows):
+            return
+        self._shown[tab] = (key, rows)
+        self._drawers[tab](rows)
+
+    def _show_chart(self, tab: str, holder, labels, values):
+        """Draw into the tab's reused Figure; its canvas is created only once."""
+        fig = self._charts.figure(tab, labels, values)
+        canvas = self._canvases.get(tab)
+        if canvas is None:
+            from matplotlib.backends.backend_qt5agg import (
+                FigureCanvasQTAgg as FigureCanvas,
+            )
+
+            canvas = self._canvases[tab] = FigureCanvas(fig)
+            holder.addWidget(canvas)
+        else:
+            canvas.draw_idle()
+        return fig
+
+    def _chart_image(self, tab: str, labels, values):
+        """Export PNG of the tab's chart (cached per range + data) for ReportLab."""
+        from reportlab.lib.utils import ImageReader
 
-        layout.addWidget(tabs)
+        _report, start, end = self._shown[tab][0]
+        return ImageReader(BytesIO(self._charts.png(tab, labels, values, start, end)))
+
+    def _on_fetch_failed(self, tab: str, key: tuple, message: str):
+        self._jobs.pop(tab, None)
+        if self._wanted.get(tab) != key:  # filter changed while it ran
+            self._request(tab, *self._wanted[tab])
+            return
+        self._set_error(tab, message)
+
+    def _set_error(self, tab: str, message: str | None):
+        """
+        Show (or, with None, clear) a failed load in the tab itself. Whatever
+        was drawn belongs to another range, so it is hidden until the next load.
+        """
+        label = self._errors.get(tab)
+        if label is None:
+            if message is None:
+                return
+            label = self._errors[tab] = QLabel()
+            label.setWordWrap(True)
+            label.setStyleSheet("color:#b91c1c;")
+            self.tabs.widget(self._tab_ids.index(tab)).layout().insertWidget(0, label)
+        if message is not None:
+            label.setText(
+                f"Could not load this report: {message}\n"
+                "Change the dates or open the tab again to retry."
+            )
+            self._shown.pop(tab, None)
+            if tab == "unpaid":
+                self.unpaid_table.setRowCount(0)
+        label.setVisible(message is not None)
+        canvas = self._canvases.get(tab)
+        if canvas is not None:
+            canvas.setVisible(message is None)
 
     def revenue_by_month_tab(self):
         widget = QWidget()
@@ -79,49 +248,17 @@ class ReportsAnalyticsScreen(QWidget):
         export_btn.clicked.connect(self.export_revenue_pdf)
         layout.addWidget(export_btn)
 
-        self.load_revenue_chart(layout)
         return widget
 
-    def load_revenue_chart(self, layout):
-        for i in reversed(range(self.revenue_canvas_holder.count())):
-            widget_to_remove = self.revenue_canvas_holder.itemAt(i).widget()
-            if widget_to_remove:
-                widget_to_remove.setParent(None)
-
-        fig = Figure(figsize=(6, 4))
-        canvas = FigureCanvas(fig)
-        ax = fig.add_subplot(111)
-
-        conn = _connect()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT strftime('%Y-%m', created_at) AS month, SUM(final_amount)
-            FROM invoices
-            WHERE DATE(created_at) BETWEEN DATE(?) AND DATE(?)
-            GROUP BY month
-            ORDER BY month
-        """,
-            (
-                self.revenue_start_date.date().toString("yyyy-MM-dd"),
-                self.revenue_end_date.date().toString("yyyy-MM-dd"),
-            ),
-        )
-        data = cursor.fetchall()
-        conn.close()
-
-        if data:
-            months, totals = zip(*data)
-            ax.bar(months, totals)
-            ax.set_title("Revenue by Month")
-            ax.set_ylabel("€")
-            ax.set_xlabel("Month")
-            ax.tick_params(axis="x", rotation=45)
-        else:
-            ax.text(0.5, 0.5, "No data", ha="center")
+    def load_revenue_chart(self, layout=None):
+        start, end = self._range(self.revenue_start_date, self.revenue_end_date)
+        self._request("revenue", "revenue_by_month", start, end)
 
-        self.revenue_canvas_holder.addWidget(canvas)
-        self.revenue_figure = fig
+    def _draw_revenue_chart(self, data):
+        months, totals = zip(*data) if data else ((), ())
+        self.revenue_figure = self._show_chart(
+            "revenue", self.revenue_canvas_holder, months, totals
+        )
         self.revenue_data = data
 
     def export_revenue_pdf(self):
@@ -135,25 +272,10 @@ class ReportsAnalyticsScreen(QWidget):
         if not path:
             return
 
-        # Create a fresh figure for export
-        export_fig = Figure(figsize=(6, 3.5))
-        ax = export_fig.add_subplot(111)
-
         months, totals = zip(*self.revenue_data)
-        ax.bar(months, totals)
-        ax.set_title("Revenue by Month")
-        ax.set_ylabel("€")
-        ax.set_xlabel("Month")
-        ax.tick_params(axis="x", rotation=45)
-        export_fig.tight_layout()
-
-        buf = BytesIO()
-        export_fig.savefig(buf, format="png", dpi=100)
-        buf.seek(0)
-        chart_image = Image.open(buf)
-
-        pdf = pdf_canvas.Canvas(path, pagesize=A4)
-        width, height = A4
+        chart_image = self._chart_image("revenue", months, totals)
+
+        pdf, width, height = _new_pdf(path)
         pdf.setTitle("Revenue Report")
 
         pdf.setFont("Helvetica-Bold", 16)
@@ -168,7 +290,7 @@ class ReportsAnalyticsScreen(QWidget):
         )
         pdf.drawString(50, height - 85, date_range)
 
-        pdf.drawInlineImage(chart_image, 50, height - 400, width=500, height=250)
+        pdf.drawImage(chart_image, 50, height - 400, width=500, height=250)
 
         y = height - 420
         total_revenue = 0
@@ -195,30 +317,6 @@ class ReportsAnalyticsScreen(QWidget):
         )
         self.unpaid_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
-        conn = _connect()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT i.invoice_id, i.appointment_id, p.name,
-                   (i.final_amount - IFNULL((SELECT SUM(amount_paid) FROM payment_history WHERE invoice_id = i.invoice_id), 0)) AS due,
-                   i.created_at
-            FROM invoices i
-            JOIN appointments a ON i.appointment_id = a.appointment_id
-            JOIN patients p ON a.patient_id = p.patient_id
-            WHERE i.payment_status != 'Paid'
-        """
-        )
-        rows = cursor.fetchall()
-        conn.close()
-
-        self.unpaid_table.setRowCount(len(rows))
-        for r_idx, row in enumerate(rows):
-            for c_idx, val in enumerate(row):
-                item = QTableWidgetItem(
-                    f"{val:.2f}" if isinstance(val, float) else str(val)
-                )
-                self.unpaid_table.setItem(r_idx, c_idx, item)
-
         layout.addWidget(QLabel("Unpaid or Partially Paid Invoices"))
         layout.addWidget(self.unpaid_table)
 
@@ -228,6 +326,18 @@ class ReportsAnalyticsScreen(QWidget):
 
         return widget
 
+    def load_unpaid_table(self):
+        self._request("unpaid", "unpaid_invoices")
+
+    def _fill_unpaid_table(self, rows):
+        self.unpaid_table.setRowCount(len(rows))
+        for r_idx, row in enumerate(rows):
+            for c_idx, val in enumerate(row):
+                item = QTableWidgetItem(
+                    f"{val:.2f}" if isinstance(val, float) else str(val)
+                )
+                self.unpaid_table.setItem(r_idx, c_idx, item)
+
     def export_unpaid_csv(self):
         path, _ = QFileDialog.getSaveFileName(
             self, "Save CSV", "unpaid_invoices.csv", "CSV Files (*.csv)"
@@ -279,46 +389,17 @@ class ReportsAnalyticsScreen(QWidget):
         export_btn.clicked.connect(self.export_species_pdf)
         layout.addWidget(export_btn)
 
-        self.load_species_chart(layout)
         return widget
 
-    def load_species_chart(self, layout):
-        for i in reversed(range(self.species_canvas_holder.count())):
-            widget_to_remove = self.species_canvas_holder.itemAt(i).widget()
-            if widget_to_remove:
-                widget_to_remove.setParent(None)
-
-        fig = Figure(figsize=(6, 4))
-        canvas = FigureCanvas(fig)
-        ax = fig.add_subplot(111)
-
-        conn = _connect()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT p.species, COUNT(*)
-            FROM appointments a
-            JOIN patients p ON a.patient_id = p.patient_id
-            WHERE DATE(a.date_time) BETWEEN DATE(?) AND DATE(?)
-            GROUP BY p.species
-        """,
-            (
-                self.species_start_date.date().toString("yyyy-MM-dd"),
-                self.species_end_date.date().toString("yyyy-MM-dd"),
-            ),
-        )
-        data = cursor.fetchall()
-        conn.close()
-
-        if data:
-            species, counts = zip(*data)
-            ax.pie(counts, labels=species, autopct="%1.1f%%", startangle=140)
-            ax.set_title("Appointments by Species")
-        else:
-            ax.text(0.5, 0.5, "No data", ha="center")
+    def load_species_chart(self, layout=None):
+        start, end = self._range(self.species_start_date, self.species_end_date)
+        self._request("species", "appointments_by_species", start, end)
 
-        self.species_canvas_holder.addWidget(canvas)
-        self.species_figure = fig
+    def _draw_species_chart(self, data):
+        species, counts = zip(*data) if data else ((), ())
+        self.species_figure = self._show_chart(
+            "species", self.species_canvas_holder, species, counts
+        )
         self.species_data = data
 
     def export_species_pdf(self):
@@ -332,22 +413,10 @@ class ReportsAnalyticsScreen(QWidget):
         if not path:
             return
 
-        # Re-render chart to avoid resizing the in-app figure
-        export_fig = Figure(figsize=(6, 3.5))
-        ax = export_fig.add_subplot(111)
-
         species, counts = zip(*self.species_data)
-        ax.pie(counts, labels=species, autopct="%1.1f%%", startangle=140)
-        ax.set_title("Appointments by Species")
-        export_fig.tight_layout()
+        chart_image = self._chart_image("species", species, counts)
 
-        buf = BytesIO()
-        export_fig.savefig(buf, format="png", dpi=100)
-        buf.seek(0)
-        chart_image = Image.open(buf)
-
-        pdf = pdf_canvas.Canvas(path, pagesize=A4)
-        width, height = A4
+        pdf, width, height = _new_pdf(path)
         pdf.setTitle("Species Report")
 
         pdf.setFont("Helvetica-Bold", 16)
@@ -362,7 +431,7 @@ class ReportsAnalyticsScreen(QWidget):
         )
         pdf.drawString(50, height - 85, date_range)
 
-        pdf.drawInlineImage(chart_image, 50, height - 400, width=500, height=250)
+        pdf.drawImage(chart_image, 50, height - 400, width=500, height=250)
 
         y = height - 420
         pdf.setFont("Helvetica", 10)
@@ -403,50 +472,17 @@ class ReportsAnalyticsScreen(QWidget):
         export_btn.clicked.connect(self.export_top_items_pdf)
         layout.addWidget(export_btn)
 
-        self.load_top_items_chart(layout)
         return widget
 
-    def load_top_items_chart(self, layout):
-        for i in reversed(range(self.top_items_canvas_holder.count())):
-            widget_to_remove = self.top_items_canvas_holder.itemAt(i).widget()
-            if widget_to_remove:
-                widget_to_remove.setParent(None)
-
-        fig = Figure(figsize=(6, 4))
-        canvas = FigureCanvas(fig)
-        ax = fig.add_subplot(111)
-
-        conn = _connect()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT ii.description, SUM(ii.quantity) as total_sold
-            FROM invoice_items ii
-            JOIN invoices i ON i.invoice_id = ii.invoice_id
-            WHERE DATE(i.created_at) BETWEEN DATE(?) AND DATE(?)
-            GROUP BY ii.description
-            ORDER BY total_sold DESC
-            LIMIT 10
-        """,
-            (
-                self.items_start_date.date().toString("yyyy-MM-dd"),
-                self.items_end_date.date().toString("yyyy-MM-dd"),
-            ),
-        )
-        data = cursor.fetchall()
-        conn.close()
-
-        if data:
-            items, counts = zip(*data)
-            ax.barh(items, counts)
-            ax.set_title("Top-Selling Medications/Items")
-            ax.set_xlabel("Units Sold")
-            ax.invert_yaxis()
-        else:
-            ax.text(0.5, 0.5, "No data", ha="center")
+    def load_top_items_chart(self, layout=None):
+        start, end = self._range(self.items_start_date, self.items_end_date)
+        self._request("top_items", "top_items", start, end)
 
-        self.top_items_canvas_holder.addWidget(canvas)
-        self.top_items_figure = fig
+    def _draw_top_items_chart(self, data):
+        items, counts = zip(*data) if data else ((), ())
+        self.top_items_figure = self._show_chart(
+            "top_items", self.top_items_canvas_holder, items, counts
+        )
         self.top_items_data = data
 
     def export_top_items_pdf(self):
@@ -460,24 +496,10 @@ class ReportsAnalyticsScreen(QWidget):
         if not path:
             return
 
-        # Re-render chart into separate export figure
-        export_fig = Figure(figsize=(6, 3.5))
-        ax = export_fig.add_subplot(111)
-
         items, counts = zip(*self.top_items_data)
-        ax.barh(items, counts)
-        ax.set_title("Top-Selling Medications/Items")
-        ax.set_xlabel("Units Sold")
-        ax.invert_yaxis()
-        export_fig.tight_layout()
-
-        buf = BytesIO()
-        export_fig.savefig(buf, format="png", dpi=100)
-        buf.seek(0)
-        chart_image = Image.open(buf)
-
-        pdf = pdf_canvas.Canvas(path, pagesize=A4)
-        width, height = A4
+        chart_image = self._chart_image("top_items", items, counts)
+
+        pdf, width, height = _new_pdf(path)
         pdf.setTitle("Top Items Report")
 
         pdf.setFont("Helvetica-Bold", 16)
@@ -492,7 +514,7 @@ class ReportsAnalyticsScreen(QWidget):
         )
         pdf.drawString(50, height - 85, date_range)
 
-        pdf.drawInlineImage(chart_image, 50, height - 400, width=500, height=250)
+        pdf.drawImage(chart_image, 50, height - 400, width=500, height=250)
 
         y = height - 420
         pdf.setFont("Helvetica", 10)
@@ -533,57 +555,20 @@ class ReportsAnalyticsScreen(QWidget):
         export_btn.clicked.connect(self.export_busiest_days_pdf)
         layout.addWidget(export_btn)
 
-        self.load_busiest_days_chart(layout)
         return widget
 
-    def load_busiest_days_chart(self, layout):
-        for i in reversed(range(self.busiest_canvas_holder.count())):
-            widget_to_remove = self.busiest_canvas_holder.itemAt(i).widget()
-            if widget_to_remove:
-                widget_to_remove.setParent(None)
-
-        fig = Figure(figsize=(6, 4))
-        canvas = FigureCanvas(fig)
-        ax = fig.add_subplot(111)
-
-        conn = _connect()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT strftime('%w', date_time) AS weekday, COUNT(*)
-            FROM appointments
-            WHERE DATE(date_time) BETWEEN DATE(?) AND DATE(?)
-            GROUP BY weekday
-        """,
-            (
-                self.busiest_start_date.date().toString("yyyy-MM-dd"),
-                self.busiest_end_date.date().toString("yyyy-MM-dd"),
-            ),
-        )
-        data = cursor.fetchall()
-        conn.close()
-
-        days = [
-            "Sunday",
-            "Monday",
-            "Tuesday",
-            "Wednesday",
-            "Thursday",
-            "Friday",
-            "Saturday",
-        ]
+    def load_busiest_days_chart(self, layout=None):
+        start, end = self._range(self.busiest_start_date, self.busiest_end_date)
+        self._request("busiest", "busiest_days", start, end)
+
+    def _draw_busiest_days_chart(self, data):
         counts = [0] * 7
         for weekday, count in data:
             counts[int(weekday)] = count
 
-        ax.bar(days, counts)
-        ax.set_title("Appointments by Day of Week")
-        ax.set_ylabel("Number of Appointments")
-        ax.set_xticks(range(len(days)))
-        ax.set_xticklabels(days, rotation=45)
-
-        self.busiest_canvas_holder.addWidget(canvas)
-        self.busiest_figure = fig
+        self.busiest_figure = self._show_chart(
+            "busiest", self.busiest_canvas_holder, WEEKDAYS, counts
+        )
         self.busiest_data = counts
 
     def export_busiest_days_pdf(self):
@@ -597,33 +582,9 @@ class ReportsAnalyticsScreen(QWidget):
         if not path:
             return
 
-        # Re-render chart into new figure for PDF
-        export_fig = Figure(figsize=(6, 3.5))
-        ax = export_fig.add_subplot(111)
-
-        days = [
-            "Sunday",
-            "Monday",
-            "Tuesday",
-            "Wednesday",
-            "Thursday",
-            "Friday",
-            "Saturday",
-        ]
-        ax.bar(range(7), self.busiest_data)
-        ax.set_title("Appointments by Day of Week")
-        ax.set_ylabel("Number of Appointments")
-        ax.set_xticks(range(7))
-        ax.set_xticklabels(days, rotation=45)
-        export_fig.tight_layout()
-
-        buf = BytesIO()
-        export_fig.savefig(buf, format="png", dpi=100)
-        buf.seek(0)
-        chart_image = Image.open(buf)
-
-        pdf = pdf_canvas.Canvas(path, pagesize=A4)
-        width, height = A4
+        chart_image = self._chart_image("busiest", WEEKDAYS, self.busiest_data)
+
+        pdf, width, height = _new_pdf(path)
         pdf.setTitle("Busiest Days Report")
 
         pdf.setFont("Helvetica-Bold", 16)
@@ -638,12 +599,12 @@ class ReportsAnalyticsScreen(QWidget):
         )
         pdf.drawString(50, height - 85, date_range)
 
-        pdf.drawInlineImage(chart_image, 50, height - 400, width=500, height=250)
+        pdf.drawImage(chart_image, 50, height - 400, width=500, height=250)
 
         y = height - 420
         pdf.setFont("Helvetica", 10)
         for i, count in enumerate(self.busiest_data):
-            pdf.drawString(60, y, f"{days[i]}: {count} appointments")
+            pdf.drawString(60, y, f"{WEEKDAYS[i]}: {count} appointments")
             y -= 15
 
         pdf.save()
@@ -679,49 +640,15 @@ class ReportsAnalyticsScreen(QWidget):
         export_btn.clicked.connect(self.export_vet_pdf)
         layout.addWidget(export_btn)
 
-        self.load_vet_chart(layout)
         return widget
 
-    def load_vet_chart(self, layout):
-        for i in reversed(range(self.vet_canvas_holder.count())):
-            widget_to_remove = self.vet_canvas_holder.itemAt(i).widget()
-            if widget_to_remove:
-                widget_to_remove.setParent(None)
-
-        fig = Figure(figsize=(6, 4))
-        canvas = FigureCanvas(fig)
-        ax = fig.add_subplot(111)
-
-        conn = _connect()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT a.veterinarian, COUNT(*)
-            FROM appointments a
-            WHERE a.veterinarian IS NOT NULL AND a.veterinarian != ''
-              AND DATE(a.date_time) BETWEEN DATE(?) AND DATE(?)
-            GROUP BY a.veterinarian
-        """,
-            (
-                self.vet_start_date.date().toString("yyyy-MM-dd"),
-                self.vet_end_date.date().toString("yyyy-MM-dd"),
-            ),
-        )
-        data = cursor.fetchall()
-        conn.close()
-
-        if data:
-            vets, counts = zip(*data)
-            ax.bar(range(len(vets)), counts)
-            ax.set_title("Appointments by Veterinarian")
-            ax.set_ylabel("Appointments")
-            ax.set_xticks(range(len(vets)))
-            ax.set_xticklabels(vets, rotation=45)
-        else:
-            ax.text(0.5, 0.5, "No data", ha="center")
+    def load_vet_chart(self, layout=None):
+        start, end = self._range(self.vet_start_date, self.vet_end_date)
+        self._request("vet", "appointments_by_vet", start, end)
 
-        self.vet_canvas_holder.addWidget(canvas)
-        self.vet_figure = fig
+    def _draw_vet_chart(self, data):
+        vets, counts = zip(*data) if data else ((), ())
+        self.vet_figure = self._show_chart("vet", self.vet_canvas_holder, vets, counts)
         self.vet_data = data
 
     def export_vet_pdf(self):
@@ -735,25 +662,10 @@ class ReportsAnalyticsScreen(QWidget):
         if not path:
             return
 
-        # Re-render chart to buffer instead of modifying UI figure
-        export_fig = Figure(figsize=(6, 3.5))
-        ax = export_fig.add_subplot(111)
-
         vets, counts = zip(*self.vet_data)
-        ax.bar(range(len(vets)), counts)
-        ax.set_title("Appointments by Veterinarian")
-        ax.set_ylabel("Appointments")
-        ax.set_xticks(range(len(vets)))
-        ax.set_xticklabels(vets, rotation=45)
-        export_fig.tight_layout()
-
-        buf = BytesIO()
-        export_fig.savefig(buf, format="png", dpi=100)
-        buf.seek(0)
-        chart_image = Image.open(buf)
-
-        pdf = pdf_canvas.Canvas(path, pagesize=A4)
-        width, height = A4
+        chart_image = self._chart_image("vet", vets, counts)
+
+        pdf, width, height = _new_pdf(path)
         pdf.setTitle("Appointments by Vet Report")
 
         pdf.setFont("Helvetica-Bold", 16)
@@ -768,7 +680,7 @@ class ReportsAnalyticsScreen(QWidget):
         )
         pdf.drawString(50, height - 85, date_range)
 
-        pdf.drawInlineImage(chart_image, 50, height - 400, width=500, height=250)
+        pdf.drawImage(chart_image, 50, height - 400, width=500, height=250)
 
         y = height - 420
         pdf.setFont("Helvetica", 10)
@@ -0,0 +1,355 @@
+# sales_rollup.py
+"""
+Incremental Z-report rollups (schema v8).
+
+    daily_sales_rollup   (business_date, vat_rate) -> lines, net, vat, gross
+    daily_sales_totals   business_date -> invoice_count, gross_sales
+    tender_rollup        (pay_hour, method) -> payments_count, payments, refunds
+
+Triggers on invoices, invoice_items and payment_history apply every change as a
+delta, so reports.get_z_report_data reads a handful of rows instead of
+re-aggregating the day's invoices and payments. Sales follow DATE(invoice_date)
+for revenue-eligible INVOICE documents, with the invoice discount applied per
+line exactly as the old on-the-fly rollup did. Payments are bucketed by hour
+('YYYY-MM-DD HH:00:00') so any cutoff hour is a range over 24 buckets.
+
+Amounts are stored unrounded; readers round. verify() recomputes days from the
+raw rows and, with fix=True, rebuilds the ones that drifted:
+
+    python sales_rollup.py --verify [FROM TO] [--dry-run]
+    python sales_rollup.py --rebuild [FROM TO]
+"""
+import sys
+
+from db import connect as _connect
+
+# Per-line expressions, shared by the triggers and the raw recompute.
+# {l} is an invoice_items row, {i} an invoices row.
+_RATE = (
+    "COALESCE(CAST(ROUND({l}.vat_pct * 100.0, 0) AS INTEGER),"
+    " CASE {l}.vat_flag WHEN 'B' THEN 5 WHEN 'C' THEN 19 ELSE 0 END, 0)"
+)
+_FACTOR = "(1.0 - COALESCE({i}.discount, 0) / 100.0)"
+_NET = "(({l}.total_price - COALESCE({l}.vat_amount, 0)) * " + _FACTOR + ")"
+_VAT = "(COALESCE({l}.vat_amount, 0) * " + _FACTOR + ")"
+_GROSS = "({l}.total_price * " + _FACTOR + ")"
+_ELIGIBLE = (
+    "{i}.invoice_type = 'INVOICE' AND COALESCE({i}.revenue_eligible, 1) = 1"
+    " AND DATE({i}.invoice_date) IS NOT NULL"
+)
+_PAY_HOUR = "strftime('%Y-%m-%d %H:00:00', {p}.payment_date)"
+_METHOD = "COALESCE({p}.payment_method, 'Other')"
+
+_UPSERT_RATE = """
+    ON CONFLICT(business_date, vat_rate) DO UPDATE
+       SET lines = lines + excluded.lines, net = net + excluded.net,
+           vat = vat + excluded.vat, gross = gross + excluded.gross"""
+_UPSERT_TOTALS = """
+    ON CONFLICT(business_date) DO UPDATE
+       SET invoice_count = invoice_count + excluded.invoice_count,
+           gross_sales = gross_sales + excluded.gross_sales"""
+_UPSERT_TENDER = """
+    ON CONFLICT(pay_hour, method) DO UPDATE
+       SET payments_count = payments_count + excluded.payments_count,
+           payments = payments + excluded.payments,
+           refunds = refunds + excluded.refunds"""
+
+
+def _fmt(template, **refs):
+    return template.format(**refs)
+
+
+def _line_exprs(line, inv):
+    """(rate, net, vat, gross) SQL for invoice_items row `line` of invoice `inv`."""
+    return tuple(_fmt(t, l=line, i=inv) for t in (_RATE, _NET, _VAT, _GROSS))
+
+
+def _line_delta(sign, line):
+    """One invoice_items row (NEW/OLD) in or out of its invoice's day."""
+    rate, net, vat, gross = _line_exprs(line, "i")
+    return f"""
+    INSERT INTO daily_sales_rollup (business_date, vat_rate, lines, net, vat, gross)
+    SELECT DATE(i.invoice_date), {rate}, {sign},
+           {sign} * {net}, {sign} * {vat}, {sign} * {gross}
+      FROM invoices i
+     WHERE i.invoice_id = {line}.invoice_id AND {_fmt(_ELIGIBLE, i="i")}
+    {_UPSERT_RATE};"""
+
+
+def _invoice_delta(sign, inv):
+    """All lines and the day total of one invoices row (NEW/OLD), in or out."""
+    rate, net, vat, gross = _line_exprs("ii", inv)
+    eligible = _fmt(_ELIGIBLE, i=inv)
+    return f"""
+    INSERT INTO daily_sales_rollup (business_date, vat_rate, lines, net, vat, gross)
+    SELECT DATE({inv}.invoice_date), {rate} AS rate, {sign} * COUNT(*),
+           {sign} * SUM({net}), {sign} * SUM({vat}), {sign} * SUM({gross})
+      FROM invoice_items ii
+     WHERE ii.invoice_id = {inv}.invoice_id AND {eligible}
+     GROUP BY rate
+    {_UPSERT_RATE};
+    INSERT INTO daily_sales_totals (business_date, invoice_count, gross_sales)
+    SELECT DATE({inv}.invoice_date), {sign}, {sign} * COALESCE({inv}.final_amount, 0)
+     WHERE {eligible}
+    {_UPSERT_TOTALS};"""
+
+
+def _payment_delta(sign, pay):
+    hour = _fmt(_PAY_HOUR, p=pay)
+    return f"""
+    INSERT INTO tender_rollup (pay_hour, method, payments_count, payments, refunds)
+    SELECT {hour}, {_fmt(_METHOD, p=pay)}, {sign},
+           {sign} * MAX({pay}.amount_paid, 0), {sign} * MAX(-{pay}.amount_paid, 0)
+     WHERE {hour} IS NOT NULL
+    {_UPSERT_TENDER};"""
+
+
+SALES_ROLLUP_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS daily_sales_rollup (
+        business_date TEXT    NOT NULL,
+        vat_rate      INTEGER NOT NULL,
+        lines         INTEGER NOT NULL DEFAULT 0,
+        net           REAL    NOT NULL DEFAULT 0,
+        vat           REAL    NOT NULL DEFAULT 0,
+        gross         REAL    NOT NULL DEFAULT 0,
+        PRIMARY KEY (business_date, vat_rate)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS daily_sales_totals (
+        business_date TEXT    PRIMARY KEY,
+        invoice_count INTEGER NOT NULL DEFAULT 0,
+        gross_sales   REAL    NOT NULL DEFAULT 0
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tender_rollup (
+        pay_hour       TEXT    NOT NULL,
+        method         TEXT    NOT NULL,
+        payments_count INTEGER NOT NULL DEFAULT 0,
+        payments       REAL    NOT NULL DEFAULT 0,
+        refunds        REAL    NOT NULL DEFAULT 0,
+        PRIMARY KEY (pay_hour, method)
+    ) WITHOUT ROWID
+    """,
+)
+
+_ITEM_COLS = "invoice_id, total_price, vat_amount, vat_pct, vat_flag"
+_INVOICE_COLS = "invoice_date, invoice_type, revenue_eligible, discount, final_amount"
+_PAYMENT_COLS = "payment_date, amount_paid, payment_method"
+
+SALES_ROLLUP_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_sales_rollup_item_ai
+    AFTER INSERT ON invoice_items
+    BEGIN {_line_delta(1, "NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_sales_rollup_item_au
+    AFTER UPDATE OF {_ITEM_COLS} ON invoice_items
+    BEGIN {_line_delta(-1, "OLD")} {_line_delta(1, "NEW")}
+    END
+    """,
+    # Also fires for ON DELETE CASCADE, when the invoice is already gone (no-op:
+    # trg_sales_rollup_invoice_bd took its lines out first)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_sales_rollup_item_ad
+    AFTER DELETE ON invoice_items
+    BEGIN {_line_delta(-1, "OLD")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_sales_rollup_invoice_ai
+    AFTER INSERT ON invoices
+    BEGIN {_invoice_delta(1, "NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_sales_rollup_invoice_au
+    AFTER UPDATE OF {_INVOICE_COLS} ON invoices
+    WHEN OLD.invoice_date IS NOT NEW.invoice_date
+      OR OLD.invoice_type IS NOT NEW.invoice_type
+      OR OLD.revenue_eligible IS NOT NEW.revenue_eligible
+      OR OLD.discount IS NOT NEW.discount
+      OR OLD.final_amount IS NOT NEW.final_amount
+    BEGIN {_invoice_delta(-1, "OLD")} {_invoice_delta(1, "NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_sales_rollup_invoice_bd
+    BEFORE DELETE ON invoices
+    BEGIN {_invoice_delta(-1, "OLD")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_tender_rollup_ai
+    AFTER INSERT ON payment_history
+    BEGIN {_payment_delta(1, "NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_tender_rollup_au
+    AFTER UPDATE OF {_PAYMENT_COLS} ON payment_history
+    BEGIN {_payment_delta(-1, "OLD")} {_payment_delta(1, "NEW")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_tender_rollup_ad
+    AFTER DELETE ON payment_history
+    BEGIN {_payment_delta(-1, "OLD")}
+    END
+    """,
+)
+
+
+# --- Raw recompute (rebuild / verify); :start / :end are inclusive dates ---
+_RAW_RATE, _RAW_NET, _RAW_VAT, _RAW_GROSS = _line_exprs("ii", "i")
+_RAW_SALES_SQL = f"""
+    SELECT DATE(i.invoice_date) AS day, {_RAW_RATE} AS rate, COUNT(*),
+           SUM({_RAW_NET}), SUM({_RAW_VAT}), SUM({_RAW_GROSS})
+      FROM invoices i
+      JOIN invoice_items ii ON ii.invoice_id = i.invoice_id
+     WHERE {_fmt(_ELIGIBLE, i="i")} AND DATE(i.invoice_date) BETWEEN :start AND :end
+     GROUP BY day, rate
+"""
+_RAW_TOTALS_SQL = f"""
+    SELECT DATE(i.invoice_date) AS day, COUNT(*), SUM(COALESCE(i.final_amount, 0))
+      FROM invoices i
+     WHERE {_fmt(_ELIGIBLE, i="i")} AND DATE(i.invoice_date) BETWEEN :start AND :end
+     GROUP BY day
+"""
+_RAW_TENDERS_SQL = f"""
+    SELECT {_fmt(_PAY_HOUR, p="p")} AS hour, {_fmt(_METHOD, p="p")} AS method,
+           COUNT(*), SUM(MAX(p.amount_paid, 0)), SUM(MAX(-p.amount_paid, 0))
+      FROM payment_history p
+     WHERE hour IS NOT NULL AND DATE(hour) BETWEEN :start AND :end
+     GROUP BY hour, method
+"""
+_STORED_SALES_SQL = """
+    SELECT business_date, vat_rate, lines, net, vat, gross FROM daily_sales_rollup
+     WHERE business_date BETWEEN :start AND :end AND lines <> 0
+"""
+_STORED_TOTALS_SQL = """
+    SELECT business_date, invoice_count, gross_sales FROM daily_sales_totals
+     WHERE business_date BETWEEN :start AND :end AND invoice_count <> 0
+"""
+_STORED_TENDERS_SQL = """
+    SELECT pay_hour, method, payments_count, payments, refunds FROM tender_rollup
+     WHERE pay_hour >= :start AND pay_hour < DATE(:end, '+1 day')
+       AND payments_count <> 0
+"""
+
+_ALL_DAYS = ("0000-01-01", "9999-12-30")  # DATE(end, '+1 day') must exist
+
+
+def _bounds(start, end):
+    return {"start": start or _ALL_DAYS[0], "end": end or _ALL_DAYS[1]}
+
+
+def rebuild(conn, start=None, end=None) -> None:
+    """Recompute the rollups for [start, end] (all days by default) from raw rows."""
+    p = _bounds(start, end)
+    conn.execute("SAVEPOINT sales_rollup_rebuild")
+    try:
+        for table, day_col in (
+            ("daily_sales_rollup", "business_date"),
+            ("daily_sales_totals", "business_date"),
+            ("tender_rollup", "pay_hour"),
+        ):
+            conn.execute(
+                f"DELETE FROM {table}"
+                f" WHERE {day_col} >= :start AND {day_col} < DATE(:end, '+1 day')",
+                p,
+            )
+        for table, cols, raw_sql in (
+            ("daily_sales_rollup", "business_date, vat_rate, lines, net, vat, gross",
+             _RAW_SALES_SQL),
+            ("daily_sales_totals", "business_date, invoice_count, gross_sales",
+             _RAW_TOTALS_SQL),
+            ("tender_rollup", "pay_hour, method, payments_count, payments, refunds",
+             _RAW_TENDERS_SQL),
+        ):
+            conn.execute(f"INSERT INTO {table} ({cols}) {raw_sql}", p)
+    except Exception:
+        conn.execute("ROLLBACK TO sales_rollup_rebuild")
+        conn.execute("RELEASE sales_rollup_rebuild")
+        raise
+    conn.execute("RELEASE sales_rollup_rebuild")
+
+
+def _keyed(rows):
+    """{(day, key): values} with the day taken from the first 10 characters."""
+    return {(r[0][:10], r[0], r[1]): tuple(r[2:]) for r in rows}
+
+
+def _drifted_days(stored, raw):
+    days = set()
+    for key in stored.keys() | raw.keys():
+        a, b = stored.get(key), raw.get(key)
+        if a is None or b is None or a[0] != b[0]:
+            days.add(key[0])
+        elif any(abs((x or 0) - (y or 0)) >= 0.005 for x, y in zip(a[1:], b[1:])):
+            days.add(key[0])
+    return days
+
+
+def verify(start=None, end=None, fix=True) -> list[str]:
+    """
+    Recompute [start, end] (all days by default) from invoices, invoice_items and
+    payment_history. Returns the business dates whose rollup rows disagree with
+    the raw rows; with fix=True those days are rebuilt.
+    """
+    p = _bounds(start, end)
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE" if fix else "BEGIN")
+        drifted = set()
+        for stored_sql, raw_sql in (
+            (_STORED_SALES_SQL, _RAW_SALES_SQL),
+            (_STORED_TENDERS_SQL, _RAW_TENDERS_SQL),
+        ):
+            drifted |= _drifted_days(
+                _keyed(conn.execute(stored_sql, p)), _keyed(conn.execute(raw_sql, p))
+            )
+        stored = {r[0]: tuple(r[1:]) for r in conn.execute(_STORED_TOTALS_SQL, p)}
+        raw = {r[0]: tuple(r[1:]) for r in conn.execute(_RAW_TOTALS_SQL, p)}
+        drifted |= _drifted_days(
+            {(d, d, None): v for d, v in stored.items()},
+            {(d, d, None): v for d, v in raw.items()},
+        )
+        if fix:
+            for day in sorted(drifted):
+                rebuild(conn, day, day)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return sorted(drifted)
+
+
+if __name__ == "__main__":
+    # python sales_rollup.py --verify [FROM TO] [--dry-run] | --rebuild [FROM TO]
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    start, end = (args + [None, None])[:2]
+    if "--rebuild" in sys.argv:
+        conn = _connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rebuild(conn, start, end)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        print("Sales rollups rebuilt.")
+    elif "--verify" in sys.argv:
+        dry = "--dry-run" in sys.argv
+        days = verify(start, end, fix=not dry)
+        for day in days:
+            print(f"{day}: rollup {'differs from' if dry else 'rebuilt from'} raw rows")
+        print(f"{len(days)} day(s) drifted" + (" (dry run)" if dry else ""))
+        sys.exit(1 if days and dry else 0)
+    else:
+        print(__doc__)
@@ -0,0 +1,92 @@
+# startup_tasks.py
+"""
+Startup work that runs behind the splash instead of in front of the login
+window: the first backup of the day and the update check.
+
+    tasks = StartupTasks(app)
+    tasks.backup_progress.connect(on_progress)   # (pages copied, total pages)
+    tasks.backup_finished.connect(on_backup)     # (path, or None: already done today)
+    tasks.update_available.connect(on_update)    # (appcast dict)
+    tasks.start()
+
+Each task is a QRunnable on a private QThreadPool. Results arrive as signals
+queued onto the GUI thread, so slots may touch widgets. A failing task is
+logged and reported through `failed` (task, message); the app runs without
+either.
+"""
+import sqlite3
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+import backup
+import updater
+from logger import log_error
+
+
+class _TaskSignals(QObject):
+    progress = Signal(int, int)
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class Task(QRunnable):
+    """
+    Runs fn(progress) on a pool thread; progress(done, total) is a signal.
+    Also runs the manual "Backup now" (MainWindow.on_backup_now_clicked).
+    """
+
+    def __init__(self, name: str, fn):
+        super().__init__()
+        self.name = name
+        self.fn = fn
+        self.signals = _TaskSignals()
+
+    def run(self):
+        try:
+            result = self.fn(self.signals.progress.emit)
+        except (OSError, RuntimeError, ValueError, sqlite3.Error) as e:
+            # disk / network, BackupError, bad appcast, database
+            log_error(f"Background task {self.name} failed: {e}")
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
+
+
+class StartupTasks(QObject):
+    backup_progress = Signal(int, int)  # pages copied, total pages
+    backup_finished = Signal(object)  # backup Path, or None if today's exists
+    update_available = Signal(dict)  # appcast of a newer release
+    failed = Signal(str, str)  # task, message
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(2)
+        self._tasks: list[Task] = []  # referenced until the pool is done
+
+    def start(self) -> None:
+        backup_task = Task(
+            "backup", lambda progress: backup.auto_daily_backup_if_needed(progress)
+        )
+        backup_task.signals.progress.connect(self.backup_progress)
+        backup_task.signals.finished.connect(self.backup_finished)
+
+        update_task = Task(
+            "update_check", lambda _progress: updater.check_for_update()
+        )
+        update_task.signals.finished.connect(self._on_update_checked)
+
+        for task in (backup_task, update_task):
+            task.setAutoDelete(False)
+            task.signals.failed.connect(
+                lambda message, name=task.name: self.failed.emit(name, message)
+            )
+            self._tasks.append(task)
+            self._pool.start(task)
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    def _on_update_checked(self, appcast):
+        if appcast:
+            self.update_available.emit(appcast)
@@ -1,8 +1,8 @@
 # pip install packaging
 import json
+import os
 import sys
 import webbrowser
-from urllib.error import HTTPError, URLError
 from urllib.request import urlopen
 
 from packaging import version
@@ -12,7 +12,8 @@ from version import APP_VERSION, CHANNEL
 BASE_URL = "https://valkon30493.github.io/PetCareSuite-Desktop/updates"
 
 def _appcast_url():
-    return f"{BASE_URL}/{CHANNEL}/appcast.json"
+    # PETWELLNESS_APPCAST_URL points the check at a staging or local appcast
+    return os.getenv("PETWELLNESS_APPCAST_URL") or f"{BASE_URL}/{CHANNEL}/appcast.json"
 
 
 def check_for_update(timeout_seconds: int = 5):
@@ -22,7 +23,7 @@ def check_for_update(timeout_seconds: int = 5):
         latest = data.get("latest", APP_VERSION)
         if version.parse(latest) > version.parse(APP_VERSION):
             return data
-    except (URLError, HTTPError, ValueError):
+    except (OSError, ValueError):  # offline, HTTP error, timeout, bad JSON
         return None
     return None
 